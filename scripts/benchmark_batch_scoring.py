@@ -0,0 +1,87 @@
+"""
+Scaling benchmark for parallel batch scoring.
+
+Writes a synthetic raw file, then scores it with 1, 2, 4, ... workers up to
+--max-workers and reports rows/sec and speedup over one worker. Every run is
+checked against the single-worker output to confirm order and scores match.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_batch_scoring.py --rows 1000000 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from churn_project_folder.data.synthetic import make_synthetic_raw
+from churn_project_folder.serving.batch_scoring import WORKER_BACKENDS, score_file
+
+
+def _worker_counts(max_workers: int):
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", choices=WORKER_BACKENDS, default="auto")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "raw.parquet"
+        make_synthetic_raw(args.rows).to_parquet(input_path, index=False)
+        print(f"Synthetic input: {args.rows:,} rows, cpu_count={os.cpu_count()}")
+
+        baseline = None
+        reference = None
+        failures = 0
+
+        print(f"{'workers':>8} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}  match")
+        for n_workers in _worker_counts(args.max_workers):
+            output_path = Path(tmp_dir) / f"scores_{n_workers}.parquet"
+            stats = score_file(
+                input_path,
+                output_path,
+                chunksize=args.chunksize,
+                progress=False,
+                n_workers=n_workers,
+                backend=args.backend,
+            )
+
+            scores = pd.read_parquet(output_path)
+            if reference is None:
+                reference = scores
+                baseline = stats["rows_per_sec"]
+                match = True
+            else:
+                match = (
+                    scores["customerID"].equals(reference["customerID"])
+                    and np.allclose(
+                        scores["churn_probability"], reference["churn_probability"]
+                    )
+                )
+            failures += not match
+
+            print(
+                f"{n_workers:>8} {stats['seconds']:>9.2f} "
+                f"{stats['rows_per_sec']:>12,.0f} "
+                f"{stats['rows_per_sec'] / baseline:>7.2f}x  {'ok' if match else 'MISMATCH'}"
+            )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Benchmark the fused `encode_frame` against `preprocess_data` + `build_features`.
+
+Both run on the same synthetic raw frame (CSV-like dtypes, `TotalCharges`
+as text); the outputs are checked to be identical before timing.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_encoder.py --rows 100000 1000000
+"""
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from churn_project_folder.data.preprocess import preprocess_data
+from churn_project_folder.data.synthetic import make_synthetic_raw
+from churn_project_folder.features.build_features import build_features
+from churn_project_folder.features.encoder import encode_frame
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'two-pass s':>11} {'fused s':>9} {'speedup':>8}")
+    for n_rows in args.rows:
+        df_raw = make_synthetic_raw(n_rows)
+
+        pd.testing.assert_frame_equal(
+            build_features(preprocess_data(df_raw)), encode_frame(df_raw)
+        )
+
+        baseline = _best_of(lambda: build_features(preprocess_data(df_raw)), args.repeats)
+        fused = _best_of(lambda: encode_frame(df_raw), args.repeats)
+        print(f"{n_rows:>10,} {baseline:>11.3f} {fused:>9.3f} {baseline / fused:>7.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
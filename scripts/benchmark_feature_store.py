@@ -0,0 +1,73 @@
+"""
+Benchmark feature store deltas against recomputing every customer's features.
+
+A store is built from a synthetic customer base, then deltas touching a
+fraction of the customers (changed `MonthlyCharges`/`TotalCharges`) are
+applied. Each is compared with a full recompute: `load_raw_data` of the
+whole base written as CSV, then `encode_frame`. Reading the training
+frame and iterating over a snapshot are timed as well.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_feature_store.py --rows 1000000 --fractions 0.01 0.03 0.1
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+from churn_project_folder.data.feature_store import FeatureStore
+from churn_project_folder.data.load_data import load_raw_data
+from churn_project_folder.data.synthetic import make_synthetic_raw
+from churn_project_folder.features.encoder import encode_frame
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.01, 0.03, 0.1])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df_raw = make_synthetic_raw(args.rows)
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_path = Path(tmp_dir) / "customers.csv"
+        df_raw.to_csv(raw_path, index=False)
+        _, full_seconds = _timed(lambda: encode_frame(load_raw_data(raw_path)))
+        print(f"{args.rows:,} customers; full recompute (load + encode): {full_seconds:.2f}s")
+
+        store = FeatureStore(Path(tmp_dir) / "store")
+        stats = store.apply_delta(df_raw)
+        print(f"initial build: {stats['seconds']:.2f}s")
+
+        print(f"\n{'delta':>8} {'rows':>9} {'apply s':>8} {'speedup':>8}")
+        for fraction in args.fractions:
+            rows = rng.choice(len(df_raw), int(len(df_raw) * fraction), replace=False)
+            delta = df_raw.iloc[rows][["customerID", "MonthlyCharges", "TotalCharges"]].copy()
+            delta["MonthlyCharges"] = delta["MonthlyCharges"] + 1.0
+            stats = store.apply_delta(delta)
+            print(
+                f"{fraction:>8.1%} {len(delta):>9,} {stats['seconds']:>8.2f} "
+                f"{full_seconds / stats['seconds']:>7.1f}x"
+            )
+
+        _, seconds = _timed(store.training_frame)
+        print(f"\ntraining_frame: {seconds:.2f}s")
+        _, seconds = _timed(lambda: sum(len(chunk) for chunk in store.iter_snapshot()))
+        print(f"iter_snapshot:  {seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Memory benchmark: default vs compact dtypes for load + preprocess + features.
+
+For each row count a synthetic raw CSV is written, then each mode runs in a
+fresh subprocess (so peak RSS is not shared between runs) and reports peak
+RSS above the post-import baseline, the final frame size and wall time.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_memory.py --rows 1000000 10000000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GENERATE_BLOCK_ROWS = 1_000_000
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM resets on exec; ru_maxrss is inherited from the parent on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(path: str, compact: bool) -> dict:
+    from churn_project_folder.data.load_data import load_raw_data
+    from churn_project_folder.data.preprocess import preprocess_data
+    from churn_project_folder.features.build_features import build_features
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+
+    df_raw = load_raw_data(path, compact=compact)
+    raw_mb = df_raw.memory_usage(deep=True).sum() / 1e6
+    df_features = build_features(preprocess_data(df_raw, compact=compact), compact=compact)
+
+    return {
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": _peak_rss_mb() - baseline,
+        "raw_frame_mb": raw_mb,
+        "features_frame_mb": df_features.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def _write_synthetic_csv(path: Path, n_rows: int) -> None:
+    from churn_project_folder.data.synthetic import make_synthetic_raw
+
+    for offset in range(0, n_rows, GENERATE_BLOCK_ROWS):
+        n_block = min(GENERATE_BLOCK_ROWS, n_rows - offset)
+        block = make_synthetic_raw(n_block, seed=offset)
+        block["customerID"] = [f"SYN-{i:010d}" for i in range(offset, offset + n_block)]
+        block.to_csv(path, mode="a" if offset else "w", header=offset == 0, index=False)
+
+
+def _run_worker(path: Path, compact: bool) -> dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker", str(path), "--compact" if compact else "--default"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        # Typically the OOM killer on the default mode at large row counts
+        return {"error": f"exit code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--compact", dest="compact", action="store_true", help=argparse.SUPPRESS)
+    mode.add_argument("--default", dest="compact", action="store_false", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_measure(args.worker, args.compact)))
+        return 0
+
+    print(
+        f"{'rows':>12} {'mode':>8} {'seconds':>8} {'peak RSS MB':>12} "
+        f"{'raw MB':>9} {'features MB':>12}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in args.rows:
+            path = Path(tmp_dir) / f"raw_{n_rows}.csv"
+            _write_synthetic_csv(path, n_rows)
+
+            for compact in (False, True):
+                result = _run_worker(path, compact)
+                name = "compact" if compact else "default"
+                if "error" in result:
+                    print(f"{n_rows:>12,} {name:>8}  failed ({result['error']})")
+                    continue
+                print(
+                    f"{n_rows:>12,} {name:>8} {result['seconds']:>8.1f} "
+                    f"{result['peak_rss_mb']:>12,.0f} {result['raw_frame_mb']:>9,.0f} "
+                    f"{result['features_frame_mb']:>12,.0f}"
+                )
+
+            path.unlink()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Check and time the single-pass metrics engine against sklearn.
+
+For each test-set size, synthetic labels and probabilities (with ties, like
+tree ensembles produce) are evaluated with
+
+- sklearn: accuracy/recall/precision/roc_auc_score plus
+  `classification_report` and `confusion_matrix`, as `evaluate_proba` did
+  before; "+ sweep" adds a 101-threshold sweep with `confusion_matrix` per
+  threshold
+- `binary_metrics`: the same metrics and sweep from one pass
+- `MetricsAccumulator`: the same, fed in chunks
+
+and the script fails if any metric disagrees with sklearn.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_metrics.py --rows 10000 1000000 --chunk-size 100000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score,
+    classification_report,
+    confusion_matrix,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+
+from churn_project_folder.models.metrics import (
+    SWEEP_THRESHOLDS,
+    MetricsAccumulator,
+    binary_metrics,
+)
+
+AUC_TOLERANCE = 1e-6
+
+
+def _synthetic(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n_rows) < 0.27
+    logits = rng.normal(size=n_rows) + 1.2 * y
+    # Round to 1/400 so that many scores tie, as with forest vote fractions
+    proba = np.round(1 / (1 + np.exp(-logits)) * 400) / 400
+    return y.astype(int), proba
+
+
+def _sklearn(y, proba):
+    preds = (proba > 0.5).astype(int)
+    classification_report(y, preds)
+    return {
+        "accuracy": accuracy_score(y, preds),
+        "recall": recall_score(y, preds),
+        "precision": precision_score(y, preds),
+        "roc_auc": roc_auc_score(y, proba),
+        "confusion_matrix": confusion_matrix(y, preds),
+    }
+
+
+def _sklearn_sweep(y, proba):
+    return np.array([confusion_matrix(y, (proba > t).astype(int))[1, 1] for t in SWEEP_THRESHOLDS])
+
+
+def _accumulated(y, proba, chunk_size):
+    acc = MetricsAccumulator()
+    for start in range(0, len(y), chunk_size):
+        acc.update(y[start:start + chunk_size], proba[start:start + chunk_size])
+    return acc.result()
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _check(name, reference, sweep_tp, result, auc_tolerance) -> bool:
+    ok = np.array_equal(reference["confusion_matrix"], result["confusion_matrix"])
+    ok &= np.array_equal(sweep_tp, result["threshold_sweep"]["tp"].to_numpy())
+    for key in ("accuracy", "recall", "precision"):
+        ok &= bool(np.isclose(reference[key], result[key], rtol=0, atol=1e-12))
+    ok &= abs(reference["roc_auc"] - result["roc_auc"]) <= auc_tolerance
+    if not ok:
+        print(f"  MISMATCH in {name}: roc_auc {reference['roc_auc']} vs {result['roc_auc']}")
+    return bool(ok)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'rows':>10} {'sklearn s':>10} {'+ sweep s':>10} {'single-pass s':>14} {'chunked s':>10}")
+    for n_rows in args.rows:
+        y, proba = _synthetic(n_rows)
+        reference, sklearn_seconds = _timed(_sklearn, y, proba)
+        sweep_tp, sweep_seconds = _timed(_sklearn_sweep, y, proba)
+        exact, exact_seconds = _timed(binary_metrics, y, proba)
+        chunked, chunked_seconds = _timed(_accumulated, y, proba, args.chunk_size)
+
+        ok &= _check("binary_metrics", reference, sweep_tp, exact, 1e-12)
+        ok &= _check("MetricsAccumulator", reference, sweep_tp, chunked, AUC_TOLERANCE)
+        print(
+            f"{n_rows:>10,} {sklearn_seconds:>10.3f} {sklearn_seconds + sweep_seconds:>10.3f} "
+            f"{exact_seconds:>14.3f} {chunked_seconds:>10.3f}"
+        )
+
+    print("all metrics match sklearn" if ok else "metrics DIFFER from sklearn")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
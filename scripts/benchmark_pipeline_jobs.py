@@ -0,0 +1,56 @@
+"""
+Benchmark `run_pipeline` with sequential vs concurrent model jobs.
+
+Runs every model's baseline and tuning job once one after another and once
+through the CPU-budget scheduler, then prints per-job timings and the total
+wall time against the sequential run. MLflow runs and artifacts go to a
+throwaway store.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_pipeline_jobs.py data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv --trials 10
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import mlflow
+
+from churn_project_folder.models.scheduler import print_schedule_report
+from pipeline import run_pipeline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("data", help="Raw CSV/Parquet file with the Churn column")
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--cpu-budget", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.set_tracking_uri(f"sqlite:///{Path(tmp_dir) / 'mlflow.db'}")
+        experiment_id = mlflow.create_experiment(
+            "benchmark_pipeline_jobs", artifact_location=str(Path(tmp_dir) / "artifacts")
+        )
+        mlflow.set_experiment(experiment_id=experiment_id)
+
+        sequential = run_pipeline(
+            args.data, run_all_models=True, concurrent=False, n_trials=args.trials
+        )
+        concurrent = run_pipeline(
+            args.data,
+            run_all_models=True,
+            concurrent=True,
+            cpu_budget=args.cpu_budget,
+            n_trials=args.trials,
+        )
+
+    print(f"\n{'job':<24} {'sequential s':>12}")
+    for name, outcome in sequential["jobs"].items():
+        print(f"{name:<24} {outcome['seconds']:>12.1f}")
+    print_schedule_report(concurrent, sequential_seconds=sequential["wall_seconds"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
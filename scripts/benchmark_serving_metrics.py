@@ -0,0 +1,110 @@
+"""
+Measure the per-request overhead of the serving metrics instrumentation.
+
+- `StageTimer.mark` cost, with recording enabled and disabled
+- `MetricsMiddleware` cost around a no-op ASGI app
+- `predict_from_raw` latency with recording enabled and disabled
+
+A `/predict` request pays for the middleware plus `MARKS_PER_PREDICT`
+stage marks; the script fails (exit status 1) when that estimate exceeds
+`--max-overhead-us`.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_serving_metrics.py --iterations 200000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Every request is distinct, but keep the prediction cache out of the timings
+os.environ["CHURN_CACHE_MAX_ENTRIES"] = "0"
+
+from churn_project_folder.data.synthetic import make_synthetic_requests
+from churn_project_folder.serving import metrics
+from churn_project_folder.serving.inference import get_serving_model, predict_from_raw
+
+# validation (in the endpoint) + encode + predict_proba; cache_lookup too
+# when the prediction cache is on
+MARKS_PER_PREDICT = 4
+PREDICT_REQUESTS = 2000
+
+
+def _mark_cost_us(iterations: int) -> float:
+    timer = metrics.StageTimer("benchmark")
+    started = time.perf_counter()
+    for _ in range(iterations):
+        timer.mark("stage")
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _asgi_cost_us(app, iterations: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app({"type": "http", "method": "POST", "path": "/predict"}, receive, send)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _predict_latency_us(records) -> float:
+    latencies = []
+    for record in records:
+        started = time.perf_counter()
+        predict_from_raw(record)
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--max-overhead-us", type=float, default=5.0)
+    args = parser.parse_args()
+
+    metrics.set_enabled(True)
+    mark_on = _mark_cost_us(args.iterations)
+    metrics.set_enabled(False)
+    mark_off = _mark_cost_us(args.iterations)
+
+    metrics.set_enabled(True)
+    bare = asyncio.run(_asgi_cost_us(_noop_app, args.iterations))
+    wrapped = asyncio.run(_asgi_cost_us(metrics.MetricsMiddleware(_noop_app), args.iterations))
+    middleware = wrapped - bare
+
+    get_serving_model()
+    records = make_synthetic_requests(PREDICT_REQUESTS, seed=3)
+    _predict_latency_us(records[:200])
+    latency = {}
+    for enabled in (False, True, False, True):
+        metrics.set_enabled(enabled)
+        latency.setdefault(enabled, []).append(_predict_latency_us(records))
+    metrics.set_enabled(True)
+
+    per_request = middleware + MARKS_PER_PREDICT * mark_on
+    print(f"StageTimer.mark:          {mark_on:6.2f} us enabled, {mark_off:.2f} us disabled")
+    print(f"MetricsMiddleware:        {middleware:6.2f} us per request ({bare:.2f} us bare ASGI call)")
+    print(
+        f"predict_from_raw median:  {min(latency[True]):6.1f} us instrumented, "
+        f"{min(latency[False]):.1f} us with recording off"
+    )
+    print(
+        f"Estimated /predict overhead: {per_request:.2f} us "
+        f"(middleware + {MARKS_PER_PREDICT} marks), limit {args.max_overhead_us:.1f} us"
+    )
+    return 0 if per_request <= args.max_overhead_us else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
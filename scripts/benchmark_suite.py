@@ -0,0 +1,302 @@
+"""
+Performance benchmark suite with stored baselines and regression gating.
+
+Runs offline on synthetic data and the model shipped in
+`serving/models/`:
+
+- serving: `predict_from_raw` latency (p50/p95/p99) and
+  `predict_batch_from_raw` throughput at several batch sizes
+- features: `preprocess_data` and `build_features` rows/sec
+- validation: `validate_raw_telco_data` seconds
+- training: `train_model` seconds per model (throwaway MLflow store)
+
+Results are compared with a JSON baseline. A metric regresses when it is
+worse than its baseline by more than the relative tolerance, and the script
+then exits with status 1. `--tolerance` applies to every metric without a
+`tolerance` of its own in the baseline file (tail latencies get a looser
+one). Baselines are machine-specific: regenerate them with
+`--update-baseline` on the machine that runs the gate.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_suite.py                      # compare
+    python scripts/benchmark_suite.py --update-baseline    # record
+    python scripts/benchmark_suite.py --groups serving --tolerance 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Every request is distinct, but keep the prediction cache out of the timings
+os.environ["CHURN_CACHE_MAX_ENTRIES"] = "0"
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "benchmark_suite.json"
+DEFAULT_TOLERANCE = 0.25
+
+GROUPS = ("serving", "features", "validation", "training")
+LATENCY_REQUESTS = 2000
+# Tail latencies of a ~30us call are noisy; gate them more loosely
+TAIL_LATENCY_TOLERANCE = 1.0
+BATCH_SIZES = (1, 16, 256, 4096)
+TRAIN_ROWS = 10_000
+TRAIN_MODELS = ("logistic", "random_forest", "xgboost")
+
+
+def _metric(value: float, unit: str, better: str, tolerance: float = None) -> dict:
+    metric = {"value": float(value), "unit": unit, "better": better}
+    if tolerance is not None:
+        metric["tolerance"] = tolerance
+    return metric
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+# --------------------------------------------------
+# Benchmarks
+# --------------------------------------------------
+
+def bench_serving(args) -> dict:
+    from churn_project_folder.data.synthetic import make_synthetic_requests
+    from churn_project_folder.serving.inference import (
+        get_serving_model,
+        predict_batch_from_raw,
+        predict_from_raw,
+    )
+
+    get_serving_model()
+    requests = make_synthetic_requests(max(LATENCY_REQUESTS, max(BATCH_SIZES)), seed=7)
+
+    # Warm up code paths and caches outside the timings
+    for record in requests[:50]:
+        predict_from_raw(record)
+
+    # Best of `repeats` rounds per percentile, like the throughput metrics
+    percentiles = np.full(3, np.inf)
+    latencies = np.empty(LATENCY_REQUESTS)
+    for _ in range(args.repeats):
+        for i, record in enumerate(requests[:LATENCY_REQUESTS]):
+            started = time.perf_counter()
+            predict_from_raw(record)
+            latencies[i] = time.perf_counter() - started
+        percentiles = np.minimum(percentiles, np.percentile(latencies, [50, 95, 99]))
+
+    results = {}
+    for q, value in zip((50, 95, 99), percentiles):
+        results[f"predict_from_raw_p{q}_ms"] = _metric(
+            value * 1000, "ms", "lower", tolerance=None if q == 50 else TAIL_LATENCY_TOLERANCE
+        )
+
+    for batch_size in BATCH_SIZES:
+        batch = requests[:batch_size]
+        # Enough batches for ~4096 records per timing
+        n_batches = max(1, 4096 // batch_size)
+
+        def run():
+            for _ in range(n_batches):
+                predict_batch_from_raw(batch)
+
+        seconds = _best_of(run, args.repeats)
+        results[f"batch_{batch_size}_records_per_sec"] = _metric(
+            n_batches * batch_size / seconds, "records/s", "higher"
+        )
+    return results
+
+
+def bench_features(args) -> dict:
+    from churn_project_folder.data.preprocess import preprocess_data
+    from churn_project_folder.data.synthetic import make_synthetic_raw
+    from churn_project_folder.features.build_features import build_features
+
+    results = {}
+    for n_rows in args.rows:
+        df_raw = make_synthetic_raw(n_rows)
+        df_clean = preprocess_data(df_raw)
+
+        preprocess_s = _best_of(lambda: preprocess_data(df_raw), args.repeats)
+        # build_features adds columns in place; give every run a fresh frame
+        features_s = min(
+            _timed_once(build_features, df_clean.copy()) for _ in range(args.repeats)
+        )
+        results[f"preprocess_{n_rows}_rows_per_sec"] = _metric(
+            n_rows / preprocess_s, "rows/s", "higher"
+        )
+        results[f"build_features_{n_rows}_rows_per_sec"] = _metric(
+            n_rows / features_s, "rows/s", "higher"
+        )
+    return results
+
+
+def _timed_once(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def bench_validation(args) -> dict:
+    from churn_project_folder.data.synthetic import make_synthetic_raw
+    from churn_project_folder.utils.validate_data import validate_raw_telco_data
+
+    results = {}
+    for n_rows in args.rows:
+        df_raw = make_synthetic_raw(n_rows)
+        seconds = _best_of(lambda: validate_raw_telco_data(df_raw), args.repeats)
+        results[f"validate_{n_rows}_seconds"] = _metric(seconds, "s", "lower")
+    return results
+
+
+def bench_training(args) -> dict:
+    import mlflow
+
+    from churn_project_folder.data.synthetic import make_synthetic_raw
+    from churn_project_folder.features.encoder import encode_frame
+    from churn_project_folder.models.train import train_model
+
+    df_features = encode_frame(make_synthetic_raw(TRAIN_ROWS))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.set_tracking_uri(f"sqlite:///{Path(tmp_dir) / 'mlflow.db'}")
+        experiment_id = mlflow.create_experiment(
+            "benchmark_suite", artifact_location=str(Path(tmp_dir) / "artifacts")
+        )
+        mlflow.set_experiment(experiment_id=experiment_id)
+
+        for model_name in TRAIN_MODELS:
+            def run():
+                with mlflow.start_run(run_name=f"{model_name}_benchmark"):
+                    train_model(df_features, model_name=model_name)
+
+            seconds = _best_of(run, args.repeats)
+            results[f"train_{model_name}_{TRAIN_ROWS}_seconds"] = _metric(seconds, "s", "lower")
+    return results
+
+
+BENCHMARKS = {
+    "serving": bench_serving,
+    "features": bench_features,
+    "validation": bench_validation,
+    "training": bench_training,
+}
+
+
+# --------------------------------------------------
+# Baselines
+# --------------------------------------------------
+
+def _environment() -> dict:
+    import pandas as pd
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    One row per metric: name, baseline, current, relative change, status.
+
+    The change is signed so that positive always means worse.
+    """
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append((name, None, current["value"], None, "new"))
+            continue
+
+        base_value = reference["value"]
+        if current["better"] == "lower":
+            change = (current["value"] - base_value) / base_value
+        else:
+            change = (base_value - current["value"]) / base_value
+        limit = reference.get("tolerance", current.get("tolerance", tolerance))
+        rows.append((name, base_value, current["value"], change, "REGRESSED" if change > limit else "ok"))
+    return rows
+
+
+def print_comparison(rows: list, results: dict) -> None:
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'worse by':>9}  status")
+    for name, base_value, value, change, status in rows:
+        unit = results[name]["unit"]
+        base_text = f"{base_value:>12,.3f}" if base_value is not None else f"{'-':>12}"
+        change_text = f"{change:>8.1%}" if change is not None else f"{'-':>8}"
+        print(f"{name:<40} {base_text} {value:>12,.3f} {change_text}  {status} ({unit})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative regression, e.g. 0.25 for 25%%")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--output", type=Path, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for group in args.groups:
+        print(f"Running {group} benchmarks ...")
+        started = time.perf_counter()
+        results.update(BENCHMARKS[group](args))
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    report = {"environment": _environment(), "metrics": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.update_baseline:
+        # Merge, so running one group only refreshes that group's metrics
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"metrics": {}}
+        stored["environment"] = report["environment"]
+        for name, metric in results.items():
+            previous = stored["metrics"].get(name, {})
+            if "tolerance" in previous:
+                metric = dict(metric, tolerance=previous["tolerance"])
+            stored["metrics"][name] = metric
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline with {len(results)} metrics written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+
+    stored = json.loads(args.baseline.read_text())
+    rows = compare(results, stored["metrics"], args.tolerance)
+    print_comparison(rows, results)
+
+    regressed = [row[0] for row in rows if row[4] == "REGRESSED"]
+    if stored.get("environment", {}).get("cpu_count") != os.cpu_count():
+        print("\nNote: baseline was recorded with a different cpu_count")
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) regressed beyond tolerance: {', '.join(regressed)}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Benchmark MLflow logging overhead per tuning trial and per training dataset.
+
+Per trial, a nested run logs the hyperparameters and evaluation metrics
+either one call at a time through the fluent API (the previous behaviour),
+batched through `models/tracking.py`, or batched and flushed on the
+background writer thread. The dataset benchmark compares
+`log_input(from_pandas(X))` with `log_dataset(X)` (sampled digest and
+schema). Everything goes to a throwaway SQLite store.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_tracking.py --trials 50 --rows 10000 200000
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import mlflow
+from mlflow.data import from_pandas
+
+from churn_project_folder.data.synthetic import make_synthetic_raw
+from churn_project_folder.features.encoder import encode_frame
+from churn_project_folder.models import tracking
+
+TRIAL_PARAMS = {
+    "n_estimators": 400,
+    "max_depth": 6,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.9,
+}
+TRIAL_METRICS = {
+    "accuracy": 0.80,
+    "recall": 0.55,
+    "precision": 0.66,
+    "roc_auc": 0.84,
+    "best_n_estimators": 180,
+}
+
+
+def _trial_fluent(number: int) -> None:
+    with mlflow.start_run(nested=True, run_name=f"trial_{number}"):
+        for key, value in TRIAL_PARAMS.items():
+            mlflow.log_param(key, value)
+        for key, value in TRIAL_METRICS.items():
+            mlflow.log_metric(key, value)
+
+
+def _trial_batched(number: int) -> None:
+    with mlflow.start_run(nested=True, run_name=f"trial_{number}") as run:
+        with tracking.batched_logging(run.info.run_id):
+            tracking.log_params(TRIAL_PARAMS)
+            tracking.log_metrics(TRIAL_METRICS)
+
+
+def _time_trials(trial_fn, n_trials: int):
+    seconds = []
+    with mlflow.start_run(run_name="tuning"):
+        for number in range(n_trials):
+            started = time.perf_counter()
+            trial_fn(number)
+            seconds.append(time.perf_counter() - started)
+        drain_started = time.perf_counter()
+        tracking.wait_for_logging()
+        drain = time.perf_counter() - drain_started
+    return statistics.median(seconds), drain
+
+
+def _time_dataset(X, log_fn) -> float:
+    with mlflow.start_run(run_name="dataset"):
+        started = time.perf_counter()
+        log_fn(X)
+        return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 200_000])
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.set_tracking_uri(f"sqlite:///{Path(tmp_dir) / 'mlflow.db'}")
+        mlflow.set_experiment("benchmark_tracking")
+
+        print(f"Per-trial overhead ({args.trials} trials, start run + "
+              f"{len(TRIAL_PARAMS)} params + {len(TRIAL_METRICS)} metrics + end run)")
+        print(f"{'mode':<12} {'median ms':>10} {'drain s':>8}")
+        for mode, trial_fn, background in (
+            ("fluent", _trial_fluent, False),
+            ("batched", _trial_batched, False),
+            ("background", _trial_batched, True),
+        ):
+            tracking.set_background_logging(background)
+            median, drain = _time_trials(trial_fn, args.trials)
+            print(f"{mode:<12} {median * 1000:>10.2f} {drain:>8.2f}")
+        tracking.set_background_logging(False)
+
+        print(f"\nTraining dataset logging")
+        print(f"{'rows':>10} {'log_input s':>12} {'log_dataset s':>14}")
+        for n_rows in args.rows:
+            X = encode_frame(make_synthetic_raw(n_rows))
+            full = _time_dataset(
+                X, lambda X: mlflow.log_input(
+                    from_pandas(X, source="local_pandas_dataframe"), context="training"
+                )
+            )
+            sampled = _time_dataset(X, lambda X: tracking.log_dataset(X, context="training"))
+            print(f"{n_rows:>10,} {full:>12.3f} {sampled:>14.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
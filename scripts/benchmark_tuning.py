@@ -0,0 +1,79 @@
+"""
+Benchmark tuning with and without trial pruning.
+
+Each tuner runs the same number of trials with `pruner="none"` and with the
+chosen pruner (XGBoost early stopping is disabled in the "none" run). Wall
+time, best score and pruned-trial counts are compared. MLflow runs go to a
+throwaway tracking store unless `--tracking-uri` is given.
+
+Run from the repository root, e.g.:
+    python scripts/benchmark_tuning.py data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv --trials 20
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import mlflow
+
+from churn_project_folder.data.feature_cache import load_features
+from churn_project_folder.models.tune_logistic import tune_logistic
+from churn_project_folder.models.tune_random_forest import tune_random_forest
+from churn_project_folder.models.tune_xgboost import tune_xgboost
+
+TUNERS = {
+    "logistic": tune_logistic,
+    "random_forest": tune_random_forest,
+    "xgboost": tune_xgboost,
+}
+
+
+def _run(tuner, model: str, df, n_trials: int, pruner: str):
+    kwargs = {"n_trials": n_trials, "pruner": pruner, "load_if_exists": False}
+    if model == "xgboost" and pruner == "none":
+        kwargs["early_stopping_rounds"] = None
+
+    with mlflow.start_run(run_name=f"{model}_{pruner}") as run:
+        started = time.perf_counter()
+        _, best_score = tuner(df, **kwargs)
+        seconds = time.perf_counter() - started
+
+    metrics = mlflow.get_run(run.info.run_id).data.metrics
+    return seconds, best_score, int(metrics.get("n_pruned_trials", 0))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("data", help="Raw CSV/Parquet file with the Churn column")
+    parser.add_argument("--models", nargs="+", choices=list(TUNERS), default=list(TUNERS))
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--pruner", default="median")
+    parser.add_argument("--tracking-uri", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.set_tracking_uri(
+            args.tracking_uri or f"sqlite:///{Path(tmp_dir) / 'mlflow.db'}"
+        )
+        mlflow.set_experiment("benchmark_tuning")
+
+        df = load_features(args.data, cache_dir=tmp_dir)
+
+        results = []
+        for model in args.models:
+            for pruner in ("none", args.pruner):
+                seconds, best_score, n_pruned = _run(
+                    TUNERS[model], model, df, args.trials, pruner
+                )
+                results.append((model, pruner, seconds, best_score, n_pruned))
+
+    print(f"\n{'model':<14} {'pruner':<10} {'seconds':>8} {'best':>7} {'pruned':>7}")
+    for model, pruner, seconds, best_score, n_pruned in results:
+        print(f"{model:<14} {pruner:<10} {seconds:>8.1f} {best_score:>7.4f} {n_pruned:>7}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Parity check between the schema-compiled row encoder and the pandas path.
+
+Encodes randomly generated raw records (plus tenure/charge edge cases) with
+both `encode_row` and `preprocess_data` + `build_features`, and compares the
+model input rows and the churn probabilities they produce. The same records,
+plus malformed rows, are also run through `encode_frame` and compared with
+the DataFrame path column for column.
+
+Run from the repository root:
+    python scripts/check_encoder_parity.py
+"""
+import math
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from churn_project_folder.data.preprocess import preprocess_data
+from churn_project_folder.features.build_features import build_features
+from churn_project_folder.data.synthetic import make_synthetic_raw
+from churn_project_folder.features.encoder import encode_frame, encode_row
+from churn_project_folder.features.schema import (
+    ALL_FEATURE_COLUMNS,
+    RAW_CATEGORICAL_DOMAINS,
+    TARGET_COL,
+)
+from churn_project_folder.serving.inference import get_model, rows_to_frame
+
+N_RANDOM_RECORDS = 2000
+EDGE_TENURES = [-1, 0, 1, 6, 7, 12, 13, 24, 48, 49, 72, 73, 100]
+EDGE_TOTAL_CHARGES = [0.0, 0.01, 845.0, 9000.0]
+
+
+def _random_record(rng: random.Random, tenure=None, total_charges=None) -> dict:
+    record = {
+        col: rng.choice(sorted(domain))
+        for col, domain in RAW_CATEGORICAL_DOMAINS.items()
+        if col != TARGET_COL
+    }
+    record["SeniorCitizen"] = rng.choice([0, 1])
+    record["tenure"] = rng.randint(0, 72) if tenure is None else tenure
+    record["MonthlyCharges"] = round(rng.uniform(18.0, 120.0), 2)
+    record["TotalCharges"] = (
+        round(rng.uniform(0.0, 9000.0), 2) if total_charges is None else total_charges
+    )
+    return record
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return a == b
+
+
+def _predict(X):
+    # Both paths must also agree on inputs the model rejects (e.g. inf)
+    try:
+        return float(np.round(get_model().predict_proba(X)[0, 1], 12))
+    except ValueError as exc:
+        return type(exc).__name__
+
+
+def _frame_cases(records):
+    df = pd.DataFrame(records)
+    df.insert(0, "customerID", [f"C{i}" for i in range(len(df))])
+
+    raw = make_synthetic_raw(2000, seed=7)
+    raw.index = raw.index * 3 + 5
+    raw.iloc[0, :] = np.nan                     # fully empty row (dropped)
+    raw.iloc[1, 1:] = np.nan                    # only the key (dropped)
+    raw.iloc[2, 5:-1] = np.nan                  # partially empty (kept)
+    raw.loc[raw.index[3], "Partner"] = "Maybe"  # unknown binary value
+    raw.loc[raw.index[4], "gender"] = None
+    raw.loc[raw.index[5], "TotalCharges"] = "n/a"
+    raw.loc[raw.index[6], "tenure"] = 90        # outside the buckets
+
+    labelled = raw.copy()
+    labelled.loc[labelled.index[2], "Churn"] = "No"
+
+    return {
+        "records": df,
+        "malformed (no target)": raw.drop(columns=["Churn"]),
+        "malformed (labelled)": labelled,
+        "malformed (invalid target)": raw,
+        "numeric target": labelled.assign(Churn=labelled["Churn"].map({"No": 0, "Yes": 1})),
+    }
+
+
+def _check_frame_encoder(records) -> int:
+    failures = 0
+    for name, df in _frame_cases(records).items():
+        try:
+            expected = build_features(preprocess_data(df))
+        except ValueError as exc:
+            expected = f"{type(exc).__name__}: {exc}"
+        try:
+            fused = encode_frame(df)
+        except ValueError as exc:
+            fused = f"{type(exc).__name__}: {exc}"
+
+        try:
+            if isinstance(expected, str) or isinstance(fused, str):
+                assert expected == fused, f"{expected!r} vs {fused!r}"
+            else:
+                pd.testing.assert_frame_equal(expected, fused)
+        except AssertionError as exc:
+            failures += 1
+            print(f"encode_frame mismatch on {name}: {exc}")
+
+    print(f"Checked encode_frame on {len(_frame_cases(records))} frames, {failures} mismatches")
+    return failures
+
+
+def main() -> int:
+    rng = random.Random(42)
+    records = [_random_record(rng) for _ in range(N_RANDOM_RECORDS)]
+    records += [
+        _random_record(rng, tenure=t, total_charges=c)
+        for t in EDGE_TENURES
+        for c in EDGE_TOTAL_CHARGES
+    ]
+
+    failures = 0
+    for record in records:
+        # Reference: the DataFrame path used before the fast path existed
+        df = build_features(preprocess_data(pd.DataFrame([record])))
+        expected_X = df[ALL_FEATURE_COLUMNS]
+        expected_row = [
+            v.item() if isinstance(v, np.generic) else v
+            for v in expected_X.astype(object).iloc[0].tolist()
+        ]
+
+        row = encode_row(record)
+        fast_X = rows_to_frame([row])
+
+        mismatched = [
+            (col, e, r)
+            for col, e, r in zip(ALL_FEATURE_COLUMNS, expected_row, row)
+            if not _same(e, r)
+        ]
+        expected_prob = _predict(expected_X)
+        fast_prob = _predict(fast_X)
+
+        if mismatched or not _same(expected_prob, fast_prob):
+            failures += 1
+            print(f"Mismatch for {record}: {mismatched} "
+                  f"(proba {expected_prob} vs {fast_prob})")
+
+    print(f"Checked {len(records)} records, {failures} mismatches")
+
+    failures += _check_frame_encoder(records)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
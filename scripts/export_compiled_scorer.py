@@ -0,0 +1,80 @@
+"""
+Compile the serving MLflow model into a numpy-only scorer.
+
+Loads the MLflow model, compiles it with `compile_pipeline`, checks parity
+against `predict_proba` on synthetic records, prints a latency/size
+comparison and, if parity holds, writes the scorer next to the model
+(`serving/models/churn_model_compiled.npz`), where inference.py picks it up.
+
+Run from the repository root:
+    python scripts/export_compiled_scorer.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import mlflow.sklearn
+from mlflow.models import Model
+
+from churn_project_folder.data.synthetic import make_synthetic_requests
+from churn_project_folder.features.encoder import encode_row
+from churn_project_folder.models.compiled_scorer import (
+    compile_pipeline,
+    compare_with_pipeline,
+    format_report,
+)
+from churn_project_folder.serving.inference import (
+    MODEL_PATH,
+    COMPILED_SCORER_PATH,
+    rows_to_frame,
+)
+
+
+def export_compiled_scorer(
+    model_path=MODEL_PATH,
+    output_path=COMPILED_SCORER_PATH,
+    n_rows: int = 2000,
+    atol: float = 1e-6,
+) -> bool:
+    """
+    Compile, verify and save the scorer. Returns False if parity fails.
+    """
+    model_path = Path(model_path)
+    pipeline = mlflow.sklearn.load_model(model_path)
+    scorer = compile_pipeline(
+        pipeline, source_model_uuid=Model.load(model_path).model_uuid
+    )
+
+    # Out-of-range tenures exercise the unknown-category path
+    records = make_synthetic_requests(n_rows, seed=7)
+    records += [dict(records[0], tenure=tenure) for tenure in (0, 6, 72, 80)]
+    rows = [encode_row(record) for record in records]
+
+    report = compare_with_pipeline(
+        pipeline, scorer, rows, rows_to_frame(rows), atol=atol
+    )
+    print(format_report(report))
+
+    if not report["parity_ok"]:
+        print("Parity check failed; compiled scorer NOT saved")
+        return False
+
+    scorer.save(output_path)
+    print(f"Compiled scorer saved to {output_path}")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model-path", default=str(MODEL_PATH))
+    parser.add_argument("--output", default=str(COMPILED_SCORER_PATH))
+    parser.add_argument("--n-rows", type=int, default=2000)
+    parser.add_argument("--atol", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    ok = export_compiled_scorer(args.model_path, args.output, args.n_rows, args.atol)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Maintain an on-disk feature store from raw delta files.
+
+Subcommands:
+    apply    upsert (and delete) the customers of one or more delta files
+    rebuild  re-encode every stored customer, e.g. after a feature change
+    info     current version, row counts and the delta log
+
+Run from the repository root, e.g.:
+    python scripts/feature_store.py data/store apply data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv
+    python scripts/feature_store.py data/store apply data/delta_2024_06_01.parquet --delete 7590-VHVEG
+    python scripts/feature_store.py data/store info
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from churn_project_folder.data.feature_store import FeatureStore
+
+
+def _print_stats(stats) -> None:
+    print(
+        f"version {stats['version']}: {stats.get('inserted', 0):,} inserted, "
+        f"{stats.get('updated', 0):,} updated, {stats.get('unchanged', 0):,} unchanged, "
+        f"{stats.get('deleted', 0):,} deleted, {stats.get('dropped', 0):,} dropped; "
+        f"{stats['rows']:,} rows, {stats['seconds']:.2f}s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("store", help="Feature store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = commands.add_parser("apply", help="Apply delta files in order")
+    apply_parser.add_argument("deltas", nargs="+", help="Raw delta files (.csv or .parquet)")
+    apply_parser.add_argument(
+        "--delete",
+        nargs="*",
+        default=[],
+        help="customerIDs to delete (with the first delta)",
+    )
+    commands.add_parser("rebuild", help="Re-encode every stored customer")
+    commands.add_parser("info", help="Show the current version and the delta log")
+    args = parser.parse_args()
+
+    store = FeatureStore(args.store)
+
+    if args.command == "apply":
+        deletes = args.delete
+        for path in args.deltas:
+            _print_stats(store.apply_delta(path, deletes=deletes))
+            deletes = ()
+
+    elif args.command == "rebuild":
+        stats = store.rebuild()
+        print(
+            f"version {stats['version']}: {stats['rebuilt']:,} customers re-encoded, "
+            f"{stats['dropped']:,} dropped; {stats['seconds']:.2f}s"
+        )
+
+    else:
+        manifest = store.manifest()
+        if manifest is None:
+            print(f"No feature store at {args.store}")
+            return 1
+        for key, value in manifest.items():
+            print(f"{key:>22}: {value}")
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(store.log().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
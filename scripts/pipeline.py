@@ -1,7 +1,7 @@
-from churn_project_folder.data.load_data import load_raw_data
-from churn_project_folder.utils.validate_data import validate_raw_telco_data
-from churn_project_folder.data.preprocess import preprocess_data
-from churn_project_folder.features.build_features import build_features
+import time
+
+from churn_project_folder.data.feature_cache import load_features
+from churn_project_folder.data.feature_store import FeatureStore
 import mlflow
 from churn_project_folder.models.train import train_model
 from churn_project_folder.models.evaluate import evaluate_model
@@ -9,6 +9,27 @@ from churn_project_folder.models.tune_logistic import tune_logistic
 from churn_project_folder.models.tune_xgboost import tune_xgboost
 from churn_project_folder.models.tune_random_forest import tune_random_forest
 from churn_project_folder.models.model_registry import MODEL_BUILDERS
+from churn_project_folder.models.scheduler import (
+    TrainingJob,
+    print_schedule_report,
+    run_jobs,
+)
+from churn_project_folder.models.tracking import (
+    batched_logging,
+    log_metrics,
+    log_params,
+    set_background_logging,
+)
+from churn_project_folder.models.tuning import THREADED_MODELS, thread_params
+from churn_project_folder.utils.profiling import (
+    add_profile_records,
+    collect_profiles,
+    configure_profiling,
+    log_profile_summary,
+    print_profile_summary,
+    profile_stage,
+    write_profile_summary,
+)
 from churn_project_folder.features.schema import (
     TARGET_COL,
     CATEGORICAL_FEATURES,
@@ -24,6 +45,46 @@ TUNERS = {
 
 ENABLE_TUNING = True
 
+# Load and featurize with category/int8/float32 columns (lower peak memory)
+COMPACT_DTYPES = False
+
+# Train on the labelled customers of a feature store directory (see
+# scripts/feature_store.py) instead of featurizing the raw file
+FEATURE_STORE_PATH = None
+
+# Optuna storage (e.g. "sqlite:///optuna.db" or "optuna_journal.log") makes
+# tuning resumable; None keeps studies in memory
+TUNING_STORAGE = None
+# Worker processes running trials in parallel
+TUNING_WORKERS = 1
+# Optuna trials per model
+TUNING_TRIALS = 20
+# Optuna pruner for losing trials ("median", "hyperband", "halving", "none")
+TUNING_PRUNER = "median"
+# Stratified k-fold CV (parallel folds) for baselines and tuning scores;
+# None keeps the single train/test split
+CV_FOLDS = None
+
+# Run the per-model baseline and tuning jobs concurrently, sharing
+# CPU_BUDGET cores (None = all cores) between them
+CONCURRENT_JOBS = False
+CPU_BUDGET = None
+
+# Flush batched MLflow params/metrics on a background thread
+ASYNC_MLFLOW_LOGGING = False
+
+# Wall/CPU time and peak memory per stage (load, validate, encode, fit,
+# evaluate, trials, ...), logged to MLflow and summarised at the end
+PROFILE_STAGES = True
+# Also track the tracemalloc peak (noticeably slower)
+PROFILE_TRACEMALLOC = False
+# Run one stage (e.g. "fit") under a profiler and dump it to PROFILE_DUMP_DIR
+PROFILE_DUMP_STAGE = None
+PROFILER = "cprofile"  # or "pyinstrument"
+PROFILE_DUMP_DIR = "profiles"
+# Write the summary table as CSV here (None = print only)
+PROFILE_SUMMARY_PATH = None
+
 
 
 def _check_feature_contract(df):
@@ -82,10 +143,9 @@ def _check_feature_contract(df):
         raise ValueError(msg)
     
 def test_data():
-    df_raw = load_raw_data("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
-    validate_raw_telco_data(df_raw)
-    df_clean = preprocess_data(df_raw)
-    df_features = build_features(df_clean)
+    df_features = load_features(
+        "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv", compact=COMPACT_DTYPES
+    )
     _check_feature_contract(df_features)
     print(df_features['tenure'])
     print(df_features['tenure_bucket'])
@@ -95,7 +155,97 @@ def test_data():
 
     
 
-def run_pipeline(data_path: str, model_name: str = "logistic", run_all_models: bool = False):  
+def _run_baseline(df_features, model: str, n_threads=None):
+    with mlflow.start_run(run_name=f"{model}_baseline"), batched_logging(), collect_profiles() as profiles:
+        trained_model, X_train, X_test, y_train, y_test = train_model(
+            df_features,
+            model_name=model,
+            log_model = ENABLE_TUNING,
+            cv_folds=CV_FOLDS,
+            **thread_params(model, n_threads),
+        )
+
+        metrics = evaluate_model(trained_model, X_test, y_test)
+
+        print(f"\n{model.upper()} baseline metrics:")
+        for k, v in metrics.items():
+            print(f"  {k}: {v:.4f}")
+
+        log_profile_summary(profiles)
+
+    return metrics
+
+
+def _run_tuning(df_features, model: str, n_trials: int = TUNING_TRIALS, n_threads=None):
+    with mlflow.start_run(run_name=f"{model}_tuning"), batched_logging(), collect_profiles() as profiles:
+
+        with profile_stage("tuning"):
+            best_params, best_score = TUNERS[model](
+                df_features,
+                n_trials=n_trials,
+                metric="roc_auc",
+                storage=TUNING_STORAGE,
+                n_workers=TUNING_WORKERS,
+                pruner=TUNING_PRUNER,
+                cv_folds=CV_FOLDS,
+                cpu_budget=n_threads,
+            )
+
+        # log best score as METRIC (not param)
+        log_metrics({"best_score": best_score})
+
+        # log best hyperparameters
+        log_params({f"best_{k}": v for k, v in best_params.items()})
+
+        # train & log the BEST model
+        best_model, *_ = train_model(
+            df_features,
+            model_name=model,
+            **best_params,
+            **thread_params(model, n_threads),
+        )
+
+        mlflow.sklearn.log_model(
+            best_model,
+            name="best_model"
+        )
+
+        log_profile_summary(profiles)
+
+    return best_score
+
+
+def _pipeline_jobs(df_features, models_to_run, n_trials):
+    jobs = []
+    for model in models_to_run:
+        threaded = model in THREADED_MODELS
+        jobs.append(TrainingJob(
+            f"{model}_baseline", _run_baseline, (df_features, model), threaded=threaded
+        ))
+        if ENABLE_TUNING and model in TUNERS:
+            # Tuning fits many models, so it gets a bigger share of cores
+            jobs.append(TrainingJob(
+                f"{model}_tuning", _run_tuning, (df_features, model),
+                kwargs={"n_trials": n_trials}, threaded=threaded, weight=3.0,
+            ))
+    return jobs
+
+
+def run_pipeline(
+    data_path: str,
+    model_name: str = "logistic",
+    run_all_models: bool = False,
+    concurrent: bool = CONCURRENT_JOBS,
+    cpu_budget: int | None = CPU_BUDGET,
+    n_trials: int = TUNING_TRIALS,
+):
+    """
+    Baseline (and tuning) runs for one or all registry models.
+
+    With `concurrent=True` the per-model baseline and tuning jobs run at the
+    same time in separate processes, sharing `cpu_budget` cores (all of
+    them by default). Returns the wall time and per-job timings.
+    """
     if run_all_models:
         models_to_run = list(MODEL_BUILDERS.keys())
     else:
@@ -106,64 +256,63 @@ def run_pipeline(data_path: str, model_name: str = "logistic", run_all_models: b
             )
         models_to_run = [model_name]
     
-    # --------------------------------------------------
-    # 1. Load & prepare data 
-    # --------------------------------------------------
-    df_raw = load_raw_data(data_path)
-    validate_raw_telco_data(df_raw)
-    df_clean = preprocess_data(df_raw)
-    df_features = build_features(df_clean)
-    _check_feature_contract(df_features)
-    
-    # --------------------------------------------------
-    # 2. Loop over models
-    # --------------------------------------------------
-
-    for model in models_to_run:
+    configure_profiling(
+        enabled=PROFILE_STAGES,
+        tracemalloc=PROFILE_TRACEMALLOC,
+        dump_stage=PROFILE_DUMP_STAGE,
+        profiler=PROFILER,
+        dump_dir=PROFILE_DUMP_DIR,
+    )
 
-        # ---------- Baseline ----------
-        with mlflow.start_run(run_name=f"{model}_baseline"):
-            trained_model, X_train, X_test, y_train, y_test = train_model(
-                df_features,
-                model_name=model,
-                log_model = ENABLE_TUNING
+    with collect_profiles() as profiles:
+        # --------------------------------------------------
+        # 1. Load & prepare data (cached by raw file hash + feature code version)
+        # --------------------------------------------------
+        if FEATURE_STORE_PATH:
+            with profile_stage("load_feature_store"):
+                df_features = FeatureStore(FEATURE_STORE_PATH).training_frame()
+            print(
+                f"Loaded {len(df_features)} labelled customers from feature store "
+                f"version {df_features.attrs['feature_store_version']}"
             )
+        else:
+            df_features = load_features(data_path, compact=COMPACT_DTYPES)
+        _check_feature_contract(df_features)
 
-            metrics = evaluate_model(trained_model, X_test, y_test)
-
-            print(f"\n{model.upper()} baseline metrics:")
-            for k, v in metrics.items():
-                print(f"  {k}: {v:.4f}")
-
-
-        # ---------- Tuning ----------
-        if ENABLE_TUNING and model in TUNERS:
-            with mlflow.start_run(run_name=f"{model}_tuning"):
-
-                best_params, best_score = TUNERS[model](
-                    df_features,
-                    n_trials=20,
-                    metric="roc_auc",
-                )
-
-                # log best score as METRIC (not param)
-                mlflow.log_metric("best_score", best_score)
+        # --------------------------------------------------
+        # 2. Run the per-model jobs
+        # --------------------------------------------------
+        set_background_logging(ASYNC_MLFLOW_LOGGING)
+        jobs = _pipeline_jobs(df_features, models_to_run, n_trials)
 
-                # log best hyperparameters
-                for k, v in best_params.items():
-                    mlflow.log_param(f"best_{k}", v)
-
-                # train & log the BEST model
-                best_model, *_ = train_model(
-                    df_features,
-                    model_name=model,
-                    **best_params,
-                )
+        if concurrent:
+            report = run_jobs(jobs, cpu_budget=cpu_budget)
+            print_schedule_report(report)
+            for outcome in report["jobs"].values():
+                add_profile_records(outcome["profile_records"])
+        else:
+            report = {"jobs": {}}
+            started = time.perf_counter()
+            for job in jobs:
+                job_started = time.perf_counter()
+                result = job.fn(*job.args, **job.kwargs)
+                report["jobs"][job.name] = {
+                    "result": result,
+                    "seconds": time.perf_counter() - job_started,
+                    "n_threads": None,
+                }
+            report["wall_seconds"] = time.perf_counter() - started
+            print(f"\nSequential wall time: {report['wall_seconds']:.1f}s")
 
-                mlflow.sklearn.log_model(
-                    best_model,
-                    name="best_model"
-                )
+    # --------------------------------------------------
+    # 3. Where the time and memory went
+    # --------------------------------------------------
+    if PROFILE_STAGES:
+        print_profile_summary(profiles)
+        if PROFILE_SUMMARY_PATH is not None:
+            write_profile_summary(PROFILE_SUMMARY_PATH, profiles)
+    report["profile_records"] = profiles
+    return report
 
 
             
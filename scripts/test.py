@@ -10,3 +10,8 @@ model = mlflow.sklearn.load_model(
 mlflow.sklearn.save_model(model, EXPORT_PATH)
 
 print(f"Model exported to {EXPORT_PATH}")
+
+# Compile the exported model into the numpy scorer used by inference.py
+from export_compiled_scorer import export_compiled_scorer
+
+export_compiled_scorer(EXPORT_PATH)
@@ -0,0 +1,46 @@
+"""
+Validate a raw customer file against the full raw schema.
+
+Streams the file in chunks and prints a per-column violation report
+(required columns, categorical domains, numeric thresholds, duplicate
+customerIDs across the whole file). Exits non-zero if anything is invalid.
+
+Run from the repository root, e.g.:
+    python scripts/validate_raw_file.py customers.csv --no-target --json
+"""
+import argparse
+import json
+import sys
+
+from churn_project_folder.features.schema import MIN_DATASET_SIZE
+from churn_project_folder.utils.validate_data import validate_raw_file
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="Raw customer file (.csv or .parquet)")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--max-rows", type=int, default=None)
+    parser.add_argument("--min-rows", type=int, default=MIN_DATASET_SIZE)
+    parser.add_argument("--no-target", action="store_true", help="Churn column is optional")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = validate_raw_file(
+        args.input,
+        chunksize=args.chunksize,
+        require_target=not args.no_target,
+        min_rows=args.min_rows,
+        max_rows=args.max_rows,
+    )
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2, default=str))
+    else:
+        print(report.summary())
+
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
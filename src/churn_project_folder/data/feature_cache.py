@@ -0,0 +1,237 @@
+"""
+Content-addressed cache of the featurized training frame.
+
+`load_features` returns `build_features(preprocess_data(raw))` for a raw
+file. The result is stored as an uncompressed Feather file whose name is
+derived from
+
+- a blake2b digest of the raw file's bytes, and
+- `FEATURE_CODE_VERSION`, a digest of the loading, preprocessing, feature,
+  encoder and validation source files plus the pandas version,
+
+so editing the data or the feature code produces a new entry instead of a
+stale hit. Hits are read with `memory_map=True`, which skips CSV parsing
+and feature engineering entirely. Raw validation runs before an entry is
+written; entries written with `validate=False` are named `-unvalidated`
+and only served to callers that also skip validation, so a hit for
+`validate=True` implies the raw file passed it.
+
+Entries of raw files that are no longer indexed, or of another
+`FEATURE_CODE_VERSION`, are deleted whenever a new entry or digest is
+written.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from churn_project_folder.data import load_data as load_data_module
+from churn_project_folder.data import preprocess as preprocess_module
+from churn_project_folder.data.load_data import load_raw_data
+from churn_project_folder.data.preprocess import preprocess_data
+from churn_project_folder.features import build_features as build_features_module
+from churn_project_folder.features import encoder as encoder_module
+from churn_project_folder.features import schema as schema_module
+from churn_project_folder.features.build_features import build_features
+from churn_project_folder.features.encoder import encode_frame
+from churn_project_folder.utils import validate_data as validate_data_module
+from churn_project_folder.utils.profiling import profile_stage
+from churn_project_folder.utils.validate_data import validate_raw_telco_data
+
+# Bump when the on-disk layout changes
+FEATURE_CACHE_FORMAT = 1
+
+DEFAULT_CACHE_DIR = Path(os.getenv("CHURN_FEATURE_CACHE_DIR", "data/cache"))
+
+# Remembers the digest of each raw file by (size, mtime) so unchanged files
+# are not re-hashed on every run; one entry per resolved path
+DIGEST_INDEX_NAME = "digests.json"
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def _code_version() -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"format={FEATURE_CACHE_FORMAT};pandas={pd.__version__}".encode())
+    for module in (
+        load_data_module,
+        preprocess_module,
+        build_features_module,
+        encoder_module,
+        schema_module,
+        validate_data_module,
+    ):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+FEATURE_CODE_VERSION = _code_version()
+
+
+def file_digest(path: str | Path) -> str:
+    """
+    blake2b digest of a file's contents, read in 1 MiB blocks.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cached_file_digest(path: Path, cache_dir: Path) -> str:
+    index_path = cache_dir / DIGEST_INDEX_NAME
+    try:
+        index: Dict[str, Dict] = json.loads(index_path.read_text())
+    except (FileNotFoundError, ValueError):
+        index = {}
+
+    stat = path.stat()
+    key = str(path.resolve())
+    entry = index.get(key)
+    if isinstance(entry, dict) and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry["digest"]
+
+    # New or rewritten file: replace its entry (and drop entries in the
+    # old `path|size|mtime` layout), then remove cache entries that no
+    # indexed file points to any more
+    digest = file_digest(path)
+    index = {k: v for k, v in index.items() if isinstance(v, dict)}
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+    _atomic_write_bytes(index_path, json.dumps(index, indent=2).encode())
+    _prune_entries(cache_dir, index)
+    return digest
+
+
+def _prune_entries(cache_dir: Path, index: Optional[Dict[str, Dict]] = None) -> None:
+    # Entry names are
+    # features-<raw digest>-<code version>[-compact][-unvalidated].feather;
+    # keep those of indexed files under the current code version
+    if index is None:
+        try:
+            index = json.loads((cache_dir / DIGEST_INDEX_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            index = {}
+    live_digests = {v["digest"] for v in index.values() if isinstance(v, dict)}
+    for entry_path in cache_dir.glob("features-*.feather"):
+        parts = entry_path.stem.split("-")
+        if len(parts) < 3 or parts[1] not in live_digests or parts[2] != FEATURE_CODE_VERSION:
+            entry_path.unlink(missing_ok=True)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
+
+
+def feature_cache_path(
+    raw_path: str | Path,
+    cache_dir: str | Path = DEFAULT_CACHE_DIR,
+    compact: bool = False,
+    validated: bool = True,
+) -> Path:
+    """
+    Location of the cache entry for a raw file under the current code version.
+
+    `validated=False` is the entry written without raw validation.
+    """
+    cache_dir = Path(cache_dir)
+    raw_digest = _cached_file_digest(Path(raw_path), cache_dir)
+    mode = ("-compact" if compact else "") + ("" if validated else "-unvalidated")
+    return cache_dir / f"features-{raw_digest}-{FEATURE_CODE_VERSION}{mode}.feather"
+
+
+def _write_feather(df: pd.DataFrame, path: Path) -> None:
+    import pyarrow.feather as feather
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed so hits can be memory-mapped without decoding
+        feather.write_feather(df, tmp_name, compression="uncompressed")
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_feather(path: Path) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def load_features(
+    raw_path: str | Path,
+    cache_dir: Optional[str | Path] = DEFAULT_CACHE_DIR,
+    validate: bool = True,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """
+    Load the featurized frame for a raw file, using the cache when possible.
+
+    Parameters
+    ----------
+    raw_path : str or Path
+        Raw Telco CSV.
+    cache_dir : str or Path, optional
+        Cache directory; None disables caching.
+    validate : bool
+        Run `validate_raw_telco_data` before featurizing (cache misses
+        only). With True, entries written without validation are not used.
+    compact : bool
+        Load and featurize with compact dtypes; cached separately.
+
+    Returns
+    -------
+    pd.DataFrame
+        Output of `build_features(preprocess_data(raw))`.
+    """
+    raw_path = Path(raw_path)
+    if not raw_path.exists():
+        raise FileNotFoundError(f"Data file not found at: {raw_path}")
+
+    cache_path = None
+    if cache_dir is not None:
+        # A validated entry serves every caller; an unvalidated one only
+        # callers that skip validation too
+        candidates = [feature_cache_path(raw_path, cache_dir, compact=compact)]
+        if not validate:
+            candidates.append(feature_cache_path(raw_path, cache_dir, compact=compact, validated=False))
+        for candidate in candidates:
+            if candidate.exists():
+                print(f"Feature cache hit: {candidate}")
+                with profile_stage("load_cached_features"):
+                    return _read_feather(candidate)
+        cache_path = candidates[-1]
+        print(f"Feature cache miss: {cache_path}")
+
+    with profile_stage("load"):
+        df_raw = load_raw_data(raw_path, compact=compact)
+    if validate:
+        with profile_stage("validate"):
+            validate_raw_telco_data(df_raw)
+    if compact:
+        with profile_stage("preprocess"):
+            df_clean = preprocess_data(df_raw, compact=True)
+        with profile_stage("build_features"):
+            df_features = build_features(df_clean, compact=True)
+    else:
+        # preprocess_data + build_features in one pass (features/encoder.py)
+        with profile_stage("encode"):
+            df_features = encode_frame(df_raw)
+
+    if cache_path is not None:
+        with profile_stage("write_feature_cache"):
+            _write_feather(df_features, cache_path)
+        _prune_entries(Path(cache_dir))
+
+    return df_features
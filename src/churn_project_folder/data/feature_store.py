@@ -0,0 +1,646 @@
+"""
+On-disk feature store keyed by `customerID`, updated from delta files.
+
+Daily feeds touch a few percent of customers. `FeatureStore.apply_delta`
+upserts and deletes customers and re-encodes only the rows that changed.
+Training and batch scoring read the current features directly, without
+`preprocess_data` / `build_features` over the whole customer base.
+
+Layout of a store directory:
+
+- `features-<version>.feather`: `customerID`, `ALL_FEATURE_COLUMNS`,
+  `Churn` (NaN when unknown) and `version` (the store version that last
+  wrote the row)
+- `raw-<version>.feather`: the raw record of every customer, as text
+  (numbers in canonical form), so partial updates can be merged and
+  changes detected, and everything can be re-encoded when the feature
+  code changes
+- `MANIFEST.json`: the current version and its files, replaced
+  atomically
+- `log.jsonl`: one line per applied delta
+- `scores-<version>.feather` (optional): nightly scores of a version's
+  customers, with the model that computed them recorded in the manifest
+  (see `write_scores`)
+
+Versions are immutable, uncompressed Feather files, so a reader that has
+opened a version keeps a consistent snapshot while deltas are applied;
+`snapshot` and `iter_snapshot` memory-map them. A delta is one pass over
+the stored rows (an Arrow filter, no per-row Python) plus encoding the
+changed rows only. Writers take a lock file; readers take no lock.
+
+Deltas are raw files (CSV or Parquet) or frames with `customerID` and any
+subset of the raw columns. Absent columns keep their stored values, so
+e.g. a billing feed may carry only `MonthlyCharges` and `TotalCharges`.
+An optional `op` column marks rows as `upsert` (the default) or `delete`.
+
+Missing `TotalCharges` are imputed with one fixed value, the median of the
+records of the first build, recorded in the manifest (`total_charges_fill`)
+and kept by later deltas and rebuilds. Imputing with the median of the rows
+being encoded, as batch scoring does, would make a customer's features
+depend on which delta happened to re-encode them.
+"""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from churn_project_folder.data.feature_cache import (
+    FEATURE_CODE_VERSION,
+    _atomic_write_bytes,
+    _read_feather,
+    _write_feather,
+)
+from churn_project_folder.data.load_data import PARQUET_SUFFIXES, load_raw_data
+from churn_project_folder.features.encoder import encode_frame
+from churn_project_folder.features.schema import (
+    ALL_FEATURE_COLUMNS,
+    RAW_REQUIRED_COLUMNS,
+    TARGET_COL,
+    TENURE_BUCKET_LABELS,
+)
+from churn_project_folder.utils.profiling import profile_stage
+from churn_project_folder.utils.validate_data import validate_raw_telco_data
+
+# Bump when the on-disk layout changes (2: `total_charges_fill`)
+FEATURE_STORE_FORMAT = 2
+
+KEY_COL = "customerID"
+OP_COL = "op"
+VERSION_COL = "version"
+
+RAW_COLUMNS = sorted(RAW_REQUIRED_COLUMNS - {KEY_COL})
+# Raw columns parsed as numbers before encoding; TotalCharges stays text
+# as in the raw CSV (encode_frame coerces it)
+RAW_NUMBER_COLUMNS = ("tenure", "MonthlyCharges", "SeniorCitizen")
+
+FEATURE_TEXT_COLUMNS = ("InternetService", "Contract", "PaymentMethod", "tenure_bucket")
+
+MANIFEST_NAME = "MANIFEST.json"
+LOG_NAME = "log.jsonl"
+LOCK_NAME = ".lock"
+
+# Versions whose files are kept; older ones are removed after a write.
+# Readers of the previous version can finish while the next is written.
+KEEP_VERSIONS = 2
+
+_TENURE_BUCKET_DTYPE = pd.CategoricalDtype(TENURE_BUCKET_LABELS, ordered=True)
+
+
+# --------------------------------------------------
+# Raw records
+# --------------------------------------------------
+
+def _canonical_text(values: pd.Series) -> pd.Series:
+    # One text form per value, so stored and incoming records compare
+    # equal whatever dtype the feed was read with
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        numbers = np.asarray(values, dtype=np.float64)
+        text = numbers.astype(str).astype(object)
+        text[np.isnan(numbers)] = None
+        return pd.Series(text, index=values.index)
+    text = values.astype(object).where(values.notna(), None)
+    if pd.api.types.infer_dtype(text, skipna=True) in ("string", "empty"):
+        return text
+    return text.map(lambda value: value if value is None or isinstance(value, str) else str(value))
+
+
+def canonical_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw columns of `df` as text, with `customerID` as index.
+    """
+    df = df.set_axis(df.columns.str.strip(), axis=1)
+    unknown = set(df.columns) - set(RAW_COLUMNS) - {KEY_COL, OP_COL}
+    if unknown:
+        raise ValueError(f"Unknown columns in delta: {sorted(unknown)}")
+    if KEY_COL not in df.columns:
+        raise ValueError(f"Delta has no {KEY_COL} column")
+    if df[KEY_COL].isna().any():
+        raise ValueError(f"Null values found in {KEY_COL}")
+
+    columns = {}
+    for col in df.columns:
+        if col in (KEY_COL, OP_COL):
+            continue
+        values = df[col]
+        if col == TARGET_COL and pd.api.types.is_numeric_dtype(values):
+            values = values.map({0: "No", 1: "Yes"})
+        columns[col] = _canonical_text(values)
+
+    index = pd.Index(df[KEY_COL].astype(str).to_numpy(dtype=object), name=KEY_COL)
+    return pd.DataFrame(columns, index=df.index).set_axis(index, axis=0)
+
+
+def _typed_raw(raw_text: pd.DataFrame) -> pd.DataFrame:
+    # Stored text back to what load_raw_data returns for the same record
+    df = raw_text.reset_index()
+    for col in RAW_NUMBER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def _total_charges_median(raw_text: pd.DataFrame) -> float:
+    # The store's fixed fill for missing TotalCharges (0.0 if none parse)
+    total = pd.to_numeric(raw_text["TotalCharges"], errors="coerce")
+    return float(total.median()) if total.notna().any() else 0.0
+
+
+def _encode(raw_text: pd.DataFrame, version: int, total_charges_fill: float) -> pd.DataFrame:
+    df_raw = _typed_raw(raw_text)
+    validate_raw_telco_data(df_raw, require_target=False, min_rows=0)
+
+    # Unlabelled customers are stored too, so the label is encoded here
+    # (encode_frame rejects missing Churn values)
+    labels = df_raw.pop(TARGET_COL).map({"No": 0.0, "Yes": 1.0}).astype(np.float64)
+
+    features = encode_frame(df_raw)
+    # encode_frame filled missing TotalCharges with the median of these
+    # rows; overwrite with the store's fixed fill and redo the feature
+    # derived from it. Filling the raw text instead would change which
+    # near-empty rows are dropped.
+    missing = pd.to_numeric(df_raw["TotalCharges"], errors="coerce").loc[features.index].isna().to_numpy()
+    if missing.any():
+        features.loc[missing, "TotalCharges"] = total_charges_fill
+        features.loc[missing, "charges_per_month"] = (
+            total_charges_fill / (features.loc[missing, "tenure"] + 1)
+        )
+    # Rows dropped as near-empty are not stored
+    out = features[ALL_FEATURE_COLUMNS].copy()
+    out["tenure_bucket"] = out["tenure_bucket"].astype(object).where(out["tenure_bucket"].notna(), None)
+    out[TARGET_COL] = labels.loc[features.index]
+    out.insert(0, KEY_COL, df_raw[KEY_COL].loc[features.index].to_numpy())
+    out[VERSION_COL] = version
+    return out.reset_index(drop=True)
+
+
+def read_delta(path: str | Path) -> pd.DataFrame:
+    """
+    Read a delta file (CSV or Parquet).
+    """
+    path = Path(path)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        return pd.read_parquet(path)
+    return load_raw_data(path)
+
+
+# --------------------------------------------------
+# Store
+# --------------------------------------------------
+
+class FeatureStore:
+    """
+    Versioned feature store in the directory `path` (created on first write).
+
+        store = FeatureStore("data/feature_store")
+        store.apply_delta("data/feeds/2024-06-01.csv")
+        df = store.training_frame()              # labelled customers
+        for chunk in store.iter_snapshot():      # e.g. for batch scoring
+            ...
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    # -- manifest -----------------------------------------------------
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.path / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return None
+
+    @property
+    def version(self) -> int:
+        manifest = self.manifest()
+        return manifest["version"] if manifest else 0
+
+    @staticmethod
+    def _stale(manifest: Dict[str, Any]) -> bool:
+        # Built by other feature code or an older store format
+        return (
+            manifest["feature_code_version"] != FEATURE_CODE_VERSION
+            or manifest.get("format") != FEATURE_STORE_FORMAT
+        )
+
+    def _current(self) -> Dict[str, Any]:
+        manifest = self.manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No feature store at {self.path}")
+        if self._stale(manifest):
+            raise RuntimeError(
+                f"Features in {self.path} were built by other feature code or "
+                "store format; run FeatureStore.rebuild() (or apply a delta) first"
+            )
+        return manifest
+
+    @contextmanager
+    def _write_lock(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / LOCK_NAME, "w") as lock_file:
+            try:
+                import fcntl
+            except ImportError:  # Windows: single writer assumed
+                yield
+                return
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -- reading ------------------------------------------------------
+
+    def _open(self, manifest: Dict[str, Any], kind: str):
+        import pyarrow.feather as feather
+
+        return feather.read_table(self.path / manifest[kind], memory_map=True)
+
+    @staticmethod
+    def _to_frame(table) -> pd.DataFrame:
+        df = table.to_pandas()
+        if "tenure_bucket" in df.columns:
+            df["tenure_bucket"] = df["tenure_bucket"].astype(_TENURE_BUCKET_DTYPE)
+        return df.set_index(KEY_COL)
+
+    def snapshot(self, labelled: bool = False, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Features of the current version, indexed by `customerID`.
+
+        Columns are `ALL_FEATURE_COLUMNS`, `Churn` and `version` (or
+        `columns`), with the dtypes of `encode_frame`. `labelled=True`
+        keeps customers with a known `Churn`. The version read is in
+        `df.attrs["feature_store_version"]`.
+        """
+        manifest = self._current()
+        table = self._open(manifest, "features")
+        if columns is not None:
+            table = table.select([KEY_COL, *columns])
+        df = self._to_frame(table)
+        if labelled:
+            df = df[df[TARGET_COL].notna()]
+        df.attrs["feature_store_version"] = manifest["version"]
+        return df
+
+    def training_frame(self) -> pd.DataFrame:
+        """
+        Labelled customers, in the shape `load_features` returns
+        (`ALL_FEATURE_COLUMNS` and `Churn`, default index).
+        """
+        df = self.snapshot(labelled=True, columns=[*ALL_FEATURE_COLUMNS, TARGET_COL])
+        return df.reset_index(drop=True)
+
+    def iter_snapshot(self, chunksize: int = 100_000, columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        The current version in chunks of `chunksize` rows.
+
+        All chunks come from the version current when iteration started.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        manifest = self._current()
+        table = self._open(manifest, "features")
+        if columns is not None:
+            table = table.select([KEY_COL, *columns])
+        for offset in range(0, table.num_rows, chunksize):
+            chunk = self._to_frame(table.slice(offset, chunksize))
+            chunk.attrs["feature_store_version"] = manifest["version"]
+            yield chunk
+
+    def raw_records(self) -> pd.DataFrame:
+        """
+        Stored raw records (text), indexed by `customerID`.
+        """
+        return _read_feather(self.path / self._current()["raw"]).set_index(KEY_COL)
+
+    # -- writing ------------------------------------------------------
+
+    def apply_delta(
+        self,
+        delta: pd.DataFrame | str | Path,
+        deletes: Iterable[str] = (),
+        source: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upsert the rows of `delta` and delete `deletes` (and rows marked
+        `op == "delete"`).
+
+        Only new customers and customers whose raw record changed are
+        re-encoded. New customers need every raw column except `Churn`.
+        Nothing is written when the delta changes nothing.
+
+        Returns row counts, the new version and the elapsed seconds.
+        """
+        started = time.perf_counter()
+        if not isinstance(delta, pd.DataFrame):
+            source = source or str(delta)
+            delta = read_delta(delta)
+
+        with profile_stage("apply_delta"), self._write_lock():
+            manifest = self.manifest()
+            if manifest is not None and self._stale(manifest):
+                manifest = self._rebuild(manifest)
+
+            stats = self._apply(manifest, delta, set(map(str, deletes)), source)
+
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+    def _apply(self, manifest, delta: pd.DataFrame, deletes: set, source: Optional[str]) -> Dict[str, Any]:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        version = (manifest["version"] if manifest else 0) + 1
+
+        # Split off deletes; the last row of a repeated key wins
+        if OP_COL in delta.columns:
+            ops = delta[OP_COL].fillna("upsert").str.lower()
+            unknown_ops = set(ops.unique()) - {"upsert", "delete"}
+            if unknown_ops:
+                raise ValueError(f"Unknown {OP_COL} values in delta: {sorted(unknown_ops)}")
+            deletes |= set(delta.loc[ops == "delete", KEY_COL].astype(str))
+            delta = delta.loc[ops == "upsert"].drop(columns=[OP_COL])
+        incoming = canonical_raw(delta)
+        incoming = incoming[~incoming.index.duplicated(keep="last")]
+        incoming = incoming[~incoming.index.isin(deletes)]
+
+        # One probe of the stored keys against the delta's keys (incoming,
+        # then deletes): `position` is each stored row's index into them,
+        # -1 when the delta does not mention the customer. Only the small
+        # delta is hashed.
+        n_incoming = len(incoming)
+        if manifest is not None:
+            raw_table = self._open(manifest, "raw")
+            features_table = self._open(manifest, "features")
+            stored_keys = raw_table.column(KEY_COL)
+            delta_keys = pa.array([*incoming.index, *sorted(deletes)], type=pa.string())
+            position = pc.index_in(stored_keys, value_set=delta_keys).fill_null(-1).to_numpy()
+            hit_rows = np.flatnonzero(position >= 0)
+            hit_positions = position[hit_rows]
+            upserted = hit_positions < n_incoming
+
+            # Stored records of the incoming customers, in incoming order
+            # (null rows for new customers)
+            order = np.full(n_incoming, -1, dtype=np.int64)
+            order[hit_positions[upserted]] = hit_rows[upserted]
+            is_new = order < 0
+            before = raw_table.take(pa.array(order, mask=is_new)).drop_columns([KEY_COL]).to_pandas()
+            deleted = stored_keys.take(pa.array(hit_rows[~upserted])).to_pylist()
+        else:
+            raw_table = features_table = None
+            is_new = np.ones(n_incoming, dtype=bool)
+            before = pd.DataFrame(index=range(n_incoming), columns=RAW_COLUMNS, dtype=object)
+            deleted = []
+
+        if is_new.any():
+            missing = set(RAW_COLUMNS) - {TARGET_COL} - set(incoming.columns)
+            if missing:
+                raise ValueError(
+                    f"{int(is_new.sum())} new customers but the delta lacks columns {sorted(missing)}"
+                )
+
+        # Merge the delta's columns over the stored values; a stored
+        # customer changed if any of them differs
+        merged = before.set_axis(incoming.index, axis=0)
+        changed = is_new.copy()
+        stored = np.flatnonzero(~is_new)
+        for col in incoming.columns:
+            value = incoming[col].to_numpy()
+            if len(stored):
+                old, new = merged[col].to_numpy()[stored], value[stored]
+                changed[stored] |= (old != new) & ~(pd.isna(old) & pd.isna(new))
+            merged[col] = value
+
+        stats = {
+            "version": manifest["version"] if manifest else 0,
+            "rows_in": len(incoming),
+            "inserted": int(is_new.sum()),
+            "updated": int((changed & ~is_new).sum()),
+            "unchanged": int((~changed).sum()),
+            "deleted": len(deleted),
+            "dropped": 0,
+        }
+        if not changed.any() and not deleted:
+            stats["rows"] = raw_table.num_rows if raw_table is not None else 0
+            return stats
+
+        # Re-encode the changed customers only
+        changed_raw = merged[changed]
+        if manifest is not None:
+            total_charges_fill = manifest["total_charges_fill"]
+        else:
+            total_charges_fill = _total_charges_median(changed_raw)
+        with profile_stage("encode_changed"):
+            new_features = _encode(changed_raw, version, total_charges_fill)
+        # Records dropped as near-empty are not stored, so the raw and
+        # feature tables stay row-aligned
+        stats["dropped"] = len(changed_raw) - len(new_features)
+        if stats["dropped"]:
+            changed_raw = changed_raw.loc[new_features[KEY_COL]]
+
+        # Unchanged rows are carried over by one Arrow filter
+        parts = []
+        if raw_table is not None:
+            replaced = np.concatenate([changed, np.ones(len(delta_keys) - n_incoming, dtype=bool)])
+            keep = np.ones(raw_table.num_rows, dtype=bool)
+            keep[hit_rows] = ~replaced[hit_positions]
+            keep = pa.array(keep)
+            parts.append((raw_table.filter(keep), features_table.filter(keep)))
+        parts.append((_raw_table(changed_raw), _features_table(new_features)))
+
+        new_raw = pa.concat_tables([raw for raw, _ in parts])
+        new_features_table = pa.concat_tables([features for _, features in parts])
+
+        stats["version"] = version
+        stats["rows"] = new_features_table.num_rows
+        self._publish(version, new_raw, new_features_table, total_charges_fill, source, stats)
+        return stats
+
+    def _publish(
+        self,
+        version: int,
+        raw_table,
+        features_table,
+        total_charges_fill: float,
+        source: Optional[str],
+        stats: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        features_name = f"features-{version:06d}.feather"
+        raw_name = f"raw-{version:06d}.feather"
+        with profile_stage("write_feature_store"):
+            _write_feather(raw_table, self.path / raw_name)
+            _write_feather(features_table, self.path / features_name)
+
+        manifest = {
+            "format": FEATURE_STORE_FORMAT,
+            "version": version,
+            "features": features_name,
+            "raw": raw_name,
+            "rows": features_table.num_rows,
+            "feature_code_version": FEATURE_CODE_VERSION,
+            "total_charges_fill": total_charges_fill,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        # Stored scores stay valid for the customers the delta did not touch
+        previous = self.manifest()
+        if previous and previous.get("scores"):
+            manifest["scores"] = previous["scores"]
+        _atomic_write_bytes(self.path / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+
+        with open(self.path / LOG_NAME, "a") as log:
+            log.write(json.dumps({"version": version, "source": source, **stats, "at": manifest["updated_at"]}) + "\n")
+
+        self._remove_old_versions(manifest)
+        return manifest
+
+    def _remove_old_versions(self, manifest: Dict[str, Any]) -> None:
+        keep = manifest.get("scores", {}).get("file")
+        for path in self.path.glob("*-*.feather"):
+            try:
+                file_version = int(path.stem.rsplit("-", 1)[1])
+            except ValueError:
+                continue
+            if file_version <= manifest["version"] - KEEP_VERSIONS and path.name != keep:
+                path.unlink(missing_ok=True)
+
+    # -- precomputed scores -------------------------------------------
+
+    def write_scores(self, scores: pd.DataFrame, model_version: str, feature_store_version: int) -> Dict[str, Any]:
+        """
+        Store scores of the customers of version `feature_store_version`.
+
+        `scores` has `customerID`, `churn_probability` and `prediction`
+        (as written by batch scoring) and was computed by the model
+        `model_version` (`ServingModel.version`). A stored score is only
+        valid while that model is loaded and the customer's features are
+        unchanged since `feature_store_version`; see `serving/lookup.py`.
+        Replaces previously stored scores.
+        """
+        import pyarrow as pa
+
+        schema = pa.schema([
+            (KEY_COL, pa.string()),
+            ("churn_probability", pa.float64()),
+            ("prediction", pa.int8()),
+        ])
+        table = pa.Table.from_pandas(
+            scores[[KEY_COL, "churn_probability", "prediction"]], schema=schema, preserve_index=False
+        ).replace_schema_metadata(None)
+
+        with self._write_lock():
+            manifest = self._current()
+            file_name = f"scores-{feature_store_version:06d}.feather"
+            with profile_stage("write_scores"):
+                _write_feather(table, self.path / file_name)
+
+            manifest["scores"] = {
+                "file": file_name,
+                "rows": table.num_rows,
+                "model_version": model_version,
+                "feature_store_version": feature_store_version,
+                "scored_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            _atomic_write_bytes(self.path / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+            self._remove_old_versions(manifest)
+        return manifest["scores"]
+
+    def scores(self) -> Optional[pd.DataFrame]:
+        """
+        Stored scores indexed by `customerID`, or None when there are none.
+
+        The manifest entry (model version, scored store version, ...) is
+        in `df.attrs["scores"]`.
+        """
+        meta = self._current().get("scores")
+        if meta is None:
+            return None
+        df = _read_feather(self.path / meta["file"]).set_index(KEY_COL)
+        df.attrs["scores"] = meta
+        return df
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Re-encode every stored record (after the feature code changed).
+
+        Missing `TotalCharges` keep the fill recorded at the first build.
+
+        Returns the new version, row counts and the elapsed seconds.
+        """
+        started = time.perf_counter()
+        with self._write_lock():
+            manifest = self.manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"No feature store at {self.path}")
+            rows_before = manifest["rows"]
+            manifest = self._rebuild(manifest)
+
+        return {
+            "version": manifest["version"],
+            "rebuilt": rows_before,
+            "dropped": rows_before - manifest["rows"],
+            "rows": manifest["rows"],
+            "seconds": time.perf_counter() - started,
+        }
+
+    def _rebuild(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"Re-encoding every customer in {self.path}")
+        version = manifest["version"] + 1
+        raw_text = self._open(manifest, "raw").to_pandas().set_index(KEY_COL)
+        # Stores of format 1 recorded no fill; take it from their records
+        total_charges_fill = manifest.get("total_charges_fill")
+        if total_charges_fill is None:
+            total_charges_fill = _total_charges_median(raw_text)
+        with profile_stage("encode_changed"):
+            features = _encode(raw_text, version, total_charges_fill)
+
+        stats = {"rebuilt": len(raw_text), "dropped": len(raw_text) - len(features)}
+        if stats["dropped"]:
+            raw_text = raw_text.loc[features[KEY_COL]]
+        return self._publish(
+            version, _raw_table(raw_text), _features_table(features), total_charges_fill, "rebuild", stats
+        )
+
+    def log(self) -> pd.DataFrame:
+        """
+        Applied deltas, one row per version.
+        """
+        try:
+            with open(self.path / LOG_NAME) as f:
+                return pd.DataFrame([json.loads(line) for line in f])
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+
+def _raw_table(raw_text: pd.DataFrame):
+    import pyarrow as pa
+
+    schema = pa.schema([(KEY_COL, pa.string())] + [(col, pa.string()) for col in RAW_COLUMNS])
+    return pa.Table.from_pandas(
+        raw_text.reset_index(), schema=schema, preserve_index=False
+    ).replace_schema_metadata(None)
+
+
+def _features_table(features: pd.DataFrame):
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(
+        features, schema=_feature_schema(), preserve_index=False
+    ).replace_schema_metadata(None)
+
+
+def _feature_schema():
+    import pyarrow as pa
+
+    fields = [(KEY_COL, pa.string())]
+    for col in ALL_FEATURE_COLUMNS:
+        if col in FEATURE_TEXT_COLUMNS:
+            fields.append((col, pa.string()))
+        elif col == "is_new_customer":
+            fields.append((col, pa.int64()))
+        else:
+            fields.append((col, pa.float64()))
+    fields += [(TARGET_COL, pa.float64()), (VERSION_COL, pa.int64())]
+    return pa.schema(fields)
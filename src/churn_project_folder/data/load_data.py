@@ -1,8 +1,84 @@
 from pathlib import Path
+from typing import Dict, Iterator
+import numpy as np
 import pandas as pd
 
+from churn_project_folder.features.schema import (
+    RAW_CATEGORICAL_DOMAINS,
+    RAW_NUMERIC_COLUMNS,
+)
 
-def load_raw_data(path: str | Path) -> pd.DataFrame:
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+# --------------------------------------------------
+# Compact dtypes (opt-in)
+# --------------------------------------------------
+
+def compact_read_dtypes() -> Dict[str, str]:
+    """
+    `read_csv` dtypes for compact loading.
+
+    Categoricals are read as `category` (values are stored once, rows hold
+    small integer codes), the key as an Arrow-backed string and numerics as
+    float32. `TotalCharges` is read as text because the raw file has blanks;
+    `to_compact_dtypes` converts it afterwards.
+    """
+    dtypes = {col: "category" for col in RAW_CATEGORICAL_DOMAINS}
+    dtypes.update({col: "float32" for col in RAW_NUMERIC_COLUMNS if col != "TotalCharges"})
+    dtypes["customerID"] = "string[pyarrow]"
+    return dtypes
+
+
+def _domain_categorical(values: pd.Series, domain) -> pd.Series:
+    # Fix categories to the schema domain; unexpected values are kept as
+    # extra categories so validation still sees them
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        observed = set(values.cat.categories)
+    else:
+        observed = set(values.dropna().unique())
+    categories = sorted(domain) + sorted(observed - set(domain), key=str)
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.set_categories(categories)
+    return values.astype(pd.CategoricalDtype(categories))
+
+
+def to_compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a raw frame to compact dtypes, column by column and in place.
+
+    Used for Parquet input and for frames loaded without `compact=True`.
+    """
+    for col, domain in RAW_CATEGORICAL_DOMAINS.items():
+        if col in df.columns:
+            df[col] = _domain_categorical(df[col], domain)
+
+    for col in RAW_NUMERIC_COLUMNS:
+        if col in df.columns and df[col].dtype != np.float32:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+
+    if "SeniorCitizen" in df.columns and not df["SeniorCitizen"].isna().any():
+        df["SeniorCitizen"] = df["SeniorCitizen"].astype(np.int8)
+
+    if "customerID" in df.columns:
+        df["customerID"] = df["customerID"].astype("string[pyarrow]")
+
+    return df
+
+
+def _read_csv(path: Path, compact: bool, **kwargs):
+    if not compact:
+        return pd.read_csv(path, **kwargs)
+
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {
+        col: dtype for col, dtype in compact_read_dtypes().items() if col in header
+    }
+    return pd.read_csv(path, dtype=dtypes, **kwargs)
+
+
+def load_raw_data(path: str | Path, compact: bool = False) -> pd.DataFrame:
     """
     Load raw churn data from disk.
 
@@ -10,6 +86,9 @@ def load_raw_data(path: str | Path) -> pd.DataFrame:
     ----------
     path : str or Path
         Path to the raw CSV file.
+    compact : bool
+        Load with compact dtypes (see `compact_read_dtypes`) instead of
+        letting pandas infer object/int64/float64 columns.
 
     Returns
     -------
@@ -21,6 +100,54 @@ def load_raw_data(path: str | Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Data file not found at: {path}")
 
-    df = pd.read_csv(path)
+    df = _read_csv(path, compact)
+    if compact:
+        df = to_compact_dtypes(df)
 
     return df
+
+
+def iter_raw_chunks(
+    path: str | Path,
+    chunksize: int = 100_000,
+    compact: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream raw churn data from disk in fixed-size chunks.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to a raw CSV or Parquet file.
+    chunksize : int
+        Maximum number of rows per chunk.
+    compact : bool
+        Yield chunks with compact dtypes.
+
+    Yields
+    ------
+    pd.DataFrame
+        Consecutive chunks of the raw data, indexed by row position in
+        the file.
+    """
+    path = Path(path)
+
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found at: {path}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield to_compact_dtypes(chunk) if compact else chunk
+        return
+
+    # read_csv keeps a running RangeIndex across chunks
+    for chunk in _read_csv(path, compact, chunksize=chunksize):
+        yield to_compact_dtypes(chunk) if compact else chunk
@@ -1,10 +1,35 @@
+import numpy as np
 import pandas as pd
 
+from churn_project_folder.features.schema import (
+    BINARY_VALUE_ENCODING,
+    GENDER_VALUE_ENCODING,
+    RAW_VALUE_ALIASES,
+    RAW_NUMERIC_COLUMNS,
+)
+
+# Rows with at least this fraction of missing values are dropped
+ROW_NULL_THRESHOLD = 0.9
+
+# Columns mapped to 0/1 during preprocessing (gender has its own encoding)
+BINARY_RAW_COLUMNS = [
+    "Partner",
+    "Dependents",
+    "PhoneService",
+    "PaperlessBilling",
+    "MultipleLines",
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+]
+
 
 def check_rows(df):
     #function that deletes a row if there are 90 or more % of data missing
     before_rows = len(df)
-    ROW_NULL_THRESHOLD = 0.9  # drop rows with ≥90% missing
     row_null_frac = df.isnull().mean(axis=1)
     df = df.loc[row_null_frac < ROW_NULL_THRESHOLD]
     dropped = before_rows - len(df)
@@ -13,10 +38,16 @@ def check_rows(df):
     return df
 
 
-def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
+def preprocess_data(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     """
     Basic preprocessing for Telco churn data.
+
+    With `compact=True` the output keeps categoricals as `category`, binary
+    columns as int8 and numerics as float32 (see `_preprocess_compact`).
     """
+    if compact:
+        return _preprocess_compact(df)
+
     df = df.copy()
 
     # Strip column names
@@ -55,26 +86,12 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
         if df["Churn"].isna().any():
             raise ValueError("Unexpected values found in Churn column")
 
-    binary_cols = [
-        "Partner",
-        "Dependents",
-        "PhoneService",
-        "PaperlessBilling",
-        "MultipleLines",
-        "OnlineSecurity",
-        "OnlineBackup",
-        "DeviceProtection",
-        "TechSupport",
-        "StreamingTV",
-        "StreamingMovies",
-    ]
-
-    for col in binary_cols:
+    for col in BINARY_RAW_COLUMNS:
         if col in df.columns:
-            df[col] = df[col].map({"No": 0, "Yes": 1})
+            df[col] = df[col].map(BINARY_VALUE_ENCODING)
 
     if "gender" in df.columns:
-        df["gender"] = df["gender"].map({"Female": 0, "Male": 1})
+        df["gender"] = df["gender"].map(GENDER_VALUE_ENCODING)
 
     bool_cols = df.select_dtypes(include="bool").columns
     df[bool_cols] = df[bool_cols].astype(int)
@@ -85,3 +102,95 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
 
 
     return df
+
+
+# --------------------------------------------------
+# Compact preprocessing
+# --------------------------------------------------
+
+def _encode_codes(values: pd.Series, encoding: dict) -> pd.Series:
+    # Map a column through `encoding` into int8, or float32 with NaN when
+    # some values are missing or unknown (the model's imputers handle NaN)
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+
+    lookup = np.array(
+        [
+            encoding.get(RAW_VALUE_ALIASES.get(category, category), -1)
+            for category in values.cat.categories
+        ] + [-1],
+        dtype=np.int8,
+    )
+    # Missing values have code -1, which indexes the trailing -1
+    encoded = lookup[values.cat.codes.to_numpy()]
+
+    if (encoded < 0).any():
+        return pd.Series(
+            np.where(encoded < 0, np.nan, encoded).astype(np.float32),
+            index=values.index,
+        )
+    return pd.Series(encoded, index=values.index)
+
+
+def _preprocess_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memory-lean equivalent of `preprocess_data`.
+
+    The output frame is assembled column by column, so the input is never
+    copied as a whole (and is left unmodified):
+
+    - binary Yes/No columns and gender are mapped through their category
+      codes into int8 (float32 with NaN if a value is missing or unknown)
+    - categoricals that stay categorical remain `category`
+    - numerics are float32, with the same median fill for TotalCharges
+
+    Values match `preprocess_data` up to float32 precision.
+    """
+    stripped = df.columns.str.strip()
+    if not stripped.equals(df.columns):
+        df = df.set_axis(stripped, axis=1)
+
+    row_null_count = df.isna().sum(axis=1)
+    keep = row_null_count < ROW_NULL_THRESHOLD * df.shape[1]
+    if not keep.all():
+        print(f"Dropped {int((~keep).sum())} rows with ≥90% missing values")
+        df = df.loc[keep]
+
+    columns = {}
+    for col in df.columns:
+        if col == "customerID":
+            continue
+
+        values = df[col]
+
+        if col in BINARY_RAW_COLUMNS:
+            columns[col] = _encode_codes(values, BINARY_VALUE_ENCODING)
+        elif col == "gender":
+            columns[col] = _encode_codes(values, GENDER_VALUE_ENCODING)
+        elif col == "Churn":
+            if pd.api.types.is_numeric_dtype(values):
+                columns[col] = values.astype(np.int8)
+                continue
+            encoded = _encode_codes(values, BINARY_VALUE_ENCODING)
+            if encoded.isna().any():
+                raise ValueError("Unexpected values found in Churn column")
+            columns[col] = encoded
+        elif col in RAW_NUMERIC_COLUMNS:
+            numeric = pd.to_numeric(values, errors="coerce").astype(np.float32, copy=False)
+            if col == "TotalCharges":
+                numeric = numeric.fillna(numeric.median())
+            columns[col] = numeric
+        elif col == "SeniorCitizen":
+            columns[col] = (
+                values.astype(np.float32) if values.isna().any() else values.astype(np.int8)
+            )
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            columns[col] = values
+        elif pd.api.types.is_bool_dtype(values):
+            columns[col] = values.astype(np.int8)
+        elif pd.api.types.is_numeric_dtype(values):
+            columns[col] = values.astype(np.float32, copy=False)
+        else:
+            columns[col] = values.astype("category")
+
+    return pd.DataFrame(columns, index=df.index)
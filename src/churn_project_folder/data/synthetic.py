@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List
+
+from churn_project_folder.features.schema import (
+    RAW_CATEGORICAL_DOMAINS,
+    TARGET_COL,
+    MAX_TENURE,
+    MIN_MONTHLY_CHARGES,
+    MAX_MONTHLY_CHARGES,
+)
+
+# Tenure range of the Telco dataset (the schema allows up to MAX_TENURE)
+SYNTHETIC_MAX_TENURE = min(72, MAX_TENURE)
+
+
+def make_synthetic_raw(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Generate raw Telco-shaped data from the schema domains.
+
+    The frame mirrors what `load_raw_data` returns for the Kaggle CSV:
+    every raw column, string categoricals, and `TotalCharges` stored as
+    text with a blank value for customers with zero tenure. Used for
+    warmup and benchmarks where the real dataset is not available.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows to generate.
+    seed : int
+        Seed for the random generator.
+
+    Returns
+    -------
+    pd.DataFrame
+        Synthetic raw data.
+    """
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({
+        "customerID": [f"SYN-{i:010d}" for i in range(n_rows)],
+    })
+
+    for col, domain in RAW_CATEGORICAL_DOMAINS.items():
+        df[col] = rng.choice(sorted(domain), size=n_rows)
+
+    df["SeniorCitizen"] = rng.integers(0, 2, size=n_rows)
+    df["tenure"] = rng.integers(0, SYNTHETIC_MAX_TENURE + 1, size=n_rows)
+
+    monthly = rng.uniform(
+        max(MIN_MONTHLY_CHARGES, 18.0), min(MAX_MONTHLY_CHARGES, 120.0), size=n_rows
+    ).round(2)
+    df["MonthlyCharges"] = monthly
+
+    total = (monthly * df["tenure"].to_numpy()).round(2)
+    df["TotalCharges"] = np.where(df["tenure"].to_numpy() == 0, " ", total.astype(str))
+
+    return df
+
+
+def make_synthetic_requests(n_rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate raw records shaped like validated `PredictRequest` payloads.
+    """
+    df = make_synthetic_raw(n_rows, seed=seed).drop(columns=["customerID", TARGET_COL])
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce").fillna(0.0)
+
+    return [
+        {
+            key: value.item() if isinstance(value, np.generic) else value
+            for key, value in record.items()
+        }
+        for record in df.to_dict(orient="records")
+    ]
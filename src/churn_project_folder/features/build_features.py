@@ -1,23 +1,35 @@
+import numpy as np
 import pandas as pd
 
+from churn_project_folder.features.schema import (
+    TENURE_BUCKET_BINS,
+    TENURE_BUCKET_LABELS,
+    NEW_CUSTOMER_MAX_TENURE,
+)
 
-def build_features(df):
+
+def build_features(df, compact=False):
     # after feature engineering
+    # compact=True keeps the engineered columns small (int8 / float32)
 
      # Tenure buckets
     df["tenure_bucket"] = pd.cut(
         df["tenure"],
-        bins=[0, 6, 12, 24, 48, 72],
-        labels=["0-6", "6-12", "12-24", "24-48", "48+"],
+        bins=TENURE_BUCKET_BINS,
+        labels=TENURE_BUCKET_LABELS,
         include_lowest=True,
     )
 
     # New customer flag
-    df["is_new_customer"] = (df["tenure"] <= 6).astype(int)
+    df["is_new_customer"] = (df["tenure"] <= NEW_CUSTOMER_MAX_TENURE).astype(
+        np.int8 if compact else int
+    )
 
    
     # Charges per month
     df["charges_per_month"] = (
         df["TotalCharges"] / (df["tenure"] + 1)
     )
+    if compact:
+        df["charges_per_month"] = df["charges_per_month"].astype(np.float32, copy=False)
     return df
@@ -0,0 +1,291 @@
+"""
+Pandas-free encoders compiled from the feature schema.
+
+`preprocess_data` + `build_features` are written for whole DataFrames and
+spend most of their time on pandas overhead when fed a single record. The
+row encoder below is compiled once from `RAW_CATEGORICAL_DOMAINS` and
+`ALL_FEATURE_COLUMNS` and turns one raw record straight into a model input
+row (a list in `ALL_FEATURE_COLUMNS` order) with plain dict lookups.
+
+`encode_frame` is the vectorized counterpart for whole frames: a single
+fused sweep replacing `build_features(preprocess_data(df))`, in which every
+categorical column is factorized once and its codes are indexed into a
+lookup array compiled from the same tables.
+
+Both must stay value-for-value identical to the DataFrame path;
+`scripts/check_encoder_parity.py` verifies that.
+"""
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from churn_project_folder.data.preprocess import ROW_NULL_THRESHOLD
+from churn_project_folder.features.schema import (
+    ALL_FEATURE_COLUMNS,
+    BINARY_FEATURES,
+    BINARY_VALUE_ENCODING,
+    GENDER_VALUE_ENCODING,
+    NEW_CUSTOMER_MAX_TENURE,
+    RAW_CATEGORICAL_DOMAINS,
+    RAW_VALUE_ALIASES,
+    TARGET_COL,
+    TENURE_BUCKET_BINS,
+    TENURE_BUCKET_LABELS,
+)
+
+# Features computed in build_features rather than read from the raw record
+DERIVED_FEATURES = ("tenure_bucket", "is_new_customer", "charges_per_month")
+
+RowEncoder = Callable[[Mapping[str, Any]], List[Any]]
+FrameEncoder = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def _to_float(value: Any) -> float:
+    # Mirrors pd.to_numeric(errors="coerce") followed by astype("float64")
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    # Float division with numpy semantics (x / 0 -> ±inf, 0 / 0 -> nan)
+    if denominator != 0:
+        return numerator / denominator
+    if numerator == 0 or math.isnan(numerator):
+        return math.nan
+    return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+
+
+def tenure_bucket(tenure: float) -> Any:
+    """
+    Scalar equivalent of the `pd.cut` call in `build_features`.
+    """
+    low, high = TENURE_BUCKET_BINS[0], TENURE_BUCKET_BINS[-1]
+    if math.isnan(tenure) or tenure < low or tenure > high:
+        return math.nan
+    position = max(bisect_left(TENURE_BUCKET_BINS, tenure), 1)
+    return TENURE_BUCKET_LABELS[position - 1]
+
+
+def build_value_tables() -> Dict[str, Dict[str, Any]]:
+    """
+    Compile raw categorical value -> model value lookups from the schema.
+
+    Binary columns map to the 0/1 floats produced by `preprocess_data`;
+    multi-valued categoricals map to themselves.
+    """
+    tables = {}
+    for col, domain in RAW_CATEGORICAL_DOMAINS.items():
+        if col == TARGET_COL or col not in ALL_FEATURE_COLUMNS:
+            continue
+
+        if col not in BINARY_FEATURES:
+            tables[col] = {value: value for value in domain}
+            continue
+
+        encoding = GENDER_VALUE_ENCODING if col == "gender" else BINARY_VALUE_ENCODING
+        tables[col] = {
+            value: float(encoding[RAW_VALUE_ALIASES.get(value, value)])
+            for value in domain
+        }
+    return tables
+
+
+def compile_row_encoder() -> RowEncoder:
+    """
+    Build a function mapping one raw record to a model input row.
+
+    The returned row follows `ALL_FEATURE_COLUMNS` order and matches
+    `build_features(preprocess_data(pd.DataFrame([raw])))[ALL_FEATURE_COLUMNS]`.
+    """
+    tables = build_value_tables()
+
+    # Per-column plan: (position, column, kind, lookup table)
+    plan = []
+    for position, col in enumerate(ALL_FEATURE_COLUMNS):
+        if col in DERIVED_FEATURES:
+            continue
+        if col not in tables:
+            plan.append((position, col, "numeric", None))
+        elif col in BINARY_FEATURES:
+            plan.append((position, col, "binary", tables[col]))
+        else:
+            plan.append((position, col, "categorical", tables[col]))
+
+    bucket_position = ALL_FEATURE_COLUMNS.index("tenure_bucket")
+    new_customer_position = ALL_FEATURE_COLUMNS.index("is_new_customer")
+    charges_position = ALL_FEATURE_COLUMNS.index("charges_per_month")
+    n_columns = len(ALL_FEATURE_COLUMNS)
+
+    def encode_row(raw: Mapping[str, Any]) -> List[Any]:
+        row: List[Any] = [None] * n_columns
+
+        for position, col, kind, table in plan:
+            value = raw.get(col)
+            if kind == "numeric":
+                row[position] = _to_float(value)
+            elif kind == "binary":
+                # Unknown binary values become NaN, as with Series.map
+                row[position] = table.get(value, math.nan)
+            else:
+                # Unknown categories pass through; the OneHotEncoder ignores them
+                row[position] = table.get(value, value)
+
+        tenure = _to_float(raw.get("tenure"))
+        total_charges = _to_float(raw.get("TotalCharges"))
+
+        row[bucket_position] = tenure_bucket(tenure)
+        row[new_customer_position] = int(tenure <= NEW_CUSTOMER_MAX_TENURE)
+        row[charges_position] = _divide(total_charges, tenure + 1)
+        return row
+
+    return encode_row
+
+
+encode_row = compile_row_encoder()
+
+
+# --------------------------------------------------
+# Fused frame encoder
+# --------------------------------------------------
+
+def _lookup_codes(values: pd.Series, table: Mapping[Any, float]):
+    # One hash pass (factorize), then a gather from a table sized by the
+    # number of distinct values. Returns the encoded column (missing and
+    # unknown values -> NaN) and the input's missing-value mask.
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    lookup = np.array(
+        [table.get(value, math.nan) for value in uniques] + [math.nan],
+        dtype=np.float64,
+    )
+    # The NaN sentinel (-1) indexes the trailing NaN
+    return lookup[codes], codes < 0
+
+
+def _as_preprocessed_numeric(values: pd.Series) -> pd.Series:
+    # preprocess_data turns bools into ints and int/float columns into float64
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype(np.float64)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.float64)
+    return values
+
+
+def _tenure_bucket_codes(tenure: np.ndarray) -> np.ndarray:
+    # Same intervals as pd.cut(right=True, include_lowest=True)
+    bins = np.asarray(TENURE_BUCKET_BINS, dtype=np.float64)
+    codes = np.maximum(np.searchsorted(bins, tenure, side="left"), 1) - 1
+    outside = np.isnan(tenure) | (tenure < bins[0]) | (tenure > bins[-1])
+    return np.where(outside, -1, codes)
+
+
+def compile_frame_encoder() -> FrameEncoder:
+    """
+    Build a function equivalent to `build_features(preprocess_data(df))`.
+
+    The output has the same columns, column order, dtypes, index and values
+    as the two-step path (including dropping near-empty rows, the
+    `TotalCharges` median fill and the Churn encoding), but each input
+    column is read once and nothing is copied frame-wide.
+    """
+    value_tables = build_value_tables()
+    binary_tables = {
+        col: table for col, table in value_tables.items() if col in BINARY_FEATURES
+    }
+    churn_table = {
+        value: float(BINARY_VALUE_ENCODING[value])
+        for value in RAW_CATEGORICAL_DOMAINS[TARGET_COL]
+    }
+    bucket_dtype = pd.CategoricalDtype(TENURE_BUCKET_LABELS, ordered=True)
+
+    def encode_frame(df: pd.DataFrame) -> pd.DataFrame:
+        stripped = df.columns.str.strip()
+        if not stripped.equals(df.columns):
+            df = df.set_axis(stripped, axis=1)
+
+        n_columns = df.shape[1]
+        null_count = np.zeros(len(df), dtype=np.int32)
+        columns: Dict[str, Any] = {}
+        # Object columns whose nulls are only counted if a row could still
+        # reach the drop threshold (isna on strings is as slow as encoding)
+        deferred_null_checks = []
+        churn_encoded = False
+
+        for col in df.columns:
+            values = df[col]
+
+            if col in binary_tables:
+                columns[col], is_null = _lookup_codes(values, binary_tables[col])
+                null_count += is_null
+            elif col == TARGET_COL and values.dtype == "object":
+                columns[col], is_null = _lookup_codes(values, churn_table)
+                null_count += is_null
+                churn_encoded = True
+            elif col == "TotalCharges":
+                total = pd.to_numeric(values, errors="coerce").astype(np.float64).to_numpy()
+                # Only entries that failed to parse can be missing in the input
+                unparsed = np.flatnonzero(np.isnan(total))
+                null_count[unparsed] += values.iloc[unparsed].isna().to_numpy()
+                columns[col] = total
+            elif values.dtype == "object":
+                deferred_null_checks.append(col)
+                if col != "customerID":
+                    columns[col] = values
+            else:
+                null_count += values.isna().to_numpy()
+                if col != "customerID":
+                    columns[col] = _as_preprocessed_numeric(values)
+
+        # Drop rows that are (almost) entirely missing, as check_rows does
+        drop_at = ROW_NULL_THRESHOLD * max(n_columns, 1)
+        candidates = np.flatnonzero(null_count + len(deferred_null_checks) >= drop_at)
+        if len(candidates):
+            for col in deferred_null_checks:
+                null_count[candidates] += df[col].iloc[candidates].isna().to_numpy()
+
+        index = df.index
+        drop = null_count / max(n_columns, 1) >= ROW_NULL_THRESHOLD
+        if drop.any():
+            print(
+                f"Dropped {int(drop.sum())} rows with "
+                f"≥{ROW_NULL_THRESHOLD:.0%} missing values"
+            )
+            keep = ~drop
+            index = index[keep]
+            columns = {
+                col: values[keep] if isinstance(values, np.ndarray) else values.loc[keep]
+                for col, values in columns.items()
+            }
+
+        if churn_encoded and np.isnan(columns[TARGET_COL]).any():
+            raise ValueError("Unexpected values found in Churn column")
+
+        if "TotalCharges" in columns:
+            total = columns["TotalCharges"]
+            missing = np.isnan(total)
+            if missing.any() and not missing.all():
+                # Median of the kept rows, like fillna(median()) in preprocess_data
+                total = total.copy()
+                total[missing] = np.median(total[~missing])
+                columns["TotalCharges"] = total
+
+        # Derived features from the already-converted tenure / TotalCharges
+        tenure = np.asarray(columns["tenure"], dtype=np.float64)
+        columns["tenure_bucket"] = pd.Categorical.from_codes(
+            _tenure_bucket_codes(tenure), dtype=bucket_dtype
+        )
+        columns["is_new_customer"] = (tenure <= NEW_CUSTOMER_MAX_TENURE).astype(int)
+        columns["charges_per_month"] = np.asarray(columns["TotalCharges"]) / (tenure + 1)
+
+        return pd.DataFrame(columns, index=index)
+
+    return encode_frame
+
+
+encode_frame = compile_frame_encoder()
@@ -71,6 +71,19 @@ RAW_CATEGORICAL_DOMAINS = {
     "Churn": {"Yes", "No"},
 }
 
+# Numeric columns in the raw dataset (TotalCharges is stored as text)
+RAW_NUMERIC_COLUMNS = ["tenure", "MonthlyCharges", "TotalCharges"]
+
+# Raw service values that preprocessing collapses to "No"
+RAW_VALUE_ALIASES = {
+    "No internet service": "No",
+    "No phone service": "No",
+}
+
+# Encodings applied to binary columns during preprocessing
+BINARY_VALUE_ENCODING = {"No": 0, "Yes": 1}
+GENDER_VALUE_ENCODING = {"Female": 0, "Male": 1}
+
 # =============================================================================
 # Feature Schema (after preprocessing + feature engineering)
 # =============================================================================
@@ -109,6 +122,13 @@ NUMERIC_FEATURES = [
     "charges_per_month", 
 ]
 
+# Tenure buckets derived in build_features (right-inclusive, lowest included)
+TENURE_BUCKET_BINS = [0, 6, 12, 24, 48, 72]
+TENURE_BUCKET_LABELS = ["0-6", "6-12", "12-24", "24-48", "48+"]
+
+# Customers with tenure at or below this many months are flagged as new
+NEW_CUSTOMER_MAX_TENURE = 6
+
 # Logical grouping of all expected model input columns (excluding target).
 # NOTE: This is NOT the final model matrix order after one-hot encoding.
 ALL_FEATURE_COLUMNS = (
@@ -0,0 +1,609 @@
+"""
+Compile a fitted churn Pipeline into a self-contained numpy scorer.
+
+The training pipelines are `ColumnTransformer` (OneHotEncoder +
+SimpleImputers) -> optional `StandardScaler` -> classifier. At serving time
+most of their cost is sklearn/pandas overhead rather than arithmetic, so the
+fitted pieces are flattened into plain arrays:
+
+- logistic regression: the one-hot encoding and the scaler are folded into
+  the weights, leaving one lookup per categorical plus one dot product
+- random forest / XGBoost: every tree is flattened into shared node tables
+  and all trees are walked together, level by level, with numpy gathers
+
+The scorer takes model input rows in `ALL_FEATURE_COLUMNS` order (what
+`features.encoder.encode_row` produces) and is saved as a single `.npz`
+file next to the MLflow model.
+"""
+import json
+import math
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from churn_project_folder.features.schema import ALL_FEATURE_COLUMNS
+
+FORMAT_VERSION = 1
+
+# Rows scored per tree-walk step; bounds the (rows x trees) node matrix
+TREE_ROW_CHUNK = 2048
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def _compile_preprocessor(
+    ct: ColumnTransformer, input_columns: Sequence[str]
+) -> Dict[str, Any]:
+    if getattr(ct, "sparse_output_", False):
+        raise ValueError(
+            "Sparse ColumnTransformer output is not supported; zeros would "
+            "be treated as missing by tree models"
+        )
+
+    input_columns = list(input_columns)
+    unknown = set(map(str, ct.feature_names_in_)) - set(input_columns)
+    if unknown:
+        raise ValueError(f"Pipeline expects columns outside the scorer input: {unknown}")
+
+    categorical, numeric_positions, numeric_fill, numeric_outputs = [], [], [], []
+    n_outputs = 0
+
+    for name, transformer, columns in ct.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        positions = [input_columns.index(col) for col in columns]
+
+        if isinstance(transformer, OneHotEncoder):
+            if getattr(transformer, "infrequent_categories_", None) is not None and any(
+                cats is not None for cats in transformer.infrequent_categories_
+            ):
+                raise ValueError("Infrequent category grouping is not supported")
+
+            drop_idx = transformer.drop_idx_
+            for i, (position, categories) in enumerate(
+                zip(positions, transformer.categories_)
+            ):
+                dropped = None if drop_idx is None else drop_idx[i]
+                values, outputs, missing_output = [], [], -1
+                for j, category in enumerate(categories):
+                    output = -1 if dropped is not None and j == dropped else n_outputs
+                    if output >= 0:
+                        n_outputs += 1
+                    if _is_missing(category):
+                        missing_output = output
+                    else:
+                        values.append(category.item() if isinstance(category, np.generic) else category)
+                        outputs.append(output)
+                categorical.append({
+                    "position": position,
+                    "values": values,
+                    "outputs": outputs,
+                    "missing_output": missing_output,
+                })
+
+        elif isinstance(transformer, SimpleImputer):
+            if transformer.add_indicator:
+                raise ValueError("SimpleImputer(add_indicator=True) is not supported")
+            if not _is_missing(transformer.missing_values):
+                raise ValueError("Only NaN missing_values are supported")
+
+            keep_empty = getattr(transformer, "keep_empty_features", False)
+            for position, fill in zip(positions, transformer.statistics_):
+                # Columns that were all-NaN during fit are dropped by sklearn
+                if _is_missing(fill) and not keep_empty:
+                    continue
+                numeric_positions.append(position)
+                numeric_fill.append(0.0 if _is_missing(fill) else float(fill))
+                numeric_outputs.append(n_outputs)
+                n_outputs += 1
+
+        elif transformer == "passthrough":
+            for position in positions:
+                numeric_positions.append(position)
+                numeric_fill.append(math.nan)
+                numeric_outputs.append(n_outputs)
+                n_outputs += 1
+
+        else:
+            raise ValueError(
+                f"Unsupported transformer '{name}': {type(transformer).__name__}"
+            )
+
+    return {
+        "input_columns": input_columns,
+        "categorical": categorical,
+        "numeric_positions": numeric_positions,
+        "numeric_fill": numeric_fill,
+        "numeric_outputs": numeric_outputs,
+        "n_outputs": n_outputs,
+    }
+
+
+def _compile_scaler(scaler: Optional[StandardScaler], n_outputs: int):
+    shift = np.zeros(n_outputs)
+    scale = np.ones(n_outputs)
+    if scaler is not None:
+        if scaler.with_mean:
+            shift = np.asarray(scaler.mean_, dtype=np.float64)
+        if scaler.with_std:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+    return shift, scale
+
+
+def _compile_linear(clf: LogisticRegression, shift, scale) -> Dict[str, np.ndarray]:
+    if clf.coef_.shape[0] != 1:
+        raise ValueError("Only binary logistic regression is supported")
+
+    # (x - shift) / scale . w + b  ==  x . (w / scale) + (b - shift . w / scale)
+    weights = clf.coef_[0] / scale
+    intercept = float(clf.intercept_[0] - np.dot(shift, weights))
+
+    # Trailing zero weight absorbs unknown / dropped categories (index -1)
+    return {
+        "weights": np.append(weights, 0.0),
+        "intercept": np.array([intercept]),
+    }
+
+
+def _pack_trees(trees: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    # Concatenate per-tree node tables; child indices become global
+    roots, offset = [], 0
+    columns = {key: [] for key in ("feature", "threshold", "left", "right", "default_left", "value")}
+
+    for tree in trees:
+        n_nodes = len(tree["left"])
+        roots.append(offset)
+        is_leaf = tree["left"] < 0
+        columns["feature"].append(np.where(is_leaf, 0, tree["feature"]))
+        columns["threshold"].append(tree["threshold"])
+        columns["left"].append(np.where(is_leaf, -1, tree["left"] + offset))
+        columns["right"].append(np.where(is_leaf, -1, tree["right"] + offset))
+        columns["default_left"].append(tree["default_left"])
+        columns["value"].append(tree["value"])
+        offset += n_nodes
+
+    packed = {
+        "tree_" + key: np.concatenate(values)
+        for key, values in columns.items()
+    }
+    packed["tree_feature"] = packed["tree_feature"].astype(np.int32)
+    packed["tree_left"] = packed["tree_left"].astype(np.int32)
+    packed["tree_right"] = packed["tree_right"].astype(np.int32)
+    packed["tree_default_left"] = packed["tree_default_left"].astype(bool)
+    packed["tree_threshold"] = packed["tree_threshold"].astype(np.float64)
+    packed["tree_value"] = packed["tree_value"].astype(np.float64)
+    packed["tree_roots"] = np.asarray(roots, dtype=np.int32)
+    return packed
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=np.int64)
+    max_depth = 0
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+            max_depth = max(max_depth, depth[node] + 1)
+    return max_depth
+
+
+def _compile_random_forest(clf: RandomForestClassifier):
+    if len(clf.classes_) != 2:
+        raise ValueError("Only binary random forests are supported")
+
+    trees, max_depth = [], 0
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        totals = counts.sum(axis=1)
+        trees.append({
+            "feature": tree.feature,
+            "threshold": tree.threshold,
+            "left": tree.children_left,
+            "right": tree.children_right,
+            "default_left": getattr(
+                tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool)
+            ).astype(bool),
+            "value": np.divide(counts[:, 1], totals, out=np.zeros_like(totals), where=totals > 0),
+        })
+        max_depth = max(max_depth, tree.max_depth)
+
+    return _pack_trees(trees), {"max_depth": int(max_depth), "aggregate": "mean", "split": "le"}
+
+
+def _parse_base_score(raw: Any) -> float:
+    # Stored as e.g. "5E-1" or, in newer XGBoost releases, "[5E-1]"
+    if isinstance(raw, str):
+        raw = raw.strip().strip("[]").split(",")[0]
+    return float(raw)
+
+
+def _compile_xgboost(clf):
+    booster = clf.get_booster()
+    model = json.loads(booster.save_raw(raw_format="json"))
+    learner = model["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported XGBoost objective '{objective}'")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Unsupported XGBoost booster '{gbm['name']}'")
+
+    raw_trees = gbm["model"]["trees"]
+
+    # Respect early stopping the same way XGBClassifier.predict_proba does
+    try:
+        best_iteration = clf.best_iteration
+    except AttributeError:
+        best_iteration = None
+    if best_iteration is not None:
+        raw_trees = raw_trees[: best_iteration + 1]
+
+    trees, max_depth = [], 0
+    for raw in raw_trees:
+        left = np.asarray(raw["left_children"], dtype=np.int64)
+        right = np.asarray(raw["right_children"], dtype=np.int64)
+        conditions = np.asarray(raw["split_conditions"], dtype=np.float32).astype(np.float64)
+        is_leaf = left < 0
+        trees.append({
+            "feature": np.asarray(raw["split_indices"], dtype=np.int64),
+            "threshold": conditions,
+            "left": left,
+            "right": right,
+            "default_left": np.asarray(raw["default_left"], dtype=bool),
+            # Leaf nodes keep their output in split_conditions
+            "value": np.where(is_leaf, conditions, 0.0),
+        })
+        max_depth = max(max_depth, _tree_depth(left, right))
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    base_margin = math.log(base_score / (1.0 - base_score))
+
+    return _pack_trees(trees), {
+        "max_depth": int(max_depth),
+        "aggregate": "sigmoid_sum",
+        "split": "lt",
+        "base_margin": base_margin,
+    }
+
+
+def compile_pipeline(
+    pipeline,
+    source_model_uuid: Optional[str] = None,
+    input_columns: Sequence[str] = ALL_FEATURE_COLUMNS,
+) -> "CompiledScorer":
+    """
+    Compile a fitted churn Pipeline into a `CompiledScorer`.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Fitted pipeline: ColumnTransformer, optional StandardScaler, classifier.
+    source_model_uuid : str, optional
+        MLflow `model_uuid` of the pipeline, used to detect stale artifacts.
+    input_columns : sequence of str
+        Column order of the rows the scorer will receive.
+    """
+    steps = [step for _, step in pipeline.steps]
+    preprocessor, classifier = steps[0], steps[-1]
+    middle = steps[1:-1]
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError("First pipeline step must be a ColumnTransformer")
+    if len(middle) > 1 or (middle and not isinstance(middle[0], StandardScaler)):
+        raise ValueError("Only an optional StandardScaler may sit between preprocessor and classifier")
+    scaler = middle[0] if middle else None
+
+    meta = _compile_preprocessor(preprocessor, input_columns)
+    shift, scale = _compile_scaler(scaler, meta["n_outputs"])
+    meta["format_version"] = FORMAT_VERSION
+    meta["source_model_uuid"] = source_model_uuid
+
+    if isinstance(classifier, LogisticRegression):
+        meta["kind"] = "linear"
+        arrays = _compile_linear(classifier, shift, scale)
+    else:
+        if isinstance(classifier, RandomForestClassifier):
+            arrays, tree_meta = _compile_random_forest(classifier)
+        elif type(classifier).__name__ == "XGBClassifier":
+            arrays, tree_meta = _compile_xgboost(classifier)
+        else:
+            raise ValueError(
+                f"Unsupported classifier: {type(classifier).__name__}"
+            )
+        meta["kind"] = "trees"
+        meta.update(tree_meta)
+        arrays["shift"] = shift
+        arrays["scale"] = scale
+        meta["has_scaler"] = scaler is not None
+
+    return CompiledScorer(meta, arrays)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+class CompiledScorer:
+    """
+    Numpy-only churn scorer compiled from a fitted Pipeline.
+    """
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+        self.kind = meta["kind"]
+        self.input_columns = meta["input_columns"]
+        self.source_model_uuid = meta.get("source_model_uuid")
+
+        self._categorical = [
+            (
+                spec["position"],
+                dict(zip(spec["values"], spec["outputs"])),
+                spec["missing_output"],
+            )
+            for spec in meta["categorical"]
+        ]
+        self._numeric_positions = np.asarray(meta["numeric_positions"], dtype=np.intp)
+        self._numeric_fill = np.asarray(meta["numeric_fill"], dtype=np.float64)
+        self._numeric_outputs = np.asarray(meta["numeric_outputs"], dtype=np.intp)
+
+        if self.kind == "linear":
+            weights = arrays["weights"]
+            self._numeric_weights = weights[self._numeric_outputs]
+            # Categorical value -> weight, so one-hot never materializes
+            self._categorical = [
+                (position, {v: weights[o] for v, o in lookup.items()},
+                 0.0 if missing < 0 else weights[missing])
+                for position, lookup, missing in self._categorical
+            ]
+
+    # --------------------------------------------------
+    # Input handling
+    # --------------------------------------------------
+
+    def _as_matrix(self, rows) -> np.ndarray:
+        data = rows if isinstance(rows, np.ndarray) else np.asarray(rows, dtype=object)
+        if data.ndim != 2 or data.shape[1] != len(self.input_columns):
+            raise ValueError(
+                f"Expected rows with {len(self.input_columns)} columns "
+                f"in {self.input_columns} order"
+            )
+        return data
+
+    def _numeric_block(self, data: np.ndarray) -> np.ndarray:
+        numeric = data[:, self._numeric_positions].astype(np.float64)
+        # The Pipeline's imputer rejects infinities (e.g. charges_per_month
+        # at tenure -1); fail the same way instead of returning a score
+        if np.isinf(numeric).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float64').")
+        return np.where(np.isnan(numeric), self._numeric_fill, numeric)
+
+    @staticmethod
+    def _lookup(column: np.ndarray, lookup: Dict, missing, unknown, dtype) -> np.ndarray:
+        return np.fromiter(
+            (
+                missing if _is_missing(value) else lookup.get(value, unknown)
+                for value in column
+            ),
+            dtype=dtype,
+            count=len(column),
+        )
+
+    # --------------------------------------------------
+    # Model kinds
+    # --------------------------------------------------
+
+    def _linear_margin(self, data: np.ndarray) -> np.ndarray:
+        margin = self._numeric_block(data) @ self._numeric_weights
+        margin += self.arrays["intercept"][0]
+        for position, lookup, missing_weight in self._categorical:
+            margin += self._lookup(data[:, position], lookup, missing_weight, 0.0, np.float64)
+        return margin
+
+    def _dense_features(self, data: np.ndarray) -> np.ndarray:
+        n_rows, n_outputs = len(data), self.meta["n_outputs"]
+        # One spare column receives the (ignored) -1 one-hot index
+        features = np.zeros((n_rows, n_outputs + 1))
+        rows = np.arange(n_rows)
+
+        for position, lookup, missing in self._categorical:
+            index = self._lookup(data[:, position], lookup, missing, -1, np.intp)
+            features[rows, index] = 1.0
+        features[:, self._numeric_outputs] = self._numeric_block(data)
+
+        features = features[:, :n_outputs]
+        if self.meta.get("has_scaler"):
+            features = (features - self.arrays["shift"]) / self.arrays["scale"]
+        # Both sklearn and XGBoost trees split on float32 inputs
+        return features.astype(np.float32).astype(np.float64)
+
+    def _walk_trees(self, features: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        feature, threshold = a["tree_feature"], a["tree_threshold"]
+        left, right, default_left = a["tree_left"], a["tree_right"], a["tree_default_left"]
+        roots, values = a["tree_roots"], a["tree_value"]
+        strict = self.meta["split"] == "lt"
+        n_trees, n_features = len(roots), features.shape[1]
+
+        totals = np.empty(len(features))
+        for start in range(0, len(features), TREE_ROW_CHUNK):
+            chunk = features[start:start + TREE_ROW_CHUNK]
+            flat = chunk.ravel()
+
+            # One entry per (row, tree); only entries still at an internal
+            # node are carried to the next level
+            nodes = np.tile(roots, len(chunk))
+            row_offset = np.repeat(np.arange(len(chunk)) * n_features, n_trees)
+            active = np.arange(len(nodes))
+
+            while active.size:
+                current = nodes[active]
+                node_left = left[current]
+                internal = node_left >= 0
+                active, current, node_left = active[internal], current[internal], node_left[internal]
+                if not active.size:
+                    break
+
+                x = flat[row_offset[active] + feature[current]]
+                thr = threshold[current]
+                go_left = (x < thr) if strict else (x <= thr)
+                go_left = np.where(np.isnan(x), default_left[current], go_left)
+                nodes[active] = np.where(go_left, node_left, right[current])
+
+            totals[start:start + len(chunk)] = values[nodes].reshape(len(chunk), n_trees).sum(axis=1)
+
+        if self.meta["aggregate"] == "mean":
+            return totals / n_trees
+        return totals + self.meta["base_margin"]
+
+    def predict_proba(self, rows) -> np.ndarray:
+        """
+        Churn probability (class 1) for each row.
+
+        Parameters
+        ----------
+        rows : sequence of sequences or 2D ndarray
+            Model input rows in `input_columns` order.
+        """
+        data = self._as_matrix(rows)
+        if len(data) == 0:
+            return np.empty(0)
+
+        if self.kind == "linear":
+            return 1.0 / (1.0 + np.exp(-self._linear_margin(data)))
+
+        scores = self._walk_trees(self._dense_features(data))
+        if self.meta["aggregate"] == "mean":
+            return scores
+        return 1.0 / (1.0 + np.exp(-scores))
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Uncompressed: loading is a straight read, no inflate step
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **self.arrays)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "CompiledScorer":
+        with np.load(Path(path), allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            arrays = {key: npz[key] for key in npz.files if key != "meta"}
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported compiled scorer format {meta.get('format_version')}"
+            )
+        return cls(meta, arrays)
+
+
+# ---------------------------------------------------------------------------
+# Parity and comparison report
+# ---------------------------------------------------------------------------
+
+def _time_per_call(fn, repeats: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats
+
+
+def compare_with_pipeline(
+    pipeline,
+    scorer: CompiledScorer,
+    rows: Sequence[Sequence[Any]],
+    frame,
+    atol: float = 1e-6,
+    batch_sizes: Sequence[int] = (1, 100, 1000),
+) -> Dict[str, Any]:
+    """
+    Check the scorer against `pipeline.predict_proba` and compare cost.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        The fitted pipeline the scorer was compiled from.
+    scorer : CompiledScorer
+        Compiled scorer to check.
+    rows : sequence of rows
+        Model input rows in `scorer.input_columns` order.
+    frame : pd.DataFrame
+        The same rows as a DataFrame, as the pipeline expects them.
+    atol : float
+        Largest tolerated absolute probability difference.
+
+    Returns
+    -------
+    dict
+        Parity result, per-batch-size latency for both scorers and the
+        serialized sizes.
+    """
+    expected = pipeline.predict_proba(frame)[:, 1]
+    actual = scorer.predict_proba(rows)
+    max_abs_diff = float(np.max(np.abs(expected - actual))) if len(rows) else 0.0
+
+    latency = {}
+    for batch_size in batch_sizes:
+        batch_rows = list(rows[:batch_size])
+        batch_frame = frame.iloc[:batch_size]
+        repeats = max(3, 200 // batch_size)
+        latency[batch_size] = {
+            "pipeline_ms": 1000 * _time_per_call(
+                lambda: pipeline.predict_proba(batch_frame), repeats
+            ),
+            "compiled_ms": 1000 * _time_per_call(
+                lambda: scorer.predict_proba(batch_rows), repeats
+            ),
+        }
+
+    compiled_bytes = sum(array.nbytes for array in scorer.arrays.values())
+    compiled_bytes += len(json.dumps(scorer.meta))
+
+    return {
+        "kind": scorer.kind,
+        "n_rows": len(rows),
+        "max_abs_diff": max_abs_diff,
+        "parity_ok": max_abs_diff <= atol,
+        "latency": latency,
+        "pipeline_bytes": len(pickle.dumps(pipeline)),
+        "compiled_bytes": compiled_bytes,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Compiled scorer ({report['kind']}) vs Pipeline on {report['n_rows']} rows",
+        f"  parity: max |diff| = {report['max_abs_diff']:.3e} "
+        f"({'OK' if report['parity_ok'] else 'FAILED'})",
+        f"  size:   pipeline {report['pipeline_bytes'] / 1024:.1f} KiB, "
+        f"compiled {report['compiled_bytes'] / 1024:.1f} KiB",
+        "  latency per call:",
+    ]
+    for batch_size, timing in report["latency"].items():
+        speedup = timing["pipeline_ms"] / timing["compiled_ms"] if timing["compiled_ms"] else math.inf
+        lines.append(
+            f"    batch {batch_size:>5}: pipeline {timing['pipeline_ms']:.3f} ms, "
+            f"compiled {timing['compiled_ms']:.3f} ms ({speedup:.1f}x)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""
+Parallel stratified k-fold cross-validation.
+
+The preprocessor is fitted and applied once; folds then fit only the
+classifier head on row subsets of the shared encoded matrix. Folds run in
+joblib (loky) workers, which receive the encoded matrix as a read-only
+memory map instead of a pickled copy, plus their own train/test indices.
+
+Fitting the preprocessor on all rows is not a label leak: it only learns
+the one-hot category sets and the imputation medians/modes.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from churn_project_folder.models.evaluate import compute_metrics
+from churn_project_folder.models.tracking import log_metrics
+
+DEFAULT_CV_FOLDS = 5
+
+# Arrays above this size are memory-mapped into fold workers
+SHARED_ARRAY_MIN_BYTES = "1M"
+
+# Classifiers whose own `n_jobs` is capped to the fold's thread budget
+THREADED_CLASSIFIERS = {"RandomForestClassifier", "XGBClassifier"}
+
+
+def _fold_threads(n_jobs: int) -> Optional[int]:
+    if n_jobs <= 1:
+        return None
+    return max(1, (os.cpu_count() or 1) // n_jobs)
+
+
+def _fit_fold(head: Pipeline, Xt, y: np.ndarray, train_idx, test_idx, n_threads) -> Dict[str, float]:
+    head = clone(head)
+    classifier = head.steps[-1][1]
+    if n_threads is not None and type(classifier).__name__ in THREADED_CLASSIFIERS:
+        classifier.set_params(n_jobs=n_threads)
+
+    with threadpool_limits(limits=n_threads):
+        started = time.perf_counter()
+        head.fit(Xt[train_idx], y[train_idx])
+        fitted = time.perf_counter()
+        proba = head.predict_proba(Xt[test_idx])[:, 1]
+        scored = time.perf_counter()
+
+    result = compute_metrics(y[test_idx], proba)
+    result["fit_seconds"] = fitted - started
+    result["score_seconds"] = scored - fitted
+    return result
+
+
+def cross_validate_encoded(
+    head: Pipeline,
+    Xt,
+    y,
+    cv_folds: int = DEFAULT_CV_FOLDS,
+    n_jobs: Optional[int] = None,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Cross-validate a classifier head on an already encoded matrix.
+
+    Parameters
+    ----------
+    head : Pipeline
+        Unfitted steps after the preprocessor (cloned for every fold).
+    Xt : array or sparse matrix
+        Encoded features, shared by all folds.
+    y : array-like
+        Binary target.
+    cv_folds : int
+        Number of stratified folds.
+    n_jobs : int, optional
+        Folds fitted in parallel; defaults to one per fold, capped at the
+        CPU count. Each fold gets `cpu_count // n_jobs` threads.
+    random_state : int
+        Seed of the fold shuffle.
+
+    Returns
+    -------
+    dict
+        `mean` and `std` of every metric across folds, the per-fold
+        metrics and timings (`folds`), and the total wall time (`seconds`).
+    """
+    y = np.asarray(y)
+    if n_jobs is None:
+        n_jobs = min(cv_folds, os.cpu_count() or 1)
+    n_threads = _fold_threads(n_jobs)
+
+    folds = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state)
+
+    started = time.perf_counter()
+    fold_results: List[Dict[str, float]] = Parallel(
+        n_jobs=n_jobs,
+        backend="loky",
+        max_nbytes=SHARED_ARRAY_MIN_BYTES,
+        mmap_mode="r",
+    )(
+        delayed(_fit_fold)(head, Xt, y, train_idx, test_idx, n_threads)
+        for train_idx, test_idx in folds.split(np.zeros(len(y)), y)
+    )
+    seconds = time.perf_counter() - started
+
+    table = pd.DataFrame(fold_results)
+    return {
+        "mean": table.mean().to_dict(),
+        "std": table.std(ddof=0).to_dict(),
+        "folds": fold_results,
+        "seconds": seconds,
+        "n_jobs": n_jobs,
+    }
+
+
+def cross_validate(
+    model: Pipeline,
+    X: pd.DataFrame,
+    y,
+    cv_folds: int = DEFAULT_CV_FOLDS,
+    n_jobs: Optional[int] = None,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Cross-validate a registry Pipeline (fitted or not) on raw feature rows.
+
+    The model's preprocessor is cloned, fitted on `X` and applied once; see
+    `cross_validate_encoded` for the parameters and result.
+    """
+    preprocessor = clone(model.steps[0][1])
+    Xt = preprocessor.fit_transform(X)
+    head = Pipeline(model.steps[1:])
+    return cross_validate_encoded(
+        head, Xt, y, cv_folds=cv_folds, n_jobs=n_jobs, random_state=random_state
+    )
+
+
+def cv_metrics(result: Dict[str, Any], metric_names=None) -> Dict[str, float]:
+    """
+    Flat `{metric: mean, metric_std: std}` dict from a CV result.
+    """
+    metric_names = metric_names or [
+        name for name in result["mean"] if not name.endswith("_seconds")
+    ]
+    metrics = {}
+    for name in metric_names:
+        metrics[name] = result["mean"][name]
+        metrics[f"{name}_std"] = result["std"][name]
+    return metrics
+
+
+def log_cv_result(result: Dict[str, Any], prefix: str = "cv_") -> None:
+    """
+    Log CV means/stds (as `<prefix><metric>[_std]`) and per-fold timings
+    (`cv_fold_*_seconds`, one step per fold) to the active MLflow run.
+    """
+    summary = {
+        f"{prefix}{name}": value for name, value in cv_metrics(result).items()
+    }
+    summary["cv_seconds"] = result["seconds"]
+    log_metrics(summary)
+
+    for step, fold in enumerate(result["folds"]):
+        log_metrics(
+            {
+                "cv_fold_fit_seconds": fold["fit_seconds"],
+                "cv_fold_score_seconds": fold["score_seconds"],
+            },
+            step=step,
+        )
+
+
+def print_cv_result(result: Dict[str, Any]) -> None:
+    n_folds = len(result["folds"])
+    print(
+        f"{n_folds}-fold CV ({result['n_jobs']} parallel job(s), "
+        f"{result['seconds']:.2f}s):"
+    )
+    for name, value in cv_metrics(result).items():
+        if not name.endswith("_std"):
+            print(f"  {name}: {value:.4f} ± {result['std'][name]:.4f}")
+    fit_times = ", ".join(f"{fold['fit_seconds']:.2f}" for fold in result["folds"])
+    print(f"  fold fit seconds: {fit_times}")
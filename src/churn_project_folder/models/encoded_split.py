@@ -0,0 +1,192 @@
+"""
+Trial-invariant data for hyperparameter search.
+
+Between Optuna trials only the classifier hyperparameters change, yet
+`train_model` re-splits the data and refits the OneHotEncoder and imputers
+every time. `EncodedSplit` does that work once per study: it holds the
+train/test split, the fitted preprocessor and the encoded matrices, and
+lazily builds XGBoost `QuantileDMatrix` objects for the native training API.
+Trials then fit only the classifier head (`fit_head`), and `fit_head` still
+returns a full Pipeline, identical to what `train_model` would build.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from churn_project_folder.features.schema import TARGET_COL
+from churn_project_folder.models.model_registry import get_model_builder
+from churn_project_folder.models.train import build_preprocessor, split_features
+
+
+class EncodedSplit:
+    """
+    Split and preprocessed matrices shared by all trials of a study.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Feature frame (output of `build_features`) including the target.
+    target_col, test_size, random_state
+        Same meaning and defaults as in `train_model`, so scores are
+        comparable with a regular training run.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        target_col: str = TARGET_COL,
+        test_size: float = 0.2,
+        random_state: int = 42,
+    ):
+        self.X_train, self.X_test, self.y_train, self.y_test = split_features(
+            df,
+            target_col=target_col,
+            test_size=test_size,
+            random_state=random_state,
+        )
+
+        self.preprocessor = build_preprocessor(self.X_train.columns)
+        self.Xt_train = self.preprocessor.fit_transform(self.X_train)
+        self.Xt_test = self.preprocessor.transform(self.X_test)
+
+        self.random_state = random_state
+        self._xgb_matrices = None
+        self._xgb_validation_matrices = {}
+
+    # ------------------------------------------------------------------
+    # Pickling: DMatrix handles stay process-local
+    # ------------------------------------------------------------------
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_xgb_matrices"] = None
+        state["_xgb_validation_matrices"] = {}
+        return state
+
+    # ------------------------------------------------------------------
+    # Classifier heads
+    # ------------------------------------------------------------------
+
+    def build_pipeline(self, model_name: str, **model_params) -> Pipeline:
+        """
+        Registry Pipeline around the already-fitted shared preprocessor.
+        """
+        return get_model_builder(model_name)(self.preprocessor, **model_params)
+
+    def fit_head(self, model_name: str, **model_params) -> Pipeline:
+        """
+        Fit every step after the preprocessor on the encoded train matrix.
+
+        Returns the full Pipeline; its preprocessor is the shared, already
+        fitted one, so it can be scored on raw feature frames as usual.
+        """
+        pipeline = self.build_pipeline(model_name, **model_params)
+        head = Pipeline(pipeline.steps[1:])
+        head.fit(self.Xt_train, self.y_train)
+        return pipeline
+
+    def cross_validate_head(
+        self,
+        model_name: str,
+        cv_folds: int,
+        cv_n_jobs: Optional[int] = None,
+        **model_params,
+    ) -> Dict[str, Any]:
+        """
+        Stratified k-fold CV of the head on the encoded train matrix.
+
+        Folds share `Xt_train` (memory-mapped into workers) and run in
+        `cv_n_jobs` parallel jobs; see `cross_validate_encoded` for the
+        result layout.
+        """
+        from churn_project_folder.models.cross_validation import cross_validate_encoded
+
+        pipeline = self.build_pipeline(model_name, **model_params)
+        return cross_validate_encoded(
+            Pipeline(pipeline.steps[1:]),
+            self.Xt_train,
+            self.y_train,
+            cv_folds=cv_folds,
+            n_jobs=cv_n_jobs,
+            random_state=self.random_state,
+        )
+
+    def predict_proba_head(self, pipeline: Pipeline, X: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Churn probabilities from the head only, on encoded rows (test by default).
+        """
+        X = self.Xt_test if X is None else X
+        return Pipeline(pipeline.steps[1:]).predict_proba(X)[:, 1]
+
+    # ------------------------------------------------------------------
+    # XGBoost native API
+    # ------------------------------------------------------------------
+
+    def xgb_matrices(self):
+        """
+        (train, test) `QuantileDMatrix` pair, built once per process.
+
+        The test matrix reuses the train matrix's quantile cuts.
+        """
+        if self._xgb_matrices is None:
+            import xgboost as xgb
+
+            dtrain = xgb.QuantileDMatrix(self.Xt_train, self.y_train)
+            dtest = xgb.QuantileDMatrix(self.Xt_test, self.y_test, ref=dtrain)
+            self._xgb_matrices = (dtrain, dtest)
+        return self._xgb_matrices
+
+    def xgb_validation_matrices(self, validation_size: float = 0.2):
+        """
+        (fit, valid, test) `QuantileDMatrix` triple for early stopping.
+
+        The validation rows are a stratified slice of the training split, so
+        the test split is never used to pick the number of boosting rounds.
+        """
+        if validation_size not in self._xgb_validation_matrices:
+            import xgboost as xgb
+
+            X_fit, X_valid, y_fit, y_valid = train_test_split(
+                self.Xt_train,
+                self.y_train,
+                test_size=validation_size,
+                stratify=self.y_train,
+                random_state=self.random_state,
+            )
+            dfit = xgb.QuantileDMatrix(X_fit, y_fit)
+            dvalid = xgb.QuantileDMatrix(X_valid, y_valid, ref=dfit)
+            dtest = xgb.QuantileDMatrix(self.Xt_test, self.y_test, ref=dfit)
+            self._xgb_validation_matrices[validation_size] = (dfit, dvalid, dtest)
+        return self._xgb_validation_matrices[validation_size]
+
+    def xgb_train_params(self, **model_params) -> Dict[str, Any]:
+        """
+        Booster params and round count equivalent to the registry XGBClassifier.
+        """
+        classifier = self.build_pipeline("xgboost", **model_params).steps[-1][1]
+        params = {
+            key: value
+            for key, value in classifier.get_xgb_params().items()
+            if value is not None
+        }
+        return {"params": params, "num_boost_round": classifier.n_estimators}
+
+    def fit_xgboost_booster(self, **model_params):
+        """
+        Train a booster on the cached `QuantileDMatrix`.
+
+        Gives the same model as fitting the registry XGBClassifier with
+        `model_params`, without rebuilding the training matrix.
+        """
+        import xgboost as xgb
+
+        dtrain, _ = self.xgb_matrices()
+        config = self.xgb_train_params(**model_params)
+        return xgb.train(config["params"], dtrain, num_boost_round=config["num_boost_round"])
+
+    def predict_proba_booster(self, booster) -> np.ndarray:
+        _, dtest = self.xgb_matrices()
+        return booster.predict(dtest)
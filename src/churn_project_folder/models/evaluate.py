@@ -1,30 +1,73 @@
-import mlflow
-from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.metrics import (
-    accuracy_score,
-    recall_score,
-    precision_score,
-    roc_auc_score,
+from churn_project_folder.models.metrics import (
+    MetricsAccumulator,
+    binary_metrics,
+    format_report,
+    scalar_metrics,
 )
+from churn_project_folder.models.tracking import log_metrics
+from churn_project_folder.utils.profiling import profile_stage
 
 
-def evaluate_model(model, X_test, y_test):
+@profile_stage("evaluate")
+def evaluate_model(model, X_test, y_test, chunk_size=None, full=False):
     """
     Evaluate a trained model and log metrics to MLflow.
+
+    The model is run once (`predict_proba`); every metric is derived from
+    that probability vector. With `chunk_size`, the test set is scored
+    `chunk_size` rows at a time and the metrics are accumulated, so the
+    preprocessed features of the whole set are never held at once (see
+    `evaluate_chunks` for test sets that do not fit in memory at all).
+
+    Cross-validation of a configuration belongs to training
+    (`train_model(..., cv_folds=k)`, logged as `cv_<metric>`).
+
+    Returns the logged scalar metrics, or with `full=True` everything from
+    `binary_metrics` (confusion matrix and threshold sweep included).
     """
+    if chunk_size:
+        chunks = (
+            (X_test.iloc[start:start + chunk_size], y_test.iloc[start:start + chunk_size])
+            for start in range(0, len(X_test), chunk_size)
+        )
+        return evaluate_chunks(model, chunks, full=full)
 
-    preds = model.predict(X_test)
     proba = model.predict_proba(X_test)[:, 1]
-    print("Classification Report:\n", classification_report(y_test, preds))
-    print("Confusion Matrix:\n", confusion_matrix(y_test, preds))
-    metrics = {
-        "accuracy": accuracy_score(y_test, preds),
-        "recall": recall_score(y_test, preds),
-        "precision": precision_score(y_test, preds),
-        "roc_auc": roc_auc_score(y_test, proba),
-    }
-
-    for name, value in metrics.items():
-        mlflow.log_metric(name, value)
-
-    return metrics
+    return evaluate_proba(y_test, proba, full=full)
+
+
+def evaluate_chunks(model, chunks, full=False):
+    """
+    Evaluate a trained model on an iterable of `(X_chunk, y_chunk)` pairs.
+
+    Only one chunk and its probabilities are in memory at a time; metrics
+    are accumulated with `MetricsAccumulator` and logged once at the end.
+    """
+    accumulator = MetricsAccumulator()
+    for X_chunk, y_chunk in chunks:
+        accumulator.update(y_chunk, model.predict_proba(X_chunk)[:, 1])
+    return _report(accumulator.result(), full)
+
+
+def evaluate_proba(y_test, proba, full=False):
+    """
+    Evaluate churn probabilities against labels and log metrics to MLflow.
+
+    Predictions are `proba > 0.5`, which is what `predict` returns for the
+    binary classifiers in the model registry.
+    """
+    return _report(binary_metrics(y_test, proba), full)
+
+
+def _report(metrics, full):
+    print(format_report(metrics))
+    scalars = scalar_metrics(metrics)
+    log_metrics(scalars)
+    return metrics if full else scalars
+
+
+def compute_metrics(y_test, proba):
+    """
+    Metrics of `evaluate_proba`, without printing or MLflow logging.
+    """
+    return scalar_metrics(binary_metrics(y_test, proba))
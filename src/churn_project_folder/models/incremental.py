@@ -0,0 +1,354 @@
+"""
+Incremental retraining from the registered production model.
+
+`train_model` fits every model from scratch. For a small monthly delta of
+newly labelled customers, `train_incremental` instead continues from the
+model behind `models:/churn_model@production`:
+
+- XGBoost: `extra_rounds` boosting rounds added to the existing booster
+- random forest: `extra_trees` trees added (`warm_start`)
+
+Logistic regression has no incremental fit: lbfgs converges to the
+optimum of whatever it is fitted on, so a warm start on the delta alone
+yields a delta-only model. It is refitted on the parent's history plus the
+delta instead, starting from the parent's coefficients (`warm_start`), so
+it needs `df_history` and saves only solver iterations.
+
+The parent's fitted preprocessing steps are reused as they are, so the
+feature space stays the one the parent was trained on (categories unseen
+by the parent are ignored by its one-hot encoder).
+
+The parent's registered name, version and run id are logged with the run.
+Given the history the parent was trained on, a full retrain on
+history + delta is timed as well. The two models are scored on the same
+held-out slice of the delta, so the run also reports the fit time saved
+and the metric delta.
+"""
+import copy
+import time
+from typing import Any, Dict, Optional
+
+import mlflow
+import mlflow.sklearn
+import pandas as pd
+from mlflow import MlflowClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import Booster, XGBClassifier
+
+from churn_project_folder.features.schema import TARGET_COL
+from churn_project_folder.models.evaluate import compute_metrics, evaluate_model
+from churn_project_folder.models.model_registry import get_model_builder
+from churn_project_folder.models.tracking import log_dataset, log_metrics, log_params, set_tags
+from churn_project_folder.models.train import build_preprocessor, split_features
+from churn_project_folder.utils.profiling import profile_stage
+
+PRODUCTION_MODEL_URI = "models:/churn_model@production"
+
+DEFAULT_EXTRA_ROUNDS = 50
+DEFAULT_EXTRA_TREES = 50
+
+# Final pipeline step type -> model_registry name
+INCREMENTAL_MODELS = {
+    XGBClassifier: "xgboost",
+    RandomForestClassifier: "random_forest",
+    LogisticRegression: "logistic",
+}
+
+
+# --------------------------------------------------
+# Parent model
+# --------------------------------------------------
+
+def resolve_parent(model_uri: str = PRODUCTION_MODEL_URI) -> Dict[str, Any]:
+    """
+    Registered name, version and source run of `model_uri`.
+
+    `models:/<name>@<alias>` and `models:/<name>/<version>` are resolved
+    through the model registry; for other URIs (`runs:/...`, paths) only
+    the run id, if any, is known.
+    """
+    parent = {"uri": model_uri, "name": None, "version": None, "run_id": None}
+
+    if model_uri.startswith("models:/"):
+        client = MlflowClient()
+        ref = model_uri[len("models:/"):]
+        if "@" in ref:
+            name, alias = ref.split("@", 1)
+            version = client.get_model_version_by_alias(name, alias)
+        else:
+            name, number = ref.split("/", 1)
+            version = client.get_model_version(name, number)
+        parent.update(name=version.name, version=str(version.version), run_id=version.run_id)
+    elif model_uri.startswith("runs:/"):
+        parent["run_id"] = model_uri[len("runs:/"):].split("/", 1)[0]
+
+    return parent
+
+
+def load_parent_model(model_uri: str = PRODUCTION_MODEL_URI):
+    """
+    Load the parent pipeline; returns `(model, parent)` (see `resolve_parent`).
+
+    A registry alias is pinned to the version it points to now, so the
+    logged parent version is the one that was actually loaded.
+    """
+    parent = resolve_parent(model_uri)
+    if parent["version"] is not None:
+        model_uri = f"models:/{parent['name']}/{parent['version']}"
+    return mlflow.sklearn.load_model(model_uri), parent
+
+
+def incremental_model_name(model) -> str:
+    """
+    `model_registry` name of a fitted pipeline's classifier.
+    """
+    classifier = model.steps[-1][1]
+    for model_type, name in INCREMENTAL_MODELS.items():
+        if isinstance(classifier, model_type):
+            return name
+    raise ValueError(
+        f"Incremental training is not supported for {type(classifier).__name__}. "
+        f"Supported: {[t.__name__ for t in INCREMENTAL_MODELS]}"
+    )
+
+
+# --------------------------------------------------
+# Continued fitting
+# --------------------------------------------------
+
+def continue_training(
+    parent_model,
+    X: pd.DataFrame,
+    y: pd.Series,
+    extra_rounds: int = DEFAULT_EXTRA_ROUNDS,
+    extra_trees: int = DEFAULT_EXTRA_TREES,
+    X_history: Optional[pd.DataFrame] = None,
+    y_history: Optional[pd.Series] = None,
+):
+    """
+    Continue training a copy of `parent_model` on (X, y).
+
+    Only the classifier is trained; the preprocessing steps keep the
+    parent's fit. `parent_model` itself is not modified. Logistic
+    regression is refitted on history + (X, y) from the parent's
+    coefficients and requires `X_history` / `y_history`.
+    """
+    model_name = incremental_model_name(parent_model)
+    if model_name == "logistic" and X_history is None:
+        raise ValueError(
+            "Logistic regression cannot be trained on a delta alone (the refit "
+            "would forget the parent's data); pass the parent's history"
+        )
+
+    model = copy.deepcopy(parent_model)
+    classifier = model.steps[-1][1]
+    if model_name == "logistic":
+        X = pd.concat([X_history, X], ignore_index=True)
+        y = pd.concat([y_history, y], ignore_index=True)
+    X_transformed = model[:-1].transform(X)
+
+    if model_name == "xgboost":
+        # Continue from a fresh copy of the booster: continuing the loaded
+        # booster object reuses its sampling RNG state, so results change
+        # from call to call
+        booster = Booster(model_file=classifier.get_booster().save_raw())
+        continued = XGBClassifier(**{**classifier.get_params(), "n_estimators": extra_rounds})
+        continued.fit(X_transformed, y, xgb_model=booster)
+        model.steps[-1] = (model.steps[-1][0], continued)
+
+    elif model_name == "random_forest":
+        classifier.set_params(warm_start=True, n_estimators=classifier.n_estimators + extra_trees)
+        classifier.fit(X_transformed, y)
+        classifier.set_params(warm_start=False)
+
+    else:
+        # History + delta, starting from the parent's coefficients
+        classifier.set_params(warm_start=True)
+        classifier.fit(X_transformed, y)
+        classifier.set_params(warm_start=False)
+
+    return model
+
+
+def _full_retrain(parent_model, model_name: str, X: pd.DataFrame, y: pd.Series):
+    # Same hyperparameters as the parent, fitted from scratch
+    params = parent_model.steps[-1][1].get_params()
+    model = get_model_builder(model_name)(build_preprocessor(X.columns), **params)
+    model.fit(X, y)
+    return model
+
+
+# --------------------------------------------------
+# Training run
+# --------------------------------------------------
+
+def train_incremental(
+    df_delta: pd.DataFrame,
+    model_uri: str = PRODUCTION_MODEL_URI,
+    df_history: Optional[pd.DataFrame] = None,
+    target_col: str = TARGET_COL,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    extra_rounds: int = DEFAULT_EXTRA_ROUNDS,
+    extra_trees: int = DEFAULT_EXTRA_TREES,
+    log_model: bool = False,
+    registered_model_name: Optional[str] = None,
+):
+    """
+    Continue the model at `model_uri` on the feature frame `df_delta`.
+
+    `df_delta` is split like in `train_model`. The parent continues on
+    the training part (logistic regression: on `df_history` plus the
+    training part, which makes `df_history` required). The held-out part
+    scores the parent, the continued model and, when `df_history` (the
+    parent's training features) is given, a full retrain on history +
+    delta training rows.
+
+    With `registered_model_name`, the model is also registered and its
+    new version is tagged with the parent's version.
+
+    Returns `(model, report)`. Assumes an active MLflow run exists.
+    """
+    with profile_stage("load_parent"):
+        parent_model, parent = load_parent_model(model_uri)
+    model_name = incremental_model_name(parent_model)
+    if model_name == "logistic" and df_history is None:
+        raise ValueError(
+            "Incremental logistic regression refits on history + delta; "
+            "pass df_history (the data the parent was trained on)"
+        )
+
+    with profile_stage("split"):
+        X_train, X_test, y_train, y_test = split_features(
+            df_delta,
+            target_col=target_col,
+            test_size=test_size,
+            random_state=random_state,
+        )
+
+    params = {
+        "model_name": model_name,
+        "training_mode": "incremental",
+        "parent_model_uri": parent["uri"],
+        "parent_model_name": parent["name"],
+        "parent_model_version": parent["version"],
+        "parent_run_id": parent["run_id"],
+        "extra_rounds": extra_rounds if model_name == "xgboost" else None,
+        "extra_trees": extra_trees if model_name == "random_forest" else None,
+        "delta_rows": len(df_delta),
+        "test_size": test_size,
+        "random_state": random_state,
+    }
+    log_params({key: value for key, value in params.items() if value is not None})
+    set_tags({"training_mode": "incremental", "parent_model_uri": parent["uri"]})
+
+    # ---------------------------
+    # Continue from the parent
+    # ---------------------------
+    if model_name == "logistic":
+        history = {
+            "X_history": df_history.drop(columns=[target_col]),
+            "y_history": df_history[target_col],
+        }
+    else:
+        history = {}
+
+    started = time.perf_counter()
+    with profile_stage("fit"):
+        model = continue_training(
+            parent_model,
+            X_train,
+            y_train,
+            extra_rounds=extra_rounds,
+            extra_trees=extra_trees,
+            **history,
+        )
+    incremental_seconds = time.perf_counter() - started
+
+    metrics = evaluate_model(model, X_test, y_test)
+    parent_metrics = compute_metrics(y_test, parent_model.predict_proba(X_test)[:, 1])
+
+    report = {
+        "model_name": model_name,
+        "parent": parent,
+        "incremental_fit_seconds": incremental_seconds,
+        "metrics": metrics,
+        "parent_metrics": parent_metrics,
+        "full_fit_seconds": None,
+        "full_metrics": None,
+    }
+    log_metrics({"incremental_fit_seconds": incremental_seconds})
+    log_metrics({f"parent_{k}": v for k, v in parent_metrics.items()})
+
+    # ---------------------------
+    # Full retrain for comparison
+    # ---------------------------
+    if df_history is not None:
+        X_all = pd.concat([df_history.drop(columns=[target_col]), X_train], ignore_index=True)
+        y_all = pd.concat([df_history[target_col], y_train], ignore_index=True)
+
+        started = time.perf_counter()
+        with profile_stage("full_retrain"):
+            full_model = _full_retrain(parent_model, model_name, X_all, y_all)
+        full_seconds = time.perf_counter() - started
+        full_metrics = compute_metrics(y_test, full_model.predict_proba(X_test)[:, 1])
+
+        report.update(full_fit_seconds=full_seconds, full_metrics=full_metrics)
+        log_params({"full_retrain_rows": len(X_all)})
+        log_metrics({
+            "full_fit_seconds": full_seconds,
+            "fit_seconds_saved": full_seconds - incremental_seconds,
+            **{f"full_{k}": v for k, v in full_metrics.items()},
+            **{f"delta_{k}": metrics[k] - full_metrics[k] for k in full_metrics},
+        })
+
+    # ---------------------------
+    # Log model artifact
+    # ---------------------------
+    if log_model or registered_model_name:
+        with profile_stage("log_model"):
+            model_info = mlflow.sklearn.log_model(
+                sk_model=model,
+                name="model",
+                registered_model_name=registered_model_name,
+            )
+            log_dataset(X_train, context="training")
+
+        if registered_model_name and parent["version"] is not None:
+            MlflowClient().set_model_version_tag(
+                registered_model_name,
+                model_info.registered_model_version,
+                "parent_model_version",
+                parent["version"],
+            )
+        report["registered_version"] = getattr(model_info, "registered_model_version", None)
+
+    print_incremental_report(report)
+    return model, report
+
+
+def print_incremental_report(report: Dict[str, Any]) -> None:
+    parent = report["parent"]
+    source = f"{parent['name']} v{parent['version']}" if parent["version"] else parent["uri"]
+    print(f"\nIncremental {report['model_name']} from {source}:")
+    print(f"  fit time:     {report['incremental_fit_seconds']:.2f}s incremental", end="")
+
+    full_metrics = report["full_metrics"]
+    if full_metrics is None:
+        print()
+    else:
+        full_seconds = report["full_fit_seconds"]
+        print(
+            f", {full_seconds:.2f}s full retrain "
+            f"({full_seconds - report['incremental_fit_seconds']:.2f}s saved)"
+        )
+
+    print(f"  {'metric':<10} {'parent':>8} {'increm.':>8}", end="")
+    print(f" {'full':>8} {'delta':>8}" if full_metrics else "")
+    for name, value in report["metrics"].items():
+        print(f"  {name:<10} {report['parent_metrics'][name]:8.4f} {value:8.4f}", end="")
+        if full_metrics:
+            print(f" {full_metrics[name]:8.4f} {value - full_metrics[name]:+8.4f}")
+        else:
+            print()
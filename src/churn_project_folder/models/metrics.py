@@ -0,0 +1,231 @@
+"""
+Binary classification metrics from one vector of churn probabilities.
+
+Everything `evaluate_model` reports (accuracy, precision, recall, ROC AUC,
+the confusion matrix and a threshold sweep) is derived from the
+positive/negative counts above each threshold:
+
+- `binary_metrics(y, proba)` sorts the positive and negative scores once
+  and reads every count off them with `searchsorted`; ROC AUC is the
+  Mann-Whitney statistic (ties count half), which equals sklearn's
+  `roc_auc_score`.
+- `MetricsAccumulator` keeps the same counts for test sets scored chunk by
+  chunk. Counts at the decision and sweep thresholds are exact sums over
+  chunks; ROC AUC comes from per-class score histograms (`n_bins` bins) and
+  is exact unless a positive and a negative fall in the same bin with
+  different scores.
+
+Predictions are `proba > threshold`, like `predict` for the classifiers in
+the model registry.
+"""
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+DECISION_THRESHOLD = 0.5
+SWEEP_THRESHOLDS = np.round(np.linspace(0.0, 1.0, 101), 2)
+AUC_HISTOGRAM_BINS = 2 ** 16
+
+SCALAR_METRICS = ("accuracy", "recall", "precision", "roc_auc")
+
+
+def _as_arrays(y_true, proba):
+    y = np.asarray(y_true).astype(bool, copy=False).ravel()
+    p = np.asarray(proba, dtype=np.float64).ravel()
+    if y.shape != p.shape:
+        raise ValueError(f"y_true has {len(y)} rows but proba has {len(p)}")
+    return y, p
+
+
+def _ratio(num, den):
+    # sklearn's zero_division=0 behaviour, vectorized
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def _from_counts(
+    tp_above: np.ndarray,
+    fp_above: np.ndarray,
+    n_pos: int,
+    n_neg: int,
+    roc_auc: float,
+    thresholds: np.ndarray,
+) -> Dict[str, Any]:
+    # Index 0 holds the decision threshold, the rest the sweep
+    tp = tp_above
+    fp = fp_above
+    fn = n_pos - tp
+    tn = n_neg - fp
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, n_pos)
+    accuracy = _ratio(tp + tn, n_pos + n_neg)
+    f1 = _ratio(2 * tp, 2 * tp + fp + fn)
+
+    sweep = pd.DataFrame({
+        "threshold": thresholds[1:],
+        "tp": tp[1:], "fp": fp[1:], "fn": fn[1:], "tn": tn[1:],
+        "precision": precision[1:],
+        "recall": recall[1:],
+        "f1": f1[1:],
+        "accuracy": accuracy[1:],
+    })
+    return {
+        "accuracy": float(accuracy[0]),
+        "recall": float(recall[0]),
+        "precision": float(precision[0]),
+        "roc_auc": roc_auc,
+        "confusion_matrix": np.array([[tn[0], fp[0]], [fn[0], tp[0]]], dtype=np.int64),
+        "threshold_sweep": sweep,
+        "n_samples": int(n_pos + n_neg),
+    }
+
+
+def _thresholds(threshold: float, sweep_thresholds) -> np.ndarray:
+    sweep = SWEEP_THRESHOLDS if sweep_thresholds is None else np.asarray(sweep_thresholds, dtype=np.float64)
+    return np.concatenate([[threshold], sweep])
+
+
+def _auc_undefined(n_pos: int, n_neg: int) -> bool:
+    return n_pos == 0 or n_neg == 0
+
+
+def binary_metrics(
+    y_true,
+    proba,
+    threshold: float = DECISION_THRESHOLD,
+    sweep_thresholds=None,
+) -> Dict[str, Any]:
+    """
+    All evaluation metrics from one probability vector.
+
+    Parameters
+    ----------
+    y_true : array-like of {0, 1}
+        Churn labels.
+    proba : array-like of float
+        Predicted churn probabilities.
+    threshold : float
+        Decision threshold for accuracy, precision, recall and the
+        confusion matrix.
+    sweep_thresholds : array-like, optional
+        Thresholds of the sweep; 0.00, 0.01, ..., 1.00 by default.
+
+    Returns
+    -------
+    dict
+        `accuracy`, `recall`, `precision`, `roc_auc` (floats),
+        `confusion_matrix` (sklearn layout, `[[tn, fp], [fn, tp]]`),
+        `threshold_sweep` (DataFrame with counts, precision, recall, f1 and
+        accuracy per threshold) and `n_samples`.
+    """
+    y, p = _as_arrays(y_true, proba)
+    pos = np.sort(p[y])
+    neg = np.sort(p[~y])
+    n_pos, n_neg = len(pos), len(neg)
+
+    thresholds = _thresholds(threshold, sweep_thresholds)
+    tp_above = n_pos - np.searchsorted(pos, thresholds, side="right")
+    fp_above = n_neg - np.searchsorted(neg, thresholds, side="right")
+
+    if _auc_undefined(n_pos, n_neg):
+        roc_auc = float("nan")
+    else:
+        below = np.searchsorted(neg, pos, side="left")
+        ties = np.searchsorted(neg, pos, side="right") - below
+        roc_auc = float((below.sum() + 0.5 * ties.sum()) / (n_pos * n_neg))
+
+    return _from_counts(tp_above, fp_above, n_pos, n_neg, roc_auc, thresholds)
+
+
+class MetricsAccumulator:
+    """
+    `binary_metrics` over a test set that arrives in chunks.
+
+    Call `update(y_chunk, proba_chunk)` for every chunk, then `result()`.
+    Memory is constant: two `n_bins` histograms and the per-threshold
+    counts. Accumulators of disjoint chunks can be combined with `merge`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DECISION_THRESHOLD,
+        sweep_thresholds=None,
+        n_bins: int = AUC_HISTOGRAM_BINS,
+    ):
+        self.thresholds = _thresholds(threshold, sweep_thresholds)
+        self.n_bins = n_bins
+        self.n_pos = 0
+        self.n_neg = 0
+        self.tp_above = np.zeros(len(self.thresholds), dtype=np.int64)
+        self.fp_above = np.zeros(len(self.thresholds), dtype=np.int64)
+        self.pos_hist = np.zeros(n_bins, dtype=np.int64)
+        self.neg_hist = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, y_true, proba) -> "MetricsAccumulator":
+        y, p = _as_arrays(y_true, proba)
+        pos = np.sort(p[y])
+        neg = np.sort(p[~y])
+
+        self.n_pos += len(pos)
+        self.n_neg += len(neg)
+        self.tp_above += len(pos) - np.searchsorted(pos, self.thresholds, side="right")
+        self.fp_above += len(neg) - np.searchsorted(neg, self.thresholds, side="right")
+
+        bins = np.clip((p * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.pos_hist += np.bincount(bins[y], minlength=self.n_bins)
+        self.neg_hist += np.bincount(bins[~y], minlength=self.n_bins)
+        return self
+
+    def merge(self, other: "MetricsAccumulator") -> "MetricsAccumulator":
+        if self.n_bins != other.n_bins or not np.array_equal(self.thresholds, other.thresholds):
+            raise ValueError("Cannot merge accumulators with different thresholds or bins")
+        self.n_pos += other.n_pos
+        self.n_neg += other.n_neg
+        self.tp_above += other.tp_above
+        self.fp_above += other.fp_above
+        self.pos_hist += other.pos_hist
+        self.neg_hist += other.neg_hist
+        return self
+
+    def roc_auc(self) -> float:
+        if _auc_undefined(self.n_pos, self.n_neg):
+            return float("nan")
+        neg_below = np.cumsum(self.neg_hist) - self.neg_hist
+        wins = self.pos_hist @ neg_below + 0.5 * (self.pos_hist @ self.neg_hist)
+        return float(wins / (self.n_pos * self.n_neg))
+
+    def result(self) -> Dict[str, Any]:
+        return _from_counts(
+            self.tp_above, self.fp_above, self.n_pos, self.n_neg, self.roc_auc(), self.thresholds
+        )
+
+
+def scalar_metrics(metrics: Dict[str, Any]) -> Dict[str, float]:
+    """
+    The metrics logged to MLflow (no confusion matrix or sweep).
+    """
+    return {name: metrics[name] for name in SCALAR_METRICS}
+
+
+def format_report(metrics: Dict[str, Any]) -> str:
+    """
+    Per-class precision/recall/f1/support and the confusion matrix, like
+    sklearn's `classification_report`, built from the computed counts.
+    """
+    (tn, fp), (fn, tp) = metrics["confusion_matrix"]
+    rows = {
+        "0": (tn, fn, fp),
+        "1": (tp, fp, fn),
+    }
+    lines = [f"{'':>12} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"]
+    for label, (hit, false_pred, missed) in rows.items():
+        precision = float(_ratio(hit, hit + false_pred))
+        recall = float(_ratio(hit, hit + missed))
+        f1 = float(_ratio(2 * hit, 2 * hit + false_pred + missed))
+        lines.append(f"{label:>12} {precision:>9.2f} {recall:>9.2f} {f1:>9.2f} {hit + missed:>9}")
+    lines.append(f"\n{'accuracy':>12} {metrics['accuracy']:>9.4f} {'':>9} {'':>9} {metrics['n_samples']:>9}")
+    lines.append(f"{'roc_auc':>12} {metrics['roc_auc']:>9.4f}")
+    lines.append(f"\nConfusion Matrix:\n{metrics['confusion_matrix']}")
+    return "\n".join(lines)
@@ -0,0 +1,201 @@
+"""
+Concurrent training jobs under a global CPU budget.
+
+`run_pipeline` has a baseline and a tuning job per model. Some are
+single-threaded (logistic regression), others use every core they are
+given (random forest, XGBoost). `run_jobs` runs them concurrently in
+separate processes and splits a core budget between them:
+
+- single-threaded jobs get one core each
+- the remaining cores are shared by the threaded jobs in proportion to
+  their `weight`
+- with more jobs than cores, every job gets one core and at most
+  `cpu_budget` jobs run at a time
+
+Each job runs under `threadpool_limits(n_threads)` and receives
+`n_threads` so it can size `n_jobs`/`nthread` itself. Jobs run in their
+own process, so each has its own MLflow active-run stack and its runs
+never nest into another job's.
+"""
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import mlflow
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+from churn_project_folder.models.tracking import (
+    background_logging_enabled,
+    set_background_logging,
+    wait_for_logging,
+)
+from churn_project_folder.utils.profiling import (
+    collect_profiles,
+    configure_profiling,
+    profiling_config,
+)
+
+
+class TrainingJob:
+    """
+    One unit of work for `run_jobs`.
+
+    Parameters
+    ----------
+    name : str
+        Job name, used in the report.
+    fn : callable
+        Called as `fn(*args, n_threads=<cores>, **kwargs)` in a worker
+        process; must be picklable.
+    threaded : bool
+        Whether the job can use more than one core.
+    weight : float
+        Relative share of the spare cores among threaded jobs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        args: Sequence[Any] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        threaded: bool = True,
+        weight: float = 1.0,
+    ):
+        self.name = name
+        self.fn = fn
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.threaded = threaded
+        self.weight = weight
+
+
+def allocate_threads(jobs: Sequence[TrainingJob], cpu_budget: int) -> List[int]:
+    """
+    Cores per job when all of them run at once (see module docstring).
+    """
+    cpu_budget = max(1, cpu_budget)
+    if len(jobs) >= cpu_budget:
+        return [1] * len(jobs)
+
+    threads = [1] * len(jobs)
+    threaded = [i for i, job in enumerate(jobs) if job.threaded]
+    spare = cpu_budget - len(jobs)
+    if not threaded or spare <= 0:
+        return threads
+
+    # Largest-remainder split of the spare cores by weight
+    total_weight = sum(jobs[i].weight for i in threaded) or len(threaded)
+    shares = {i: spare * (jobs[i].weight or 1.0) / total_weight for i in threaded}
+    for i in threaded:
+        threads[i] += int(shares[i])
+    leftover = cpu_budget - sum(threads)
+    for i in sorted(threaded, key=lambda i: shares[i] - int(shares[i]), reverse=True)[:leftover]:
+        threads[i] += 1
+    return threads
+
+
+def _run_job(
+    job: TrainingJob,
+    n_threads: int,
+    tracking_uri: str,
+    experiment_id: Optional[str],
+    background_logging: bool,
+    profiling: Dict[str, Any],
+) -> Dict[str, Any]:
+    mlflow.set_tracking_uri(tracking_uri)
+    set_background_logging(background_logging)
+    configure_profiling(**profiling)
+    if experiment_id is not None:
+        mlflow.set_experiment(experiment_id=experiment_id)
+
+    started = time.perf_counter()
+    with threadpool_limits(limits=n_threads), collect_profiles() as profile_records:
+        result = job.fn(*job.args, n_threads=n_threads, **job.kwargs)
+    wait_for_logging()
+    return {
+        "result": result,
+        "seconds": time.perf_counter() - started,
+        "pid": os.getpid(),
+        "profile_records": profile_records,
+    }
+
+
+def run_jobs(
+    jobs: Sequence[TrainingJob],
+    cpu_budget: Optional[int] = None,
+    experiment_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run `jobs` concurrently within `cpu_budget` cores.
+
+    Parameters
+    ----------
+    jobs : sequence of TrainingJob
+        Independent jobs; results are returned in the same order.
+    cpu_budget : int, optional
+        Cores shared by all jobs; defaults to `os.cpu_count()`.
+    experiment_id : str, optional
+        MLflow experiment for the jobs' runs (the current one by default).
+
+    Returns
+    -------
+    dict
+        `jobs`: per job name, its `result`, `seconds`, `n_threads` and
+        `profile_records` (stages profiled in the job's process);
+        `wall_seconds`: elapsed time of the whole batch;
+        `job_seconds`: sum of the job times, i.e. roughly what running
+        them one after another would take.
+    """
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    threads = allocate_threads(jobs, cpu_budget)
+    n_concurrent = min(len(jobs), cpu_budget)
+
+    if experiment_id is None:
+        active_run = mlflow.active_run()
+        if active_run is not None:
+            experiment_id = active_run.info.experiment_id
+
+    print(f"Running {len(jobs)} jobs on a {cpu_budget}-core budget ({n_concurrent} at a time):")
+    for job, n_threads in zip(jobs, threads):
+        print(f"  {job.name}: {n_threads} thread(s)")
+
+    started = time.perf_counter()
+    outcomes = Parallel(n_jobs=n_concurrent, backend="loky")(
+        delayed(_run_job)(
+            job,
+            n_threads,
+            mlflow.get_tracking_uri(),
+            experiment_id,
+            background_logging_enabled(),
+            profiling_config(),
+        )
+        for job, n_threads in zip(jobs, threads)
+    )
+    wall_seconds = time.perf_counter() - started
+
+    report = {"jobs": {}, "wall_seconds": wall_seconds, "cpu_budget": cpu_budget}
+    for job, n_threads, outcome in zip(jobs, threads, outcomes):
+        report["jobs"][job.name] = dict(outcome, n_threads=n_threads)
+    report["job_seconds"] = sum(outcome["seconds"] for outcome in outcomes)
+    return report
+
+
+def print_schedule_report(report: Dict[str, Any], sequential_seconds: Optional[float] = None) -> None:
+    """
+    Per-job timings and total wall time against the sequential run.
+
+    Without a measured `sequential_seconds`, the sum of the job times is
+    used as the sequential estimate.
+    """
+    print(f"\n{'job':<24} {'threads':>7} {'seconds':>8}")
+    for name, outcome in report["jobs"].items():
+        print(f"{name:<24} {outcome['n_threads']:>7} {outcome['seconds']:>8.1f}")
+
+    baseline = sequential_seconds if sequential_seconds is not None else report["job_seconds"]
+    label = "sequential" if sequential_seconds is not None else "sum of jobs"
+    print(
+        f"\nWall time {report['wall_seconds']:.1f}s vs {label} {baseline:.1f}s "
+        f"({baseline / report['wall_seconds']:.2f}x)"
+    )
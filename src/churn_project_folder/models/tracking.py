@@ -0,0 +1,265 @@
+"""
+Batched, optionally asynchronous MLflow logging.
+
+`mlflow.log_param` / `mlflow.log_metric` each cost one synchronous write to
+the tracking store (a SQLite transaction for `mlflow.db`). Training and
+tuning go through this module instead:
+
+- `log_params`, `log_metrics` and `set_tags` send one `log_batch` request
+  per call, or, inside `batched_logging()`, buffer everything logged to
+  the run and flush it in as few `log_batch` requests as possible when the
+  block exits.
+- With background logging enabled (`set_background_logging(True)` or
+  `CHURN_MLFLOW_ASYNC_LOGGING=true`) the flushes run on a writer thread,
+  so training never waits on the store. `wait_for_logging()` (also called
+  at exit) drains the queue.
+- `log_dataset` logs a training frame with a digest and schema computed
+  from a row sample instead of the whole frame.
+"""
+import atexit
+import hashlib
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Mapping, Optional
+
+import mlflow
+import numpy as np
+import pandas as pd
+from mlflow import MlflowClient
+from mlflow.entities import Metric, Param, RunTag
+
+# Per-request limits of the MLflow log_batch API
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+# Rows hashed for the dataset digest and used for schema inference
+DATASET_SAMPLE_ROWS = 1000
+
+_background_enabled = os.getenv("CHURN_MLFLOW_ASYNC_LOGGING", "false").lower() in {"1", "true", "yes"}
+
+
+class _RunBuffer:
+    def __init__(self):
+        self.params: Dict[str, str] = {}
+        self.metrics: List[Metric] = []
+        self.tags: Dict[str, str] = {}
+
+    def empty(self) -> bool:
+        return not (self.params or self.metrics or self.tags)
+
+
+_buffers: Dict[str, _RunBuffer] = {}
+_buffers_lock = threading.Lock()
+
+
+# --------------------------------------------------
+# Writing
+# --------------------------------------------------
+
+def _write(run_id: str, buffer: _RunBuffer) -> None:
+    # Split into requests within the log_batch limits
+    client = MlflowClient()
+    params = [Param(key, value) for key, value in buffer.params.items()]
+    tags = [RunTag(key, value) for key, value in buffer.tags.items()]
+    metrics = buffer.metrics
+
+    while params or tags or metrics:
+        client.log_batch(
+            run_id,
+            metrics=metrics[:MAX_METRICS_PER_BATCH],
+            params=params[:MAX_PARAMS_PER_BATCH],
+            tags=tags[:MAX_TAGS_PER_BATCH],
+        )
+        metrics = metrics[MAX_METRICS_PER_BATCH:]
+        params = params[MAX_PARAMS_PER_BATCH:]
+        tags = tags[MAX_TAGS_PER_BATCH:]
+
+
+class _BackgroundWriter(threading.Thread):
+    """
+    Daemon thread writing queued batches in submission order.
+    """
+
+    def __init__(self):
+        super().__init__(name="mlflow-batch-writer", daemon=True)
+        self.queue: "queue.Queue[tuple]" = queue.Queue()
+        self.errors = 0
+
+    def run(self) -> None:
+        while True:
+            run_id, buffer = self.queue.get()
+            try:
+                _write(run_id, buffer)
+            except Exception as exc:
+                self.errors += 1
+                print(f"Background MLflow logging failed for run {run_id}: {exc}")
+            finally:
+                self.queue.task_done()
+
+
+_writer: Optional[_BackgroundWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _submit(run_id: str, buffer: _RunBuffer) -> None:
+    global _writer
+
+    if buffer.empty():
+        return
+    if not _background_enabled:
+        _write(run_id, buffer)
+        return
+
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _BackgroundWriter()
+            _writer.start()
+    _writer.queue.put((run_id, buffer))
+
+
+def set_background_logging(enabled: bool) -> None:
+    """
+    Turn background flushing on or off; pending writes are drained first.
+    """
+    global _background_enabled
+    wait_for_logging()
+    _background_enabled = enabled
+
+
+def background_logging_enabled() -> bool:
+    return _background_enabled
+
+
+def wait_for_logging() -> None:
+    """
+    Block until every queued background batch has been written.
+    """
+    if _writer is not None and _writer.is_alive():
+        _writer.queue.join()
+
+
+atexit.register(wait_for_logging)
+
+
+# --------------------------------------------------
+# Logging API
+# --------------------------------------------------
+
+def _resolve_run_id(run_id: Optional[str]) -> str:
+    if run_id is not None:
+        return run_id
+    # Same behaviour as the fluent API: log to the active run, starting one if needed
+    run = mlflow.active_run() or mlflow.start_run()
+    return run.info.run_id
+
+
+def _log(run_id: Optional[str], fill) -> None:
+    run_id = _resolve_run_id(run_id)
+    with _buffers_lock:
+        buffer = _buffers.get(run_id)
+        if buffer is not None:
+            fill(buffer)
+            return
+    buffer = _RunBuffer()
+    fill(buffer)
+    _submit(run_id, buffer)
+
+
+def log_params(params: Mapping[str, Any], run_id: Optional[str] = None) -> None:
+    def fill(buffer: _RunBuffer):
+        buffer.params.update({key: str(value) for key, value in params.items()})
+
+    _log(run_id, fill)
+
+
+def log_metrics(
+    metrics: Mapping[str, float],
+    step: Optional[int] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    timestamp = int(time.time() * 1000)
+
+    def fill(buffer: _RunBuffer):
+        buffer.metrics.extend(
+            Metric(key, float(value), timestamp, step or 0)
+            for key, value in metrics.items()
+        )
+
+    _log(run_id, fill)
+
+
+def set_tags(tags: Mapping[str, Any], run_id: Optional[str] = None) -> None:
+    def fill(buffer: _RunBuffer):
+        buffer.tags.update({key: str(value) for key, value in tags.items()})
+
+    _log(run_id, fill)
+
+
+@contextmanager
+def batched_logging(run_id: Optional[str] = None):
+    """
+    Buffer params, metrics and tags logged to a run until the block exits.
+
+    Defaults to the active run. Nested blocks for the same run share the
+    outer buffer, which is flushed once.
+    """
+    run_id = _resolve_run_id(run_id)
+    with _buffers_lock:
+        owner = run_id not in _buffers
+        if owner:
+            _buffers[run_id] = _RunBuffer()
+    try:
+        yield
+    finally:
+        if owner:
+            with _buffers_lock:
+                buffer = _buffers.pop(run_id)
+            _submit(run_id, buffer)
+
+
+# --------------------------------------------------
+# Datasets
+# --------------------------------------------------
+
+def _sample_rows(df: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    if len(df) <= n_rows:
+        return df
+    # Evenly spaced rows, so edits anywhere in a sorted frame are likely seen
+    positions = np.linspace(0, len(df) - 1, n_rows).astype(np.int64)
+    return df.iloc[positions]
+
+
+def dataset_digest(df: pd.DataFrame, sample_rows: int = DATASET_SAMPLE_ROWS) -> str:
+    """
+    Cheap fingerprint of a frame: shape, columns, dtypes and a row sample.
+    """
+    digest = hashlib.blake2b(digest_size=4)
+    digest.update(repr((df.shape, list(df.columns), [str(t) for t in df.dtypes])).encode())
+    sample = _sample_rows(df, sample_rows)
+    digest.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def log_dataset(
+    df: pd.DataFrame,
+    context: str = "training",
+    source: str = "local_pandas_dataframe",
+    sample_rows: int = DATASET_SAMPLE_ROWS,
+) -> None:
+    """
+    `mlflow.log_input(from_pandas(df))` with sampled digest and schema.
+
+    MLflow would hash the frame and infer the schema over every row, which
+    dominates logging time for large training sets.
+    """
+    from mlflow.data import from_pandas
+    from mlflow.models import infer_signature
+
+    dataset = from_pandas(df, source=source, digest=dataset_digest(df, sample_rows))
+    # `schema` is a cached property; fill it from the sample up front
+    dataset.schema = infer_signature(_sample_rows(df, sample_rows)).inputs
+    mlflow.log_input(dataset, context=context)
@@ -1,13 +1,14 @@
 import pandas as pd
 import mlflow
 import mlflow.sklearn
-from mlflow.data import from_pandas
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.impute import SimpleImputer
 
 from churn_project_folder.models.model_registry import get_model_builder
+from churn_project_folder.models.tracking import log_dataset, log_params
+from churn_project_folder.utils.profiling import profile_stage
 from churn_project_folder.features.schema import (
     TARGET_COL,
     CATEGORICAL_FEATURES,
@@ -16,6 +17,66 @@ from churn_project_folder.features.schema import (
 
 
 
+def split_features(
+    df: pd.DataFrame,
+    target_col: str = TARGET_COL,
+    test_size: float = 0.2,
+    random_state: int = 42,
+):
+    """
+    Stratified train/test split of a feature frame into X/y.
+    """
+    X = df.drop(columns=[target_col])
+    y = df[target_col]
+
+    return train_test_split(
+        X,
+        y,
+        test_size=test_size,
+        stratify=y,
+        random_state=random_state,
+    )
+
+
+def numeric_feature_columns(columns) -> list:
+    """
+    Columns that are neither categorical nor binary.
+    """
+    return [
+        col for col in columns
+        if col not in CATEGORICAL_FEATURES
+        and col not in BINARY_FEATURES
+    ]
+
+
+def build_preprocessor(columns) -> ColumnTransformer:
+    """
+    Unfitted ColumnTransformer shared by every model pipeline.
+    """
+    return ColumnTransformer(
+        transformers=[
+            (
+                "cat",
+                OneHotEncoder(
+                    handle_unknown="ignore",
+                    drop="first",
+                ),
+                CATEGORICAL_FEATURES,
+            ),
+            (
+                "bin",
+                SimpleImputer(strategy="most_frequent"),
+                BINARY_FEATURES,
+            ),
+            (
+                "num",
+                SimpleImputer(strategy="median"),
+                numeric_feature_columns(columns),
+            ),
+        ]
+    )
+
+
 def train_model(
     df: pd.DataFrame,
     model_name: str = "logistic",
@@ -23,68 +84,42 @@ def train_model(
     test_size: float = 0.2,
     random_state: int = 42,
     log_model = False,
+    cv_folds: int | None = None,
+    cv_n_jobs: int | None = None,
     **model_params,
 ):
     """
     Train a model specified by `model_name`.
 
+    With `cv_folds`, the configuration is first cross-validated on the
+    training split (parallel stratified folds, see `cross_validation.py`)
+    and the fold mean/std of every metric is logged as `cv_*`.
+
     Assumes an active MLflow run exists.
     """
 
     # ---------------------------
     # 1. Split X / y
     # ---------------------------
-    X = df.drop(columns=[target_col])
-    y = df[target_col]
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=test_size,
-        stratify=y,
-        random_state=random_state,
-    )
+    with profile_stage("split"):
+        X_train, X_test, y_train, y_test = split_features(
+            df,
+            target_col=target_col,
+            test_size=test_size,
+            random_state=random_state,
+        )
 
     # ---------------------------
     # 2. Feature types
     # ---------------------------
     categorical_features = CATEGORICAL_FEATURES
 
-    binary_features = BINARY_FEATURES
-
-    numeric_features = [
-        col for col in X.columns
-        if col not in categorical_features
-        and col not in binary_features
-    ]
-
-
+    numeric_features = numeric_feature_columns(X_train.columns)
 
     # ---------------------------
     # 3. Preprocessor
     # ---------------------------
-    preprocessor = ColumnTransformer(
-    transformers=[
-        (
-            "cat",
-            OneHotEncoder(
-                handle_unknown="ignore",
-                drop="first",
-            ),
-            categorical_features,
-        ),
-        (
-            "bin",
-            SimpleImputer(strategy="most_frequent"),
-            binary_features,
-        ),
-        (
-            "num",
-            SimpleImputer(strategy="median"),
-            numeric_features,
-        ),
-    ]
-    )
+    preprocessor = build_preprocessor(X_train.columns)
 
 
     # ---------------------------
@@ -96,33 +131,57 @@ def train_model(
     # ---------------------------
     # 5. Log parameters
     # ---------------------------
-    mlflow.log_param("model_name", model_name)
-    mlflow.log_param("test_size", test_size)
-    mlflow.log_param("random_state", random_state)
-    mlflow.log_param("num_numeric_features", len(numeric_features))
-    mlflow.log_param("num_categorical_features", len(categorical_features))
+    log_params({
+        "model_name": model_name,
+        "test_size": test_size,
+        "random_state": random_state,
+        "num_numeric_features": len(numeric_features),
+        "num_categorical_features": len(categorical_features),
+    })
+
+    # ---------------------------
+    # 5b. Cross-validate on the training split
+    # ---------------------------
+    if cv_folds:
+        from churn_project_folder.models.cross_validation import (
+            cross_validate,
+            log_cv_result,
+            print_cv_result,
+        )
+
+        log_params({"cv_folds": cv_folds})
+        with profile_stage("cross_validate"):
+            cv_result = cross_validate(
+                model,
+                X_train,
+                y_train,
+                cv_folds=cv_folds,
+                n_jobs=cv_n_jobs,
+                random_state=random_state,
+            )
+        print_cv_result(cv_result)
+        log_cv_result(cv_result)
 
     # ---------------------------
     # 6. Train
     # ---------------------------
-    model.fit(X_train, y_train)
+    with profile_stage("fit"):
+        model.fit(X_train, y_train)
 
     # ---------------------------
     # 7. Log model artifact
     # ---------------------------
     if log_model: 
 
-        mlflow.sklearn.log_model(
-            sk_model=model,
-            name = "model"
-        )
-        # ---------------------------
-        # 8. Log training dataset
-        # ---------------------------
-        train_ds = from_pandas(
-            X_train,
-            source="local_pandas_dataframe",
-        )
-        mlflow.log_input(train_ds, context="training")
+        with profile_stage("log_model"):
+            mlflow.sklearn.log_model(
+                sk_model=model,
+                name = "model"
+            )
+            # ---------------------------
+            # 8. Log training dataset
+            # ---------------------------
+            # (digest and schema from a row sample, see tracking.log_dataset)
+            log_dataset(X_train, context="training")
 
     return model, X_train, X_test, y_train, y_test
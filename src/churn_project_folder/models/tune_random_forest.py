@@ -1,20 +1,53 @@
-import optuna
-import mlflow
-
-from churn_project_folder.models.train import train_model
-from churn_project_folder.models.evaluate import evaluate_model
+from churn_project_folder.models.cross_validation import log_cv_result
+from churn_project_folder.models.encoded_split import EncodedSplit
+from churn_project_folder.models.evaluate import evaluate_proba
+from churn_project_folder.models.pruning import fit_random_forest_pruned
+from churn_project_folder.models.tracking import log_params
+from churn_project_folder.models.tuning import (
+    run_study,
+    start_trial_run,
+    study_context,
+    thread_params,
+    trial_thread_budget,
+)
 
 
 def tune_random_forest(
     df,
     n_trials: int = 20,
     metric: str = "roc_auc",
+    storage: str | None = None,
+    n_workers: int = 1,
+    load_if_exists: bool = True,
+    pruner="median",
+    cv_folds: int | None = None,
+    cpu_budget: int | None = None,
 ):
     """
     Hyperparameter tuning for Random Forest using Optuna.
+
+    With `cv_folds`, each trial is scored on the mean of a stratified k-fold
+    CV over the training split (folds in parallel, no pruning) instead of
+    the single test split.
+
+    `cpu_budget` is the number of cores the study may use; classifier
+    `n_jobs` is sized to it (used by the pipeline's job scheduler).
+
     Assumes an active MLflow run (parent).
     """
 
+    # Per-trial thread cap when trials run in parallel workers or the
+    # study has a CPU budget; run_study never starts more workers than trials
+    n_workers = max(1, min(n_workers, n_trials))
+    n_threads = trial_thread_budget(n_workers, cpu_budget)
+
+    # Split and encode once; trials only fit the classifier
+    split = EncodedSplit(df)
+
+    # CV folds run in parallel unless the trials already do or the study
+    # is confined to a CPU budget
+    cv_n_jobs = 1 if n_workers > 1 or cpu_budget else None
+
     def objective(trial):
         # --------------------------------------------------
         # 1. Sample hyperparameters
@@ -29,23 +62,31 @@ def tune_random_forest(
         # --------------------------------------------------
         # 2. Nested MLflow run (one per trial)
         # --------------------------------------------------
-        with mlflow.start_run(nested=True):
-            for k, v in params.items():
-                mlflow.log_param(k, v)
-
-            # --------------------------------------------------
-            # 3. Train
-            # --------------------------------------------------
-            model, X_train, X_test, y_train, y_test = train_model(
-                df,
-                model_name="random_forest",
-                **params,
-            )
+        with start_trial_run(trial):
+            log_params(params)
 
             # --------------------------------------------------
-            # 4. Evaluate
+            # 3. Train & evaluate: k-fold CV on the shared encoded
+            #    train matrix, or a staged fit that can be pruned
             # --------------------------------------------------
-            metrics = evaluate_model(model, X_test, y_test)
+            if cv_folds:
+                cv_result = split.cross_validate_head(
+                    "random_forest",
+                    cv_folds,
+                    cv_n_jobs=cv_n_jobs,
+                    **params,
+                    **thread_params("random_forest", n_threads),
+                )
+                log_cv_result(cv_result)
+                metrics = cv_result["mean"]
+            else:
+                model = fit_random_forest_pruned(
+                    split,
+                    trial,
+                    **params,
+                    **thread_params("random_forest", n_threads),
+                )
+                metrics = evaluate_proba(split.y_test, split.predict_proba_head(model))
 
             score = metrics.get(metric)
             if score is None:
@@ -58,7 +99,16 @@ def tune_random_forest(
     # ------------------------------------------------------
     # 5. Run Optuna study
     # ------------------------------------------------------
-    study = optuna.create_study(direction="maximize", study_name="random_forest_tuning")
-    study.optimize(objective, n_trials=n_trials)
+    study = run_study(
+        objective,
+        study_name="random_forest_tuning",
+        context=study_context(df, metric, cv_folds),
+        n_trials=n_trials,
+        storage=storage,
+        n_workers=n_workers,
+        load_if_exists=load_if_exists,
+        cpu_budget=cpu_budget,
+        pruner=pruner,
+    )
 
     return study.best_params, study.best_value
@@ -1,21 +1,64 @@
-import optuna
-import mlflow
-
-from churn_project_folder.models.train import train_model
-from churn_project_folder.models.evaluate import evaluate_model
+from churn_project_folder.models.cross_validation import log_cv_result
+from churn_project_folder.models.encoded_split import EncodedSplit
+from churn_project_folder.models.evaluate import evaluate_proba
+from churn_project_folder.models.pruning import (
+    BEST_N_ESTIMATORS_ATTR,
+    XGB_EARLY_STOPPING_ROUNDS,
+    fit_xgboost_pruned,
+    make_pruner,
+    predict_proba_best,
+)
+from churn_project_folder.models.tracking import log_metrics, log_params
+from churn_project_folder.models.tuning import (
+    run_study,
+    start_trial_run,
+    study_context,
+    thread_params,
+    trial_thread_budget,
+)
 
 
 def tune_xgboost(
     df,
     n_trials: int = 20,
     metric: str = "roc_auc",
+    storage: str | None = None,
+    n_workers: int = 1,
+    load_if_exists: bool = True,
+    pruner="median",
+    cv_folds: int | None = None,
+    early_stopping_rounds: int | None = XGB_EARLY_STOPPING_ROUNDS,
+    cpu_budget: int | None = None,
 ):
     """
     Hyperparameter tuning for XGBoost using Optuna.
 
+    Boosting stops early on a validation slice of the training split, and
+    the returned `n_estimators` is the best round count found, not the
+    sampled upper bound.
+
+    With `cv_folds`, each trial is scored on the mean of a stratified k-fold
+    CV over the training split (folds in parallel, full `n_estimators`, no
+    pruning or early stopping) instead of the single test split.
+
+    `cpu_budget` is the number of cores the study may use; classifier
+    `n_jobs` is sized to it (used by the pipeline's job scheduler).
+
     Assumes an active MLflow run (parent).
     """
 
+    # Per-trial thread cap when trials run in parallel workers or the
+    # study has a CPU budget; run_study never starts more workers than trials
+    n_workers = max(1, min(n_workers, n_trials))
+    n_threads = trial_thread_budget(n_workers, cpu_budget)
+
+    # Split and encode once; trials only fit the classifier
+    split = EncodedSplit(df)
+
+    # CV folds run in parallel unless the trials already do or the study
+    # is confined to a CPU budget
+    cv_n_jobs = 1 if n_workers > 1 or cpu_budget else None
+
     def objective(trial):
         # --------------------------------------------------
         # 1. Sample hyperparameters
@@ -35,23 +78,38 @@ def tune_xgboost(
         # --------------------------------------------------
         # 2. Nested MLflow run (one trial = one run)
         # --------------------------------------------------
-        with mlflow.start_run(nested=True):
-            for k, v in params.items():
-                mlflow.log_param(k, v)
+        with start_trial_run(trial):
+            log_params(params)
 
             # --------------------------------------------------
-            # 3. Train model (reuse existing pipeline)
+            # 3. Train & evaluate: k-fold CV on the shared encoded
+            #    train matrix, or one booster with pruning and
+            #    early stopping
             # --------------------------------------------------
-            model, X_train, X_test, y_train, y_test = train_model(
-                df,
-                model_name="xgboost",
-                **params,
-            )
-
-            # --------------------------------------------------
-            # 4. Evaluate model
-            # --------------------------------------------------
-            metrics = evaluate_model(model, X_test, y_test)
+            if cv_folds:
+                cv_result = split.cross_validate_head(
+                    "xgboost",
+                    cv_folds,
+                    cv_n_jobs=cv_n_jobs,
+                    **params,
+                    **thread_params("xgboost", n_threads),
+                )
+                log_cv_result(cv_result)
+                metrics = cv_result["mean"]
+            else:
+                booster = fit_xgboost_pruned(
+                    split,
+                    trial,
+                    early_stopping_rounds=early_stopping_rounds,
+                    **params,
+                    **thread_params("xgboost", n_threads),
+                )
+                log_metrics({
+                    BEST_N_ESTIMATORS_ATTR: trial.user_attrs[BEST_N_ESTIMATORS_ATTR]
+                })
+                metrics = evaluate_proba(
+                    split.y_test, predict_proba_best(split, booster, trial)
+                )
 
             score = metrics.get(metric)
             if score is None:
@@ -64,7 +122,21 @@ def tune_xgboost(
     # ------------------------------------------------------
     # 5. Run Optuna study
     # ------------------------------------------------------
-    study = optuna.create_study(direction="maximize",study_name="xgboost_tuning")
-    study.optimize(objective, n_trials=n_trials)
+    study = run_study(
+        objective,
+        study_name="xgboost_tuning",
+        context=study_context(df, metric, cv_folds),
+        n_trials=n_trials,
+        storage=storage,
+        n_workers=n_workers,
+        load_if_exists=load_if_exists,
+        cpu_budget=cpu_budget,
+        # Intermediate values are reported every few boosting rounds
+        pruner=make_pruner(pruner, n_warmup_steps=20),
+    )
 
-    return study.best_params, study.best_value
+    best_params = dict(study.best_params)
+    best_params["n_estimators"] = study.best_trial.user_attrs.get(
+        BEST_N_ESTIMATORS_ATTR, best_params["n_estimators"]
+    )
+    return best_params, study.best_value
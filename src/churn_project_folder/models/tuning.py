@@ -0,0 +1,377 @@
+"""
+Shared Optuna study runner for the `tune_*` functions.
+
+- Studies can live in persistent storage: an RDB URL such as
+  `sqlite:///optuna.db`, or a journal file (`*.log` / `*.jsonl` path or
+  `journal:<path>`), which is the safer choice for many processes.
+- With `load_if_exists=True` a study with the same name is resumed, so a
+  crashed or interrupted tuning run continues where it stopped: only the
+  trials still missing from `n_trials` are run. The name carries a digest
+  of the study context (data, metric, CV folds; see `study_context`), so
+  runs on other data or with another objective start a new study instead
+  of mixing incomparable scores.
+- `n_workers > 1` runs trials in parallel worker processes sharing the
+  study through storage. Each worker gets a per-trial thread budget of
+  `cpu_budget // n_workers` (all cores by default), applied to BLAS/OpenMP
+  and to the model's own `n_jobs`, so RF and XGBoost threads don't
+  oversubscribe the machine or the cores a scheduled job was given.
+- A `pruner` stops losing trials early (see `models/pruning.py`); pruned
+  trial runs end with MLflow status KILLED and the tuning run gets the
+  pruned-trial count and the estimated time saved.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import mlflow
+import optuna
+import pandas as pd
+from joblib import Parallel, delayed
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+from threadpoolctl import threadpool_limits
+
+from churn_project_folder.models.pruning import make_pruner, pruning_summary
+from churn_project_folder.models.tracking import (
+    background_logging_enabled,
+    batched_logging,
+    log_metrics,
+    set_background_logging,
+    wait_for_logging,
+)
+from churn_project_folder.utils.profiling import (
+    add_profile_records,
+    collect_profiles,
+    configure_profiling,
+    profile_stage,
+    profiling_config,
+)
+
+JOURNAL_SUFFIXES = (".log", ".jsonl")
+
+# Registry models whose classifier runs on several threads (`n_jobs`)
+THREADED_MODELS = {"random_forest", "xgboost"}
+
+# Parent MLflow run of trials executed in a worker process
+_worker_parent_run_id: Optional[str] = None
+
+
+# --------------------------------------------------
+# Storage and thread budgets
+# --------------------------------------------------
+
+def resolve_storage(storage: Optional[str]):
+    """
+    Turn a storage spec into something `optuna.create_study` accepts.
+
+    Journal files (`journal:<path>` or a path ending in `.log`/`.jsonl`)
+    become a `JournalStorage`; anything else is passed through as an RDB URL.
+    """
+    if storage is None:
+        return None
+
+    if storage.startswith("journal:"):
+        path = storage[len("journal:"):]
+    elif storage.endswith(JOURNAL_SUFFIXES) and "://" not in storage:
+        path = storage
+    else:
+        return storage
+
+    from optuna.storages import JournalStorage
+    from optuna.storages.journal import JournalFileBackend
+
+    return JournalStorage(JournalFileBackend(path))
+
+
+def trial_thread_budget(n_workers: int, cpu_budget: Optional[int] = None) -> Optional[int]:
+    """
+    Threads each trial may use; None means no limit (serial run, no budget).
+
+    `cpu_budget` is the number of cores the whole study may use (all of
+    them by default); it is split evenly between the workers.
+    """
+    if n_workers <= 1 and cpu_budget is None:
+        return None
+    return max(1, (cpu_budget or os.cpu_count() or 1) // max(1, n_workers))
+
+
+def thread_params(model_name: str, n_threads: Optional[int]) -> dict:
+    """
+    Model params that cap the classifier's own threads for one trial.
+    """
+    if n_threads is None or model_name not in THREADED_MODELS:
+        return {}
+    return {"n_jobs": n_threads}
+
+
+# --------------------------------------------------
+# Study identity
+# --------------------------------------------------
+
+def study_context(df: pd.DataFrame, metric: str, cv_folds: Optional[int]) -> Dict[str, Any]:
+    """
+    What a study's trial scores depend on besides the hyperparameters.
+
+    `data_digest` hashes every row of the tuning frame, so a change to the
+    data or to the feature code gives a different context.
+    """
+    data_digest = hashlib.blake2b(digest_size=8)
+    data_digest.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+    data_digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return {"data_digest": data_digest.hexdigest(), "metric": metric, "cv_folds": cv_folds or 0}
+
+
+def context_study_name(study_name: str, context: Dict[str, Any]) -> str:
+    """
+    `study_name` suffixed with a digest of `context`.
+    """
+    digest = hashlib.blake2b(json.dumps(context, sort_keys=True).encode(), digest_size=4)
+    return f"{study_name}-{digest.hexdigest()}"
+
+
+def _check_context(study: optuna.Study, context: Optional[Dict[str, Any]]) -> None:
+    # New studies record their context; resumed ones must match it
+    if context is None:
+        return
+    stored = {key: study.user_attrs[key] for key in context if key in study.user_attrs}
+    if not stored:
+        for key, value in context.items():
+            study.set_user_attr(key, value)
+    elif stored != context:
+        raise ValueError(
+            f"Study '{study.study_name}' was run with {stored}, not {context}; "
+            "refusing to mix its trials with this run"
+        )
+
+
+def _finished_trials(study: optuna.Study) -> int:
+    states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    return len(study.get_trials(deepcopy=False, states=states))
+
+
+# --------------------------------------------------
+# MLflow runs per trial
+# --------------------------------------------------
+
+@contextmanager
+def start_trial_run(trial: optuna.Trial):
+    """
+    MLflow run for one trial, nested under the tuning run.
+
+    In the main process this is a regular nested run. Worker processes have
+    no active run, so the trial run is attached to the tuning run through
+    the parent-run tag instead. Pruned trials end with status KILLED.
+    """
+    run_name = f"trial_{trial.number}"
+    if mlflow.active_run() is not None:
+        run = mlflow.start_run(nested=True, run_name=run_name)
+    elif _worker_parent_run_id is not None:
+        tags = {MLFLOW_PARENT_RUN_ID: _worker_parent_run_id}
+        run = mlflow.start_run(run_name=run_name, tags=tags)
+    else:
+        run = mlflow.start_run(run_name=run_name)
+
+    # Ended explicitly: `with start_run()` would mark pruned trials FAILED.
+    # Params and metrics are flushed in one batch when the trial ends.
+    try:
+        with batched_logging(run.info.run_id), profile_stage("trial"):
+            yield run
+    except optuna.TrialPruned:
+        mlflow.set_tag("pruned", "true")
+        mlflow.end_run(status="KILLED")
+        raise
+    except BaseException:
+        mlflow.end_run(status="FAILED")
+        raise
+    else:
+        mlflow.end_run()
+
+
+def log_pruning_summary(study: optuna.Study) -> dict:
+    """
+    Print the pruning summary and log it to the active MLflow run, if any.
+    """
+    summary = pruning_summary(study)
+    print(
+        f"'{study.study_name}': {summary['n_pruned_trials']} pruned / "
+        f"{summary['n_complete_trials']} complete trials, "
+        f"~{summary['fit_seconds_saved']:.1f}s of fitting saved "
+        f"({summary['fit_time_saved_fraction']:.0%})"
+    )
+    if mlflow.active_run() is not None:
+        log_metrics(summary)
+    return summary
+
+
+# --------------------------------------------------
+# Study runner
+# --------------------------------------------------
+
+def _optimize_in_worker(
+    study_name: str,
+    storage: str,
+    objective: Callable,
+    n_trials: int,
+    n_threads: Optional[int],
+    tracking_uri: str,
+    experiment_id: Optional[str],
+    parent_run_id: Optional[str],
+    pruner: optuna.pruners.BasePruner,
+    background_logging: bool,
+    profiling: dict,
+) -> list:
+    global _worker_parent_run_id
+
+    mlflow.set_tracking_uri(tracking_uri)
+    set_background_logging(background_logging)
+    configure_profiling(**profiling)
+    if experiment_id is not None:
+        mlflow.set_experiment(experiment_id=experiment_id)
+    _worker_parent_run_id = parent_run_id
+
+    study = optuna.load_study(
+        study_name=study_name, storage=resolve_storage(storage), pruner=pruner
+    )
+    with threadpool_limits(limits=n_threads), collect_profiles() as records:
+        study.optimize(objective, n_trials=n_trials)
+    wait_for_logging()
+    # Trial profiles, for the summary of the parent process
+    return records
+
+
+def run_study(
+    objective: Callable[[optuna.Trial], float],
+    study_name: str,
+    n_trials: int,
+    storage: Optional[str] = None,
+    n_workers: int = 1,
+    load_if_exists: bool = True,
+    direction: str = "maximize",
+    pruner=None,
+    context: Optional[Dict[str, Any]] = None,
+    cpu_budget: Optional[int] = None,
+) -> optuna.Study:
+    """
+    Create (or resume) a study and run it up to `n_trials` finished trials.
+
+    Parameters
+    ----------
+    objective : callable
+        Optuna objective. With `n_workers > 1` it is sent to worker
+        processes, so everything it references must be picklable.
+    study_name : str
+        Name of the study in storage (suffixed with a digest of `context`).
+    n_trials : int
+        Finished (complete or pruned) trials the study should have. A
+        resumed study only runs the ones still missing.
+    storage : str, optional
+        RDB URL or journal file path; None keeps the study in memory.
+        Parallel runs without storage use a temporary journal file.
+    n_workers : int
+        Worker processes running trials concurrently.
+    load_if_exists : bool
+        Resume an existing study with the same name instead of failing.
+    pruner : str or optuna.pruners.BasePruner, optional
+        Pruner name for `make_pruner` or a pruner instance; None disables
+        pruning.
+    context : dict, optional
+        What the trial scores depend on (`study_context`). Stored as study
+        user attrs; resuming a study with a different context raises.
+    cpu_budget : int, optional
+        Cores the whole study may use (all of them by default); split
+        evenly between the workers.
+
+    Returns
+    -------
+    optuna.Study
+        The study, including trials from every worker.
+    """
+    pruner = make_pruner(pruner)
+    if context is not None:
+        study_name = context_study_name(study_name, context)
+
+    if n_workers <= 1:
+        study = optuna.create_study(
+            direction=direction,
+            study_name=study_name,
+            storage=resolve_storage(storage),
+            load_if_exists=load_if_exists,
+            pruner=pruner,
+        )
+        _check_context(study, context)
+        remaining = n_trials - _finished_trials(study)
+        if remaining > 0:
+            study.optimize(objective, n_trials=remaining)
+        else:
+            print(f"'{study_name}' already has {n_trials} finished trials")
+        log_pruning_summary(study)
+        return study
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        temporary_storage = storage is None
+        if temporary_storage:
+            # Workers can only share a study through storage
+            storage = os.path.join(tmp_dir, f"{study_name}.log")
+
+        study = optuna.create_study(
+            direction=direction,
+            study_name=study_name,
+            storage=resolve_storage(storage),
+            load_if_exists=load_if_exists,
+            pruner=pruner,
+        )
+        _check_context(study, context)
+        already_done = _finished_trials(study)
+        remaining = max(0, n_trials - already_done)
+
+        n_workers = max(1, min(n_workers, remaining))
+        shares = [
+            remaining // n_workers + (1 if i < remaining % n_workers else 0)
+            for i in range(n_workers)
+        ]
+        shares = [share for share in shares if share > 0]
+        n_threads = trial_thread_budget(n_workers, cpu_budget)
+
+        active_run = mlflow.active_run()
+        print(
+            f"Running {remaining} trials of '{study_name}' on {n_workers} workers "
+            f"({n_threads} thread(s) per trial, {already_done} trials resumed)"
+        )
+
+        worker_records = Parallel(n_jobs=n_workers, backend="loky")(
+            delayed(_optimize_in_worker)(
+                study_name,
+                storage,
+                objective,
+                share,
+                n_threads,
+                mlflow.get_tracking_uri(),
+                active_run.info.experiment_id if active_run else None,
+                active_run.info.run_id if active_run else None,
+                pruner,
+                background_logging_enabled(),
+                profiling_config(),
+            )
+            for share in shares
+        )
+        for records in worker_records:
+            add_profile_records(records)
+
+        # Reload to see every worker's trials
+        if temporary_storage:
+            in_memory = optuna.storages.InMemoryStorage()
+            optuna.copy_study(
+                from_study_name=study_name,
+                from_storage=resolve_storage(storage),
+                to_storage=in_memory,
+            )
+            study = optuna.load_study(study_name=study_name, storage=in_memory, pruner=pruner)
+        else:
+            study = optuna.load_study(
+                study_name=study_name, storage=resolve_storage(storage), pruner=pruner
+            )
+
+    log_pruning_summary(study)
+    return study
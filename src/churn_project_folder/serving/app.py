@@ -1,10 +1,67 @@
-from fastapi import FastAPI
-from churn_project_folder.serving.inference import predict_from_raw
-from churn_project_folder.serving.schemas import PredictRequest
-from churn_project_folder.serving.gradio_app import create_gradio_app
-import gradio as gr
+import time
 
-app = FastAPI(title="Churn Prediction API")
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from churn_project_folder.serving import config, lifecycle
+from churn_project_folder.serving.batcher import MicroBatcher
+from churn_project_folder.serving.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    StageTimer,
+    registry,
+    request_started,
+)
+from churn_project_folder.serving.inference import (
+    prediction_cache,
+    predict_from_raw,
+    predict_batch_from_raw,
+    predict_many_from_raw,
+)
+from churn_project_folder.serving.lookup import customer_lookup
+from churn_project_folder.serving.schemas import (
+    PredictBatchRequest,
+    PredictCustomersRequest,
+    PredictRequest,
+)
+
+lifecycle.state.record("import", time.perf_counter() - _import_started)
+
+# Opt-in: coalesce concurrent /predict calls into batched model calls
+batcher = (
+    MicroBatcher(
+        predict_many_from_raw,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+    )
+    if config.BATCHING_ENABLED
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load + warm up in the background so /healthz answers right away;
+    # /readyz flips once warmup is done
+    startup_task = asyncio.create_task(run_in_threadpool(lifecycle.run_startup))
+    if batcher is not None:
+        batcher.start()
+
+    yield
+
+    if batcher is not None:
+        await batcher.stop()
+    if not startup_task.done():
+        startup_task.cancel()
+
+
+app = FastAPI(title="Churn Prediction API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 #app.include_router(router)
 #mount_ui(app)
@@ -17,10 +74,95 @@ def root_endpoint():
 # run this uvicorn src.churn_project_folder.serving.app:app --reload
 
 
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    status = lifecycle.state.snapshot()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
 @app.post("/predict")
-def predict(request: PredictRequest):
-    return predict_from_raw(request.model_dump())
+async def predict(request: PredictRequest, http_request: Request):
+    raw_input = request.model_dump()
+    # Body parsing + pydantic validation, timed from when the request arrived
+    StageTimer("predict", started=request_started(http_request.scope)).mark("validation")
+
+    if batcher is not None:
+        return await batcher.submit(raw_input)
+    return await run_in_threadpool(predict_from_raw, raw_input)
+
+
+@app.post("/predict_batch")
+def predict_batch(request: PredictBatchRequest):
+    return {"results": predict_batch_from_raw(request.records)}
+
+
+def _no_feature_store() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "No feature store configured (set CHURN_FEATURE_STORE_PATH)"},
+    )
+
+
+@app.get("/predict/{customer_id}")
+def predict_customer(customer_id: str, precomputed: bool = False):
+    if customer_lookup is None:
+        return _no_feature_store()
+
+    timer = StageTimer("predict_customer")
+    result = customer_lookup.predict([customer_id], precomputed=precomputed, timer=timer)[0]
+    if result is None:
+        return JSONResponse(status_code=404, content={"detail": f"Unknown customerID '{customer_id}'"})
+    return result
+
+
+@app.post("/predict_customers")
+def predict_customers(request: PredictCustomersRequest):
+    if customer_lookup is None:
+        return _no_feature_store()
+
+    results = customer_lookup.predict(request.customer_ids, precomputed=request.precomputed)
+    return {
+        "results": [
+            {"index": i, **result}
+            if result is not None
+            else {"index": i, "customer_id": customer_id, "errors": ["customerID not found"]}
+            for i, (customer_id, result) in enumerate(zip(request.customer_ids, results))
+        ]
+    }
+
+
+@app.get("/stats/batching")
+def batching_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats.snapshot()}
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.snapshot()}
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 
+if config.UI_ENABLED:
+    # gradio is heavy to import; skip it entirely for API-only deployments
+    import gradio as gr
+    from churn_project_folder.serving.gradio_app import create_gradio_app
 
-gradio_app = create_gradio_app()
-app = gr.mount_gradio_app(app, gradio_app, path="/ui")
\ No newline at end of file
+    started = time.perf_counter()
+    gradio_app = create_gradio_app()
+    app = gr.mount_gradio_app(app, gradio_app, path="/ui")
+    lifecycle.state.record("ui_build", time.perf_counter() - started)
@@ -0,0 +1,409 @@
+"""
+Offline, chunked batch scoring of raw customer files.
+
+The input is streamed in fixed-size chunks. Each chunk goes through
+`StreamingRawValidator`, `encode_frame` (the fused equivalent of
+`preprocess_data` + `build_features`) and the serving model, and `customerID, churn_probability, prediction` rows are
+appended to a CSV or Parquet file as soon as the chunk is scored. Only one
+chunk is held in memory at a time, so peak memory depends on the chunk
+size, not the file size.
+
+With `n_workers > 1` chunks are fanned out to a process pool. The serving
+model is serialized once with joblib and every worker loads it with
+`mmap_mode="r"`, so its numpy arrays are mapped from the same file instead
+of being copied into each worker. Output keeps input order.
+
+Missing `TotalCharges` are left missing for the model's fitted imputer, as
+in `/predict`, instead of taking `encode_frame`'s median of the chunk, so a
+customer's score does not depend on the chunk size or where the row lands
+in the file. `score_chunks` validates the stream with
+`StreamingRawValidator`, so duplicate `customerID`s are found across
+chunks, not only within one.
+
+`score_feature_store` scores the current version of a `FeatureStore`
+instead: its features are already encoded, so chunks go straight to the
+model.
+"""
+import multiprocessing
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from churn_project_folder.data.load_data import PARQUET_SUFFIXES, iter_raw_chunks
+from churn_project_folder.features.encoder import encode_frame
+from churn_project_folder.features.schema import ALL_FEATURE_COLUMNS
+from churn_project_folder.serving.inference import ServingModel, get_serving_model
+from churn_project_folder.utils.validate_data import (
+    StreamingRawValidator,
+    validate_raw_telco_data,
+)
+
+OUTPUT_COLUMNS = ["customerID", "churn_probability", "prediction"]
+DEFAULT_CHUNKSIZE = 100_000
+
+# Worker model backends:
+# - "auto": same routing as online serving
+# - "pipeline": the sklearn Pipeline; fastest on large chunks, but sklearn
+#   copies tree nodes out of the mapped file, so each worker holds its own
+#   copy of a random forest
+# - "compiled": the compiled numpy scorer, whose flat tree tables stay
+#   memory-mapped and are shared by all workers (slower per row for trees)
+WORKER_BACKENDS = ("auto", "pipeline", "compiled")
+
+# Chunks in flight per worker; bounds memory while keeping workers busy
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def score_chunk(
+    df_raw: pd.DataFrame,
+    validate: bool = True,
+    serving_model: Optional[ServingModel] = None,
+) -> pd.DataFrame:
+    """
+    Score one chunk of raw data.
+
+    Returns one row per customer that survived preprocessing, with
+    `OUTPUT_COLUMNS`. `validate` checks this chunk on its own; across a
+    file, `score_chunks` validates the whole stream instead.
+    """
+    if validate:
+        validate_raw_telco_data(df_raw, require_target=False, min_rows=0)
+
+    customer_ids = df_raw["customerID"]
+
+    df_features = encode_frame(df_raw)
+    missing = set(ALL_FEATURE_COLUMNS) - set(df_features.columns)
+    if missing:
+        raise ValueError(f"Missing features at scoring time: {missing}")
+
+    X = df_features[ALL_FEATURE_COLUMNS]
+
+    # Undo encode_frame's chunk-median fill; the Pipeline imputes missing
+    # TotalCharges (and charges_per_month) with its training median
+    missing_total = pd.to_numeric(df_raw["TotalCharges"], errors="coerce").loc[X.index].isna().to_numpy()
+    if missing_total.any():
+        X = X.copy()
+        X.loc[missing_total, ["TotalCharges", "charges_per_month"]] = np.nan
+
+    serving_model = serving_model or get_serving_model()
+    churn_probs = serving_model.predict_proba_features(X)
+
+    return pd.DataFrame({
+        "customerID": customer_ids.loc[X.index].to_numpy(),
+        "churn_probability": churn_probs,
+        "prediction": (churn_probs >= 0.5).astype(np.int8),
+    })
+
+
+class ScoreWriter:
+    """
+    Incremental CSV or Parquet writer, chosen by the output file suffix.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.is_parquet = self.path.suffix.lower() in PARQUET_SUFFIXES
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, scores: pd.DataFrame) -> None:
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(scores, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+            return
+
+        scores.to_csv(
+            self.path,
+            mode="a" if self._wrote_header else "w",
+            header=not self._wrote_header,
+            index=False,
+        )
+        self._wrote_header = True
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        elif not self._wrote_header and not self.is_parquet:
+            # Empty input still produces a file with a header
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(self.path, index=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --------------------------------------------------
+# Process pool workers
+# --------------------------------------------------
+
+_worker_model: Optional[ServingModel] = None
+_worker_thread_limits = None
+
+
+def _init_worker(model_path: str, backend: str) -> None:
+    global _worker_model, _worker_thread_limits
+
+    # One process per core: keep BLAS/OpenMP and the model single-threaded
+    _worker_thread_limits = threadpool_limits(limits=1)
+
+    serving_model = joblib.load(model_path, mmap_mode="r")
+    classifier = serving_model.pipeline.steps[-1][1]
+    if "n_jobs" in classifier.get_params():
+        classifier.set_params(n_jobs=1)
+
+    if backend == "pipeline":
+        serving_model.compiled = None
+    elif backend == "compiled":
+        if serving_model.compiled is None:
+            raise ValueError("backend='compiled' requires a compiled scorer")
+        serving_model.compiled_tree_max_rows = float("inf")
+
+    _worker_model = serving_model
+
+
+def _score_in_worker(df_raw: pd.DataFrame) -> pd.DataFrame:
+    # Chunks were validated by the parent (see score_chunks)
+    return score_chunk(df_raw, validate=False, serving_model=_worker_model)
+
+
+def _validated_chunks(chunks: Iterable[pd.DataFrame]):
+    # One validator for the whole stream, so duplicate customerIDs are
+    # caught across chunks; fails on the first chunk with a violation
+    validator = StreamingRawValidator(require_target=False, min_rows=0)
+    for chunk in chunks:
+        validator.update(chunk)
+        validator.report.raise_if_invalid()
+        yield chunk
+
+
+def _scored_chunks_parallel(
+    chunks: Iterable[pd.DataFrame],
+    n_workers: int,
+    backend: str,
+):
+    # Yields (input_rows, scores) in input order with a bounded number of
+    # chunks in flight
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = Path(tmp_dir) / "serving_model.joblib"
+        joblib.dump(get_serving_model(), model_path)
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(model_path), backend),
+        ) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((len(chunk), pool.submit(_score_in_worker, chunk)))
+                if len(pending) >= n_workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    n_rows, future = pending.popleft()
+                    yield n_rows, future.result()
+
+            while pending:
+                n_rows, future = pending.popleft()
+                yield n_rows, future.result()
+
+
+def score_chunks(
+    chunks: Iterable[pd.DataFrame],
+    output_path: str | Path,
+    validate: bool = True,
+    progress: bool = True,
+    n_workers: int = 1,
+    backend: str = "auto",
+) -> Dict[str, Any]:
+    """
+    Score an iterable of raw chunks and write the results incrementally.
+
+    Parameters
+    ----------
+    validate : bool
+        Validate the chunks with one `StreamingRawValidator` before they
+        are scored.
+    n_workers : int
+        Number of worker processes; 1 scores in the calling process.
+    backend : str
+        Model backend used by workers, one of `WORKER_BACKENDS`.
+
+    Returns
+    -------
+    dict
+        Row counts, elapsed seconds and throughput (rows/sec).
+    """
+    if backend not in WORKER_BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Available: {WORKER_BACKENDS}")
+
+    stats = {"chunks": 0, "rows_in": 0, "rows_scored": 0, "rows_dropped": 0, "n_workers": n_workers}
+    started = time.perf_counter()
+
+    # Validated here, across chunks, so score_chunk does not re-check
+    if validate:
+        chunks = _validated_chunks(chunks)
+
+    if n_workers > 1:
+        scored = _scored_chunks_parallel(chunks, n_workers, backend)
+    else:
+        scored = (
+            (len(chunk), score_chunk(chunk, validate=False))
+            for chunk in chunks
+        )
+
+    with ScoreWriter(output_path) as writer:
+        for n_rows, scores in scored:
+            writer.write(scores)
+
+            stats["chunks"] += 1
+            stats["rows_in"] += n_rows
+            stats["rows_scored"] += len(scores)
+            stats["rows_dropped"] += n_rows - len(scores)
+
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(
+                    f"chunk {stats['chunks']}: {stats['rows_scored']} rows scored "
+                    f"({stats['rows_scored'] / elapsed:,.0f} rows/sec)"
+                )
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_sec"] = (
+        stats["rows_scored"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    )
+    return stats
+
+
+def score_file(
+    input_path: str | Path,
+    output_path: str | Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    validate: bool = True,
+    progress: bool = True,
+    max_rows: Optional[int] = None,
+    n_workers: int = 1,
+    backend: str = "auto",
+) -> Dict[str, Any]:
+    """
+    Stream a raw customer file through the scoring pipeline.
+
+    Parameters
+    ----------
+    input_path : str or Path
+        Raw CSV or Parquet file with the raw Telco columns (`Churn` optional).
+    output_path : str or Path
+        Destination `.csv` or `.parquet` file.
+    chunksize : int
+        Rows per chunk; bounds peak memory.
+    validate : bool
+        Validate the file against the raw schema while streaming it
+        (`StreamingRawValidator`, duplicate IDs checked across chunks).
+    max_rows : int, optional
+        Stop after this many input rows (useful for smoke runs).
+    n_workers : int
+        Worker processes scoring chunks in parallel.
+    backend : str
+        Model backend used by workers, one of `WORKER_BACKENDS`.
+    """
+    chunks = iter_raw_chunks(input_path, chunksize=chunksize)
+    if max_rows is not None:
+        chunks = _limit_rows(chunks, max_rows)
+    return score_chunks(
+        chunks,
+        output_path,
+        validate=validate,
+        progress=progress,
+        n_workers=n_workers,
+        backend=backend,
+    )
+
+
+def score_feature_store(
+    store_path: str | Path,
+    output_path: str | Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: bool = True,
+    max_rows: Optional[int] = None,
+    store_scores: bool = False,
+) -> Dict[str, Any]:
+    """
+    Score every customer in a feature store, without re-encoding.
+
+    Chunks come from one store version (see `FeatureStore.iter_snapshot`),
+    which is returned as `stats["feature_store_version"]`. With
+    `store_scores`, the scores are also written back to the store with the
+    serving model's version (`FeatureStore.write_scores`), so
+    `/predict/{customer_id}?precomputed=true` can return them directly.
+    """
+    from churn_project_folder.data.feature_store import FeatureStore
+
+    serving_model = get_serving_model()
+    store = FeatureStore(store_path)
+    chunks = store.iter_snapshot(chunksize=chunksize, columns=ALL_FEATURE_COLUMNS)
+    if max_rows is not None:
+        chunks = _limit_rows(chunks, max_rows)
+
+    stats = {"chunks": 0, "rows_in": 0, "rows_scored": 0, "rows_dropped": 0, "n_workers": 1}
+    started = time.perf_counter()
+    scored_chunks = []
+
+    with ScoreWriter(output_path) as writer:
+        for chunk in chunks:
+            churn_probs = serving_model.predict_proba_features(chunk)
+            scores = pd.DataFrame({
+                "customerID": chunk.index.to_numpy(),
+                "churn_probability": churn_probs,
+                "prediction": (churn_probs >= 0.5).astype(np.int8),
+            })
+            writer.write(scores)
+            if store_scores:
+                scored_chunks.append(scores)
+
+            stats["chunks"] += 1
+            stats["rows_in"] += len(chunk)
+            stats["rows_scored"] += len(chunk)
+            stats["feature_store_version"] = chunk.attrs["feature_store_version"]
+
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(
+                    f"chunk {stats['chunks']}: {stats['rows_scored']} rows scored "
+                    f"({stats['rows_scored'] / elapsed:,.0f} rows/sec)"
+                )
+
+    if store_scores and scored_chunks:
+        store.write_scores(
+            pd.concat(scored_chunks, ignore_index=True),
+            model_version=serving_model.version,
+            feature_store_version=stats["feature_store_version"],
+        )
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_sec"] = (
+        stats["rows_scored"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    )
+    return stats
+
+
+def _limit_rows(chunks: Iterable[pd.DataFrame], max_rows: int):
+    remaining = max_rows
+    for chunk in chunks:
+        if remaining <= 0:
+            return
+        yield chunk.iloc[:remaining]
+        remaining -= len(chunk)
@@ -0,0 +1,256 @@
+"""
+Asyncio micro-batching for the serving layer.
+
+Concurrent `/predict` calls are held for a short window (or until enough
+requests have arrived), scored with one batched model call, and the
+results are fanned back out to each awaiting caller. This trades a few
+milliseconds of p50 latency for far fewer `predict_proba` calls under load.
+
+If a batched call fails, its records are re-scored one by one, so only the
+request that caused the failure (e.g. a record the model rejects) gets the
+exception.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+BatchScoreFn = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Number of recent queueing delays kept for percentile reporting
+DELAY_WINDOW = 2048
+
+
+class BatcherStats:
+    """
+    Counters for batch sizes and queueing delay.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_counts["+Inf"] = 0
+        self.queue_delay_total_ms = 0.0
+        self.queue_delay_max_ms = 0.0
+        self.recent_queue_delays_ms: Deque[float] = deque(maxlen=DELAY_WINDOW)
+
+    def record_batch(self, size: int, queue_delays_ms: List[float]) -> None:
+        self.batches += 1
+        self.requests += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_counts[bucket] += 1
+                break
+        else:
+            self.batch_size_counts["+Inf"] += 1
+
+        for delay in queue_delays_ms:
+            self.queue_delay_total_ms += delay
+            self.queue_delay_max_ms = max(self.queue_delay_max_ms, delay)
+            self.recent_queue_delays_ms.append(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_queue_delays_ms)
+
+        def percentile(q: float) -> Optional[float]:
+            if not recent:
+                return None
+            return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size_histogram": {
+                str(bucket): count
+                for bucket, count in self.batch_size_counts.items()
+            },
+            "queue_delay_ms": {
+                "mean": (
+                    self.queue_delay_total_ms / self.requests
+                    if self.requests else 0.0
+                ),
+                "max": self.queue_delay_max_ms,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+            },
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-record requests into batched scoring calls.
+
+    Parameters
+    ----------
+    score_fn : callable
+        Scores a list of validated raw records and returns one result per
+        record, in order. Runs in a worker thread so the event loop keeps
+        accepting requests while a batch is being scored.
+    max_batch_size : int
+        Flush as soon as this many requests are waiting.
+    max_wait_ms : float
+        Flush at the latest this long after the first request of a batch
+        arrived.
+    """
+
+    def __init__(
+        self,
+        score_fn: BatchScoreFn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.stats = BatcherStats()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+
+    def start(self) -> None:
+        """
+        Start the batching worker on the running event loop.
+        """
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the worker; requests still queued are failed.
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    # --------------------------------------------------
+    # Request path
+    # --------------------------------------------------
+
+    async def submit(self, raw_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue one record and wait for its result.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((raw_input, future, time.perf_counter()))
+        return await future
+
+    # --------------------------------------------------
+    # Worker
+    # --------------------------------------------------
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future, float]]:
+        # Block for the first request, then fill the batch until it is full
+        # or the wait window that started with the first request closes
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        # Anything already queued rides along without extra waiting
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    def _score_each(self, records: List[Dict[str, Any]]) -> List[Any]:
+        # Fallback after a failed batch: one result or exception per record
+        outcomes: List[Any] = []
+        for record in records:
+            try:
+                outcomes.append(self.score_fn([record])[0])
+            except Exception as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            records = [record for record, _, _ in batch]
+
+            dispatched = time.perf_counter()
+            queue_delays_ms = [
+                (dispatched - enqueued) * 1000.0 for _, _, enqueued in batch
+            ]
+
+            try:
+                results = await loop.run_in_executor(None, self.score_fn, records)
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Batch scorer returned {len(results)} results "
+                        f"for {len(batch)} records"
+                    )
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("Batcher stopped"))
+                raise
+            except Exception as exc:
+                self.stats.failed_batches += 1
+                if len(batch) == 1:
+                    self._fail(batch, exc)
+                    continue
+                # Contain the failure to the records that cause it
+                try:
+                    results = await loop.run_in_executor(None, self._score_each, records)
+                except asyncio.CancelledError:
+                    self._fail(batch, RuntimeError("Batcher stopped"))
+                    raise
+
+            self.stats.record_batch(len(batch), queue_delays_ms)
+            for (_, future, _), result in zip(batch, results):
+                # The caller may have gone away (cancelled request)
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    @staticmethod
+    def _fail(batch, exc: Exception) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(exc)
@@ -0,0 +1,149 @@
+"""
+Bounded LRU cache of predictions, keyed on the model version and a
+canonical hash of the request.
+
+Requests are 16 categoricals plus 3 numerics, so exact repeats are common.
+Keys are 16-byte blake2b digests of the canonicalised record, which keeps
+each entry small regardless of how the request strings were allocated.
+Entries belong to the model version they were computed with; the first
+lookup against a different version clears the cache.
+"""
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from churn_project_folder.serving.schemas import PredictRequest
+
+# Canonical field order and the fields compared numerically (12 == 12.0)
+CACHE_KEY_FIELDS: Sequence[str] = tuple(PredictRequest.model_fields)
+NUMERIC_FIELDS = {"tenure", "MonthlyCharges", "TotalCharges", "SeniorCitizen"}
+
+
+def canonical_key(raw_input: Mapping[str, Any]) -> bytes:
+    """
+    Stable digest of a raw record over the `PredictRequest` fields.
+    """
+    values = []
+    for field in CACHE_KEY_FIELDS:
+        value = raw_input.get(field)
+        if field in NUMERIC_FIELDS and value is not None:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                pass
+        values.append(value)
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU of (prediction, churn_probability) per request.
+
+    Parameters
+    ----------
+    max_entries : int
+        Upper bound on cached predictions; the least recently used entry is
+        evicted beyond it. This is the memory knob (see `entry_bytes`).
+    ttl_seconds : float, optional
+        Entries older than this are treated as misses. None disables TTL.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: Optional[float] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+
+        self._entries: "OrderedDict[bytes, Tuple[int, float, float]]" = OrderedDict()
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        # Approximate footprint of one entry: key, value tuple and dict slot
+        sample_key = canonical_key({})
+        self.entry_bytes = (
+            sys.getsizeof(sample_key)
+            + sys.getsizeof((0, 0.0, 0.0)) + 3 * sys.getsizeof(0.0)
+            + 100
+        )
+
+    def _check_version(self, model_version: str) -> None:
+        # Caller holds the lock
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, key: bytes, model_version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            prediction, churn_probability, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return {"prediction": prediction, "churn_probability": churn_probability}
+
+    def put(self, key: bytes, model_version: str, result: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._check_version(model_version)
+            self._entries[key] = (
+                result["prediction"],
+                result["churn_probability"],
+                time.monotonic(),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self) -> None:
+        """
+        Drop all entries and zero the counters (e.g. after warmup).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            self.evictions = self.expirations = self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+            lookups = self.hits + self.misses
+            return {
+                "model_version": self._model_version,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "approx_bytes": size * self.entry_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,62 @@
+"""
+Serving configuration, read from environment variables (or a local .env).
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# --------------------------------------------------
+# Micro-batching of concurrent /predict requests (opt-in)
+# --------------------------------------------------
+
+BATCHING_ENABLED = _env_flag("CHURN_BATCHING_ENABLED")
+BATCH_MAX_SIZE = int(os.getenv("CHURN_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("CHURN_BATCH_MAX_WAIT_MS", "2.0"))
+
+# --------------------------------------------------
+# Gradio UI at /ui (disable for API-only deployments to cut cold start)
+# --------------------------------------------------
+
+UI_ENABLED = _env_flag("CHURN_UI_ENABLED", default=True)
+
+# --------------------------------------------------
+# Compiled numpy scorer (models/compiled_scorer.py)
+# --------------------------------------------------
+
+# Used when churn_model_compiled.npz exists and matches the loaded model
+COMPILED_SCORER_ENABLED = _env_flag("CHURN_COMPILED_SCORER_ENABLED", default=True)
+
+# Tree scorers beat the native ensembles only on small batches
+COMPILED_TREE_MAX_ROWS = int(os.getenv("CHURN_COMPILED_TREE_MAX_ROWS", "256"))
+
+# --------------------------------------------------
+# LRU prediction cache (serving/cache.py); 0 entries disables it
+# --------------------------------------------------
+
+CACHE_MAX_ENTRIES = int(os.getenv("CHURN_CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CHURN_CACHE_TTL_SECONDS", "0"))
+
+# --------------------------------------------------
+# Per-stage latency histograms and request counters at /metrics
+# --------------------------------------------------
+
+METRICS_ENABLED = _env_flag("CHURN_METRICS_ENABLED", default=True)
+
+# --------------------------------------------------
+# Scoring by customerID from a feature store (serving/lookup.py)
+# --------------------------------------------------
+
+# Store directory (data/feature_store.py); unset disables /predict/{customer_id}
+FEATURE_STORE_PATH = os.getenv("CHURN_FEATURE_STORE_PATH") or None
+# How often the store is checked for a new version or new nightly scores
+FEATURE_STORE_REFRESH_SECONDS = float(os.getenv("CHURN_FEATURE_STORE_REFRESH_SECONDS", "30"))
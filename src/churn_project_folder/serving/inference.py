@@ -1,41 +1,347 @@
+import threading
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
-import mlflow.sklearn
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+from pydantic import ValidationError
 
-from churn_project_folder.data.preprocess import preprocess_data
-from churn_project_folder.features.build_features import build_features
-from churn_project_folder.features.schema import ALL_FEATURE_COLUMNS
+from churn_project_folder.features.encoder import encode_frame, encode_row
+from churn_project_folder.features.schema import (
+    ALL_FEATURE_COLUMNS,
+    CATEGORICAL_FEATURES,
+    NUMERIC_FEATURES,
+)
+from churn_project_folder.serving import config
+from churn_project_folder.serving.cache import PredictionCache, canonical_key
+from churn_project_folder.serving.metrics import StageTimer
+from churn_project_folder.serving.schemas import PredictRequest
 
 # --------------------------------------------------
-# Load model ONCE at startup
+# Model is loaded ONCE, on first use or by the app lifespan hook
 # --------------------------------------------------
 
 MODEL_PATH = Path(__file__).parent / "models" / "churn_model"
-model = mlflow.sklearn.load_model(MODEL_PATH)
+COMPILED_SCORER_PATH = MODEL_PATH.parent / "churn_model_compiled.npz"
 
 
-def predict_from_raw(raw_input: Dict[str, Any]) -> Dict[str, Any]:
-    # 1️ Raw input → DataFrame
-    df_raw = pd.DataFrame([raw_input])
+class ServingModel:
+    """
+    The loaded sklearn Pipeline plus, when available, its compiled scorer.
+
+    The compiled numpy scorer (see models/compiled_scorer.py) is used for
+    linear models at any batch size and for tree models on small batches,
+    where it avoids most of the Pipeline's per-call overhead.
+    """
+
+    def __init__(self, pipeline, model_uuid: Optional[str] = None, compiled=None):
+        self.pipeline = pipeline
+        self.model_uuid = model_uuid
+        self.compiled = compiled
+        self.compiled_tree_max_rows = config.COMPILED_TREE_MAX_ROWS
+
+    @property
+    def version(self) -> str:
+        """
+        Identifier of the loaded model, used to scope cached predictions.
+        """
+        return self.model_uuid or f"object-{id(self.pipeline)}"
+
+    def _use_compiled(self, n_rows: int) -> bool:
+        if self.compiled is None:
+            return False
+        return (
+            self.compiled.kind == "linear"
+            or n_rows <= self.compiled_tree_max_rows
+        )
+
+    def predict_proba_rows(self, rows: List[List[Any]]) -> np.ndarray:
+        """
+        Churn probabilities for encoded rows in ALL_FEATURE_COLUMNS order.
+        """
+        if self._use_compiled(len(rows)):
+            return self.compiled.predict_proba(rows)
+        return self.pipeline.predict_proba(rows_to_frame(rows))[:, 1]
+
+    def predict_proba_features(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Churn probabilities for a feature frame with ALL_FEATURE_COLUMNS.
+        """
+        if self._use_compiled(len(X)):
+            return self.compiled.predict_proba(
+                X[ALL_FEATURE_COLUMNS].to_numpy(dtype=object)
+            )
+        return self.pipeline.predict_proba(X)[:, 1]
+
+    def verify_compiled(self, rows: List[List[Any]], atol: float = 1e-6) -> bool:
+        """
+        Compare the compiled scorer with the Pipeline; drop it on mismatch.
+        """
+        if self.compiled is None:
+            return False
+        expected = self.pipeline.predict_proba(rows_to_frame(rows))[:, 1]
+        max_abs_diff = float(np.max(np.abs(expected - self.compiled.predict_proba(rows))))
+        if max_abs_diff > atol:
+            print(
+                f"Compiled scorer disagrees with the model "
+                f"(max |diff| {max_abs_diff:.3e}); falling back to the Pipeline"
+            )
+            self.compiled = None
+            return False
+        return True
+
+
+_model: Optional[ServingModel] = None
+_model_lock = threading.Lock()
+
+# Repeat scorings of the same profile are served from here
+prediction_cache = (
+    PredictionCache(
+        max_entries=config.CACHE_MAX_ENTRIES,
+        ttl_seconds=config.CACHE_TTL_SECONDS,
+    )
+    if config.CACHE_MAX_ENTRIES > 0
+    else None
+)
+
+
+def _read_compiled_scorer(path: Path, model_uuid: Optional[str]):
+    if not config.COMPILED_SCORER_ENABLED or not path.exists():
+        return None
+
+    from churn_project_folder.models.compiled_scorer import CompiledScorer
+
+    scorer = CompiledScorer.load(path)
+    if scorer.source_model_uuid != model_uuid:
+        print(
+            f"Ignoring stale compiled scorer at {path}: built for model "
+            f"{scorer.source_model_uuid}, loaded model is {model_uuid}"
+        )
+        return None
+    return scorer
+
+
+def _read_model(path: Path, compiled_path: Path) -> ServingModel:
+    # mlflow is slow to import; defer it to the (background) model load
+    import mlflow.sklearn
+    from mlflow.models import Model
+
+    pipeline = mlflow.sklearn.load_model(path)
+    model_uuid = Model.load(path).model_uuid
+    return ServingModel(
+        pipeline,
+        model_uuid=model_uuid,
+        compiled=_read_compiled_scorer(compiled_path, model_uuid),
+    )
+
+
+def load_model(path: Path = MODEL_PATH, compiled_path: Path = COMPILED_SCORER_PATH):
+    """
+    Load the serving model from disk and make it the active model.
+    """
+    global _model
+    loaded = _read_model(path, compiled_path)
+    with _model_lock:
+        _model = loaded
+    return loaded.pipeline
+
+
+def get_serving_model() -> ServingModel:
+    """
+    Return the active serving model, loading it on first use.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _read_model(MODEL_PATH, COMPILED_SCORER_PATH)
+    return _model
+
+
+def get_model():
+    """
+    Return the active sklearn Pipeline, loading it on first use.
+    """
+    return get_serving_model().pipeline
+
+
+def _predict_proba_frame(
+    df_raw: pd.DataFrame, timer: Optional[StageTimer] = None
+) -> Tuple[pd.Series, Dict[Any, List[str]]]:
+    """
+    Run preprocessing, feature engineering and the model over a raw frame.
+
+    Returns churn probabilities indexed like the rows that were scored, and
+    the rows the model would reject (infinite numeric features, e.g.
+    `charges_per_month` at tenure -1) mapped to the offending columns.
+    Those rows are not scored, so they cannot fail the others.
+    """
+    timer = timer or StageTimer("predict_frame")
 
-    # 2️ Preprocess + feature engineering
-    df_processed = preprocess_data(df_raw)
-    df_features = build_features(df_processed)
+    # 1️ Preprocess + feature engineering (fused, see features/encoder.py)
+    df_features = encode_frame(df_raw)
+    timer.mark("encode")
 
-    # 3️ Enforce feature contract
+    # 2️ Enforce feature contract
     missing = set(ALL_FEATURE_COLUMNS) - set(df_features.columns)
     if missing:
         raise ValueError(f"Missing features at inference time: {missing}")
 
-    # 4️ Align column order
+    # 3️ Align column order
     X = df_features[ALL_FEATURE_COLUMNS]
+    timer.mark("align")
+
+    # 4️ Screen out rows the imputer would reject
+    infinite = np.isinf(X[NUMERIC_FEATURES].to_numpy(dtype=np.float64))
+    rejected = {}
+    if infinite.any():
+        bad_rows = infinite.any(axis=1)
+        for index, row in zip(X.index[bad_rows], infinite[bad_rows]):
+            rejected[index] = [col for col, bad in zip(NUMERIC_FEATURES, row) if bad]
+        X = X[~bad_rows]
+    timer.mark("screen")
 
     # 5️ Predict
-    churn_prob = model.predict_proba(X)[0, 1]
+    churn_probs = get_serving_model().predict_proba_features(X) if len(X) else []
+    timer.mark("predict_proba")
+    return pd.Series(churn_probs, index=X.index, dtype=np.float64), rejected
+
+
+def rows_to_frame(rows: List[List[Any]]) -> pd.DataFrame:
+    """
+    Wrap encoded model input rows in the DataFrame the Pipeline expects.
+    """
+    X = pd.DataFrame(rows, columns=ALL_FEATURE_COLUMNS)
+
+    # An out-of-range tenure leaves tenure_bucket all-NaN, which pandas
+    # infers as float; the OneHotEncoder needs categoricals as objects
+    for col in CATEGORICAL_FEATURES:
+        if X[col].dtype != object:
+            X[col] = X[col].astype(object)
+    return X
+
+
+def predict_from_raw(raw_input: Dict[str, Any]) -> Dict[str, Any]:
+    timer = StageTimer("predict")
+    serving_model = get_serving_model()
+
+    # 1️ Repeat request for the same model version → cached result
+    if prediction_cache is not None:
+        key = canonical_key(raw_input)
+        cached = prediction_cache.get(key, serving_model.version)
+        timer.mark("cache_lookup")
+        if cached is not None:
+            return cached
+
+    # 2️ Raw input → model input row (schema-compiled, no pandas passes)
+    row = encode_row(raw_input)
+    timer.mark("encode")
+
+    # 3️ Predict (compiled scorer, or the Pipeline on a one-row frame)
+    churn_prob = serving_model.predict_proba_rows([row])[0]
+    timer.mark("predict_proba")
     prediction = int(churn_prob >= 0.5)
 
-    return {
+    result = {
         "prediction": prediction,
         "churn_probability": float(churn_prob),
     }
+    if prediction_cache is not None:
+        prediction_cache.put(key, serving_model.version, result)
+    return result
+
+
+def predict_many_from_raw(raw_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score already-validated raw records with one `predict_proba` call.
+
+    Used by the micro-batcher, which coalesces concurrent `/predict`
+    requests. Results are returned in input order; cached records are not
+    re-scored.
+    """
+    timer = StageTimer("predict_many")
+    serving_model = get_serving_model()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(raw_inputs)
+    keys: List[Optional[bytes]] = [None] * len(raw_inputs)
+
+    if prediction_cache is not None:
+        for i, raw_input in enumerate(raw_inputs):
+            keys[i] = canonical_key(raw_input)
+            results[i] = prediction_cache.get(keys[i], serving_model.version)
+        timer.mark("cache_lookup")
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        rows = [encode_row(raw_inputs[i]) for i in misses]
+        timer.mark("encode")
+        churn_probs = serving_model.predict_proba_rows(rows)
+        timer.mark("predict_proba")
+
+        for i, churn_prob in zip(misses, churn_probs):
+            results[i] = {
+                "prediction": int(churn_prob >= 0.5),
+                "churn_probability": float(churn_prob),
+            }
+            if prediction_cache is not None:
+                prediction_cache.put(keys[i], serving_model.version, results[i])
+
+    return results
+
+
+def _format_validation_error(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+        for err in exc.errors()
+    ]
+
+
+def predict_batch_from_raw(raw_inputs: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Score many raw records with a single preprocessing pass and a single
+    `predict_proba` call.
+
+    Every record is validated against `PredictRequest` on its own, and
+    records whose encoded features the model would reject are screened
+    out, so an invalid record is reported in its slot instead of failing
+    the batch. Results are returned in input order.
+    """
+    timer = StageTimer("predict_batch")
+    results: List[Dict[str, Any]] = [None] * len(raw_inputs)
+    valid_rows = {}
+
+    # 1️ Validate each record independently
+    for i, record in enumerate(raw_inputs):
+        try:
+            valid_rows[i] = PredictRequest.model_validate(record).model_dump()
+        except ValidationError as exc:
+            results[i] = {"index": i, "errors": _format_validation_error(exc)}
+    timer.mark("validation")
+
+    # 2️ Score all valid records at once
+    if valid_rows:
+        df_raw = pd.DataFrame.from_dict(valid_rows, orient="index")
+        timer.mark("to_frame")
+        churn_probs, rejected = _predict_proba_frame(df_raw, timer)
+
+        for i in valid_rows:
+            if i in rejected:
+                results[i] = {
+                    "index": i,
+                    "errors": [f"{col}: infinite after preprocessing" for col in rejected[i]],
+                }
+                continue
+            if i not in churn_probs.index:
+                results[i] = {
+                    "index": i,
+                    "errors": ["record: dropped during preprocessing"],
+                }
+                continue
+
+            churn_prob = float(churn_probs.loc[i])
+            results[i] = {
+                "index": i,
+                "prediction": int(churn_prob >= 0.5),
+                "churn_probability": churn_prob,
+            }
+        timer.mark("format")
+
+    return results
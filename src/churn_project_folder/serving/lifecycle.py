@@ -0,0 +1,101 @@
+"""
+Startup lifecycle for the serving app: model load, warmup and readiness.
+
+The app's lifespan hook runs `run_startup` in a worker thread, so the
+server answers liveness checks immediately while the model is loaded and a
+synthetic warmup batch is pushed through the full `predict_from_raw` path
+(the first real request would otherwise pay for lazy sklearn/xgboost
+initialisation). With a feature store configured, its current features
+are loaded as well, for `/predict/{customer_id}`. The app only reports
+ready once warmup has finished.
+"""
+import time
+from typing import Any, Dict, Optional
+
+from churn_project_folder.data.synthetic import make_synthetic_requests
+from churn_project_folder.features.encoder import encode_row
+from churn_project_folder.serving import inference, metrics
+from churn_project_folder.serving.lookup import customer_lookup
+
+WARMUP_BATCH_SIZE = 16
+
+
+class StartupState:
+    """
+    Readiness flag and per-step startup timings.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    def record(self, step: str, seconds: float) -> None:
+        self.timings[f"{step}_seconds"] = round(seconds, 4)
+        print(f"Startup step '{step}' took {seconds:.3f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "timings": dict(self.timings),
+        }
+
+
+state = StartupState()
+
+
+def warmup(n_records: int = WARMUP_BATCH_SIZE) -> None:
+    """
+    Push a synthetic batch through every scoring path once.
+    """
+    records = make_synthetic_requests(n_records, seed=0)
+
+    # Check the compiled scorer against the Pipeline before serving with it
+    inference.get_serving_model().verify_compiled(
+        [encode_row(record) for record in records]
+    )
+
+    for record in records:
+        inference.predict_from_raw(record)
+
+    inference.predict_many_from_raw(records)
+    inference.predict_batch_from_raw(records)
+
+    # Synthetic records must not be served or counted in /stats/cache
+    if inference.prediction_cache is not None:
+        inference.prediction_cache.reset()
+
+    if customer_lookup is not None:
+        customer_ids = list(customer_lookup.snapshot().features.index[:n_records])
+        customer_lookup.predict(customer_ids)
+        customer_lookup.predict(customer_ids, precomputed=True)
+
+    # ... nor show up in the /metrics histograms and counters
+    metrics.registry.reset()
+
+
+def run_startup() -> None:
+    """
+    Load the model and warm it up, then mark the app ready.
+    """
+    try:
+        started = time.perf_counter()
+        inference.get_model()
+        state.record("model_load", time.perf_counter() - started)
+
+        if customer_lookup is not None:
+            started = time.perf_counter()
+            customer_lookup.snapshot()
+            state.record("feature_store_load", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        warmup()
+        state.record("warmup", time.perf_counter() - started)
+    except Exception as exc:
+        state.error = f"{type(exc).__name__}: {exc}"
+        # Stay unready; the readiness probe reports the error
+        print(f"Startup failed: {state.error}")
+        return
+
+    state.ready = True
@@ -0,0 +1,200 @@
+"""
+Scoring customers by `customerID` from a feature store.
+
+Callers that only know a `customerID` cannot build a `/predict` request.
+`CustomerLookup` keeps the current features of a `FeatureStore` (see
+data/feature_store.py) in memory, indexed by `customerID`, and scores the
+looked-up rows with the serving model. No raw record is needed and nothing
+is re-encoded.
+
+With `precomputed=True` the nightly score stored by
+`score_batch.py --from-store --store-scores` is returned instead, in O(1),
+while it is still valid:
+
+- it was computed by the loaded model (`ServingModel.version`), and
+- the customer's features are unchanged since the scored store version
+  (the per-row `version` column of the store).
+
+Stale or missing scores fall back to live scoring.
+
+The store's manifest is re-read at most every `refresh_seconds`. A new
+store version or new scores are loaded by the request that notices them;
+concurrent requests keep using the previous snapshot meanwhile.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from churn_project_folder.data.feature_store import VERSION_COL, FeatureStore
+from churn_project_folder.features.schema import ALL_FEATURE_COLUMNS
+from churn_project_folder.serving import config
+from churn_project_folder.serving.inference import get_serving_model
+from churn_project_folder.serving.metrics import StageTimer
+
+# Requests up to this many customers are looked up and scored row by row
+# (hash index `get_loc` and `predict_proba_rows`, tens of microseconds);
+# larger ones go through vectorised pandas indexing and a feature frame
+ROW_PATH_MAX_ROWS = 256
+
+
+class _Snapshot:
+    """
+    One store version in memory, with its stored scores aligned by row.
+    """
+
+    def __init__(self, store: FeatureStore):
+        manifest = store.manifest()
+        self.features = store.snapshot(columns=[*ALL_FEATURE_COLUMNS, VERSION_COL])
+        self.version = self.features.attrs["feature_store_version"]
+        self.scores_meta = manifest.get("scores")
+        # One array per model input column, so a row is assembled without
+        # going through pandas
+        self.columns = [
+            self.features[col].to_numpy(dtype=object if col == "tenure_bucket" else None)
+            for col in ALL_FEATURE_COLUMNS
+        ]
+        # Manifest fields that trigger a reload when they change
+        self.key = (self.version, self.scores_meta)
+
+        self.score_model_version: Optional[str] = None
+        self.score_proba: Optional[np.ndarray] = None
+        self.score_fresh: Optional[np.ndarray] = None
+
+        scores = store.scores() if self.scores_meta else None
+        if scores is not None:
+            # Row i of the features -> its stored score; a score is fresh if
+            # the row has not been rewritten since the scored version
+            positions = scores.index.get_indexer(self.features.index)
+            found = positions >= 0
+            self.score_proba = np.full(len(self.features), np.nan)
+            self.score_proba[found] = scores["churn_probability"].to_numpy()[positions[found]]
+            self.score_fresh = found & (
+                self.features[VERSION_COL].to_numpy() <= self.scores_meta["feature_store_version"]
+            )
+            self.score_model_version = self.scores_meta["model_version"]
+
+    def positions(self, customer_ids: Sequence[str]) -> np.ndarray:
+        """
+        Row of each customer in `features`, -1 for unknown customers.
+        """
+        if len(customer_ids) > ROW_PATH_MAX_ROWS:
+            return self.features.index.get_indexer(customer_ids)
+
+        index = self.features.index
+        positions = np.empty(len(customer_ids), dtype=np.int64)
+        for i, customer_id in enumerate(customer_ids):
+            try:
+                positions[i] = index.get_loc(customer_id)
+            except KeyError:
+                positions[i] = -1
+        return positions
+
+
+class CustomerLookup:
+    """
+    Score customers of the feature store at `store_path` by `customerID`.
+    """
+
+    def __init__(self, store_path: str, refresh_seconds: float = 30.0):
+        self.store = FeatureStore(store_path)
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> _Snapshot:
+        """
+        The loaded snapshot, reloaded if the store changed since last checked.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return snapshot
+
+        # While one request reloads, the others serve the current snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            manifest = self.store.manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"No feature store at {self.store.path}")
+            current = self._snapshot
+            if current is None or current.key != (manifest["version"], manifest.get("scores")):
+                started = time.perf_counter()
+                self._snapshot = _Snapshot(self.store)
+                print(
+                    f"Loaded feature store version {self._snapshot.version} "
+                    f"({len(self._snapshot.features):,} customers) in "
+                    f"{time.perf_counter() - started:.2f}s"
+                )
+            self._checked_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def predict(
+        self,
+        customer_ids: Sequence[str],
+        precomputed: bool = False,
+        timer: Optional[StageTimer] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Score `customer_ids`; results are in input order, None for unknown
+        customers.
+
+        Each result has `customer_id`, `prediction`, `churn_probability`,
+        `source` ("precomputed" or "live") and `feature_store_version`.
+        """
+        timer = timer or StageTimer("predict_customers")
+        snapshot = self.snapshot()
+        serving_model = get_serving_model()
+
+        positions = snapshot.positions(customer_ids)
+        timer.mark("lookup")
+
+        churn_probs = np.full(len(positions), np.nan)
+        from_store = np.zeros(len(positions), dtype=bool)
+        known = positions >= 0
+
+        # 1️ Nightly scores of the loaded model, where still fresh
+        if precomputed and snapshot.score_model_version == serving_model.version:
+            from_store[known] = snapshot.score_fresh[positions[known]]
+            churn_probs[from_store] = snapshot.score_proba[positions[from_store]]
+            timer.mark("precomputed_lookup")
+
+        # 2️ Everything else is scored from the stored features
+        live = known & ~from_store
+        if live.any():
+            live_positions = positions[live]
+            if len(live_positions) <= ROW_PATH_MAX_ROWS:
+                rows = [[column[p] for column in snapshot.columns] for p in live_positions]
+                churn_probs[live] = serving_model.predict_proba_rows(rows)
+            else:
+                X = snapshot.features.iloc[live_positions][ALL_FEATURE_COLUMNS]
+                churn_probs[live] = serving_model.predict_proba_features(X)
+            timer.mark("predict_proba")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(positions)
+        for i in np.flatnonzero(known):
+            churn_prob = float(churn_probs[i])
+            results[i] = {
+                "customer_id": customer_ids[i],
+                "prediction": int(churn_prob >= 0.5),
+                "churn_probability": churn_prob,
+                "source": "precomputed" if from_store[i] else "live",
+                "feature_store_version": snapshot.version,
+            }
+        timer.mark("format")
+        return results
+
+
+# Enabled by CHURN_FEATURE_STORE_PATH; loaded at startup (see lifecycle.py)
+customer_lookup = (
+    CustomerLookup(
+        config.FEATURE_STORE_PATH,
+        refresh_seconds=config.FEATURE_STORE_REFRESH_SECONDS,
+    )
+    if config.FEATURE_STORE_PATH
+    else None
+)
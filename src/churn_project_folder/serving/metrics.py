@@ -0,0 +1,296 @@
+"""
+Low-overhead serving metrics in Prometheus text format.
+
+- `StageTimer` times the stages of one prediction (validation, encoding,
+  column alignment, `predict_proba`, ...) into the `churn_stage_seconds`
+  histogram. A `mark` is one `perf_counter` call and one histogram update.
+- `MetricsMiddleware` (pure ASGI) counts requests by route, method and
+  status, tracks in-flight requests and feeds the request latency
+  histogram.
+- `/metrics` serves `registry.render()`.
+
+Histograms use fixed buckets and are cumulated only when rendered, so an
+observation is a `bisect` plus three additions. Stage timings arrive from
+worker threads and take a lock; the HTTP metrics are only touched by the
+middleware on the event loop thread and skip it. Routes are labelled with
+their path template (`/predict/{customer_id}`, not the concrete path) to
+keep the label set small.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from churn_project_folder.serving import config
+
+# Upper bounds in seconds, from 25us (cached predictions) to 2.5s
+LATENCY_BUCKETS = (
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_enabled = config.METRICS_ENABLED
+
+
+def set_enabled(enabled: bool) -> None:
+    """
+    Turn recording on or off at runtime (the benchmark compares both).
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, one series per combination of label values.
+
+    With `threadsafe=False` updates take no lock; only use it for metrics
+    updated from a single thread.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets=LATENCY_BUCKETS,
+        threadsafe: bool = True,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self.observe = self._observe_locked if threadsafe else self._observe
+
+    def _new_series(self, labels: Tuple[str, ...]) -> list:
+        with self._lock:
+            return self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+
+    def _observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels) or self._new_series(labels)
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def _observe_locked(self, labels: Tuple[str, ...], value: float) -> None:
+        # Same as _observe; inlined to keep a stage mark under a microsecond
+        series = self._series.get(labels) or self._new_series(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series = {}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+
+        lines = []
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.label_names, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Counter:
+    """
+    Counter per combination of label values.
+
+    Not locked: only the middleware updates counters, on the event loop
+    thread.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def reset(self) -> None:
+        self._values = {}
+
+    def render(self) -> List[str]:
+        snapshot = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in snapshot
+        ]
+
+
+class Gauge:
+    """
+    Single unlabelled value, set directly (`gauge.value += 1`).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value)}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self) -> None:
+        """
+        Drop everything recorded so far (e.g. after warmup). Gauges hold
+        live values and are kept.
+        """
+        for metric in self.metrics:
+            if metric.kind != "gauge":
+                metric.reset()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "churn_stage_seconds",
+    "Time spent in each stage of a prediction.",
+    ("endpoint", "stage"),
+))
+request_seconds = registry.register(Histogram(
+    "churn_http_request_seconds",
+    "HTTP request latency.",
+    ("route", "method"),
+    threadsafe=False,
+))
+requests_total = registry.register(Counter(
+    "churn_http_requests_total",
+    "HTTP requests by route, method and status code.",
+    ("route", "method", "status"),
+))
+requests_in_flight = registry.register(Gauge(
+    "churn_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+))
+
+
+class StageTimer:
+    """
+    Time consecutive stages of one call.
+
+        timer = StageTimer("predict")
+        row = encode_row(raw_input)
+        timer.mark("encode")          # time since the timer was created
+        proba = model.predict_proba_rows([row])
+        timer.mark("predict_proba")   # time since the previous mark
+
+    `started` can be passed to count time spent before the call (e.g.
+    request validation, timed from when the middleware saw the request).
+    """
+
+    __slots__ = ("endpoint", "last")
+
+    def __init__(self, endpoint: str, started: float = None):
+        self.endpoint = endpoint
+        self.last = time.perf_counter() if started is None else started
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        if _enabled:
+            stage_seconds.observe((self.endpoint, stage), now - self.last)
+        self.last = now
+
+
+# --------------------------------------------------
+# ASGI middleware
+# --------------------------------------------------
+
+REQUEST_STARTED_KEY = "churn.request_started"
+
+
+def request_started(scope) -> float:
+    """
+    When the middleware received the request, or now if it did not run.
+    """
+    return scope.get(REQUEST_STARTED_KEY) or time.perf_counter()
+
+
+class MetricsMiddleware:
+    """
+    Request counter, in-flight gauge and latency histogram for HTTP calls.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope[REQUEST_STARTED_KEY] = started
+        method = scope["method"]
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        requests_in_flight.value += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.value -= 1
+            # Routing stores the matched route in the (shared) scope
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            request_seconds.observe((route_path, method), time.perf_counter() - started)
+            requests_total.inc((route_path, method, status[0]))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import Any, List, Literal
 
 class PredictRequest(BaseModel):
     tenure: int
@@ -33,3 +33,15 @@ class PredictRequest(BaseModel):
         "Bank transfer (automatic)",
         "Credit card (automatic)",
     ]
+
+
+class PredictBatchRequest(BaseModel):
+    # Records are validated one by one in the inference layer so that a
+    # single bad record does not reject the whole batch.
+    records: List[Any]
+
+
+class PredictCustomersRequest(BaseModel):
+    customer_ids: List[str]
+    # Return the nightly stored score when it is still valid
+    precomputed: bool = False
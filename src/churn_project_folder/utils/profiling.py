@@ -0,0 +1,350 @@
+"""
+Stage-level profiling for the training pipeline.
+
+`profile_stage(name)` is a context manager (and decorator) recording, for
+one stage:
+
+- wall time and process CPU time (all threads)
+- peak RSS during the stage. On Linux the high-water mark is reset when
+  the stage starts (`/proc/self/clear_refs`), so the peak is the stage's
+  own; elsewhere it is the process peak so far. RSS is per process, so
+  stages running at the same time in threads of one process share it.
+- optionally the tracemalloc peak (`tracemalloc=True`; slows allocation
+  heavy code down noticeably, so it is off by default)
+
+Records are kept in memory for `print_profile_summary`, and logged to the
+active MLflow run, if any, as `profile_<stage>_<measure>` metrics (with
+the stage's occurrence number as step, e.g. for folds or trials).
+
+Profiling is off until `configure_profiling(enabled=True)`; disabled
+stages cost one flag check. With `dump_stage` set, that stage also runs
+under cProfile (or pyinstrument) and the profile is written to
+`dump_dir`.
+"""
+import os
+import resource
+import threading
+import time
+import tracemalloc as _tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+_config: Dict[str, Any] = {
+    "enabled": False,
+    "tracemalloc": False,
+    "dump_stage": None,
+    "dump_dir": "profiles",
+    "profiler": "cprofile",
+    "log_to_mlflow": True,
+}
+
+_records: List[Dict[str, Any]] = []
+_records_lock = threading.Lock()
+_occurrences: Dict[str, int] = {}
+_local = threading.local()
+
+
+def configure_profiling(**options) -> None:
+    """
+    Update the profiling options (see `profiling_config` for the keys).
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unknown profiling options: {sorted(unknown)}")
+    if options.get("profiler", _config["profiler"]) not in PROFILERS:
+        raise ValueError(f"profiler must be one of {PROFILERS}")
+    _config.update(options)
+
+
+def profiling_config() -> Dict[str, Any]:
+    """
+    Current options, e.g. to hand to `configure_profiling` in a worker
+    process.
+    """
+    return dict(_config)
+
+
+# --------------------------------------------------
+# Memory
+# --------------------------------------------------
+
+def _read_status_mb(field: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    peak = _read_status_mb("VmHWM:")
+    if peak is None:
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return peak
+
+
+def _rss_mb() -> float:
+    rss = _read_status_mb("VmRSS:")
+    return rss if rss is not None else _peak_rss_mb()
+
+
+# --------------------------------------------------
+# Stages
+# --------------------------------------------------
+
+def _stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def _dump_profile(stage: str, occurrence: int):
+    out_dir = Path(_config["dump_dir"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if _config["profiler"] == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as exc:
+            raise ImportError("profiler='pyinstrument' requires `pip install pyinstrument`") from exc
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = out_dir / f"{stage}-{occurrence}-{os.getpid()}.html"
+            path.write_text(profiler.output_html())
+            print(f"pyinstrument profile of '{stage}' written to {path}")
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = out_dir / f"{stage}-{occurrence}-{os.getpid()}.prof"
+        profiler.dump_stats(path)
+        print(f"cProfile of '{stage}' written to {path} (view with `python -m pstats {path}`)")
+
+
+def _log_record(record: Dict[str, Any]) -> None:
+    import mlflow
+
+    if not _config["log_to_mlflow"] or mlflow.active_run() is None:
+        return
+
+    from churn_project_folder.models.tracking import log_metrics
+
+    stage = record["stage"]
+    measures = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "tracemalloc_peak_mb")
+    log_metrics(
+        {
+            f"profile_{stage}_{measure}": record[measure]
+            for measure in measures
+            if record[measure] is not None
+        },
+        step=record["occurrence"],
+    )
+
+
+@contextmanager
+def profile_stage(stage: str):
+    """
+    Profile the enclosed block as `stage` (also usable as a decorator).
+
+    Stages can nest: a parent's peak includes its children's.
+    """
+    if not _config["enabled"]:
+        yield
+        return
+
+    with _records_lock:
+        occurrence = _occurrences.get(stage, 0)
+        _occurrences[stage] = occurrence + 1
+
+    trace = _config["tracemalloc"]
+    started_tracing = False
+    if trace and not _tracemalloc.is_tracing():
+        _tracemalloc.start()
+        started_tracing = True
+
+    # Carry the peaks so far up to the enclosing stage before resetting them
+    stack = _stack()
+    if stack:
+        stack[-1]["peak"] = max(stack[-1]["peak"], _peak_rss_mb())
+        if trace:
+            stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], _tracemalloc.get_traced_memory()[1])
+    peak_is_own = _reset_peak_rss()
+    rss_before = _rss_mb()
+    frame = {"peak": rss_before, "traced_peak": 0}
+    stack.append(frame)
+    if trace:
+        _tracemalloc.reset_peak()
+
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        if _config["dump_stage"] == stage:
+            with _dump_profile(stage, occurrence):
+                yield
+        else:
+            yield
+    finally:
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+        stack.pop()
+        frame["peak"] = max(frame["peak"], _peak_rss_mb())
+        if trace:
+            frame["traced_peak"] = max(frame["traced_peak"], _tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                _tracemalloc.stop()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+            stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], frame["traced_peak"])
+
+        record = {
+            "stage": stage,
+            "occurrence": occurrence,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_rss_mb": frame["peak"],
+            "rss_delta_mb": _rss_mb() - rss_before,
+            "peak_rss_is_stage": peak_is_own,
+            "tracemalloc_peak_mb": frame["traced_peak"] / 1e6 if trace else None,
+            "pid": os.getpid(),
+        }
+        with _records_lock:
+            _records.append(record)
+        for collector in getattr(_local, "collectors", ()):
+            collector.append(record)
+        _log_record(record)
+
+
+@contextmanager
+def collect_profiles():
+    """
+    Yield a list that receives the records of stages finished in the block.
+    """
+    if not hasattr(_local, "collectors"):
+        _local.collectors = []
+    collected: List[Dict[str, Any]] = []
+    _local.collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        _local.collectors.remove(collected)
+
+
+def profile_records() -> List[Dict[str, Any]]:
+    """
+    Every record of this process so far.
+    """
+    with _records_lock:
+        return list(_records)
+
+
+def add_profile_records(records: Iterable[Dict[str, Any]]) -> None:
+    """
+    Add records collected in worker processes to this process's summary
+    (and to the active `collect_profiles` lists).
+
+    Records of this process are skipped: they were kept when the stages
+    ran (joblib runs single-worker jobs in process).
+    """
+    pid = os.getpid()
+    records = [record for record in records if record["pid"] != pid]
+    with _records_lock:
+        _records.extend(records)
+    for collector in getattr(_local, "collectors", ()):
+        collector.extend(records)
+
+
+# --------------------------------------------------
+# Summary
+# --------------------------------------------------
+
+def profile_summary(records: Optional[Iterable[Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    One row per stage: calls, total/mean wall time, CPU time and peaks.
+    """
+    records = profile_records() if records is None else list(records)
+    columns = [
+        "stage", "calls", "wall_seconds", "mean_wall_seconds", "cpu_seconds",
+        "cpu_utilisation", "peak_rss_mb", "tracemalloc_peak_mb",
+    ]
+    if not records:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.DataFrame(records)
+    summary = df.groupby("stage", sort=False).agg(
+        calls=("wall_seconds", "size"),
+        wall_seconds=("wall_seconds", "sum"),
+        mean_wall_seconds=("wall_seconds", "mean"),
+        cpu_seconds=("cpu_seconds", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"),
+        tracemalloc_peak_mb=("tracemalloc_peak_mb", "max"),
+    ).reset_index()
+    # CPU seconds per wall second; above 1 means several busy threads
+    summary["cpu_utilisation"] = summary["cpu_seconds"] / summary["wall_seconds"].where(
+        summary["wall_seconds"] > 0
+    )
+    return summary[columns]
+
+
+def format_profile_summary(records: Optional[Iterable[Dict[str, Any]]] = None) -> str:
+    summary = profile_summary(records)
+    if summary.empty:
+        return "No profiled stages."
+    return summary.to_string(index=False, float_format=lambda value: f"{value:.3f}")
+
+
+def print_profile_summary(records: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+    print("\nStage profile:")
+    print(format_profile_summary(records))
+
+
+def log_profile_summary(
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+    artifact_file: str = "profile_summary.txt",
+) -> None:
+    """
+    Log the summary table as a text artifact of the active MLflow run.
+    """
+    import mlflow
+
+    if mlflow.active_run() is not None:
+        mlflow.log_text(format_profile_summary(records), artifact_file)
+
+
+def write_profile_summary(path: str | Path, records: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+    """
+    Write the summary table to `path` as CSV.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile_summary(records).to_csv(path, index=False)
+    print(f"Stage profile written to {path}")
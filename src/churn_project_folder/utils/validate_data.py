@@ -1,15 +1,48 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
 import pandas as pd
 
+from churn_project_folder.data.load_data import iter_raw_chunks
 from churn_project_folder.features.schema import (
     RAW_CATEGORICAL_DOMAINS,
+    RAW_REQUIRED_COLUMNS,
+    TARGET_COL,
     MIN_DATASET_SIZE,
+    MIN_TENURE,
+    MAX_TENURE,
+    MIN_MONTHLY_CHARGES,
+    MAX_MONTHLY_CHARGES,
+    MIN_TOTAL_CHARGES,
 )
 
+# Numeric columns and their inclusive (min, max) bounds; None means unbounded
+RAW_NUMERIC_BOUNDS = {
+    "tenure": (MIN_TENURE, MAX_TENURE),
+    "MonthlyCharges": (MIN_MONTHLY_CHARGES, MAX_MONTHLY_CHARGES),
+    "TotalCharges": (MIN_TOTAL_CHARGES, None),
+}
+SENIOR_CITIZEN_VALUES = {0, 1}
+
+# Distinct offending values kept per column and check
+MAX_EXAMPLES = 5
+
+# Sorted hash runs are merged once there are more than this many
+MAX_HASH_RUNS = 8
+
 
-def validate_raw_telco_data(df: pd.DataFrame) -> None:
+def validate_raw_telco_data(
+    df: pd.DataFrame,
+    require_target: bool = True,
+    min_rows: int = MIN_DATASET_SIZE,
+) -> None:
     """
     Validate raw Telco churn data before preprocessing.
     Checks schema, keys, and categorical semantics.
+
+    Scoring callers pass `require_target=False` (unlabelled customers) and
+    `min_rows=0` (a chunk of a larger file may be small).
     """
 
     # ------------------------------------------------------------------
@@ -17,7 +50,6 @@ def validate_raw_telco_data(df: pd.DataFrame) -> None:
     # ------------------------------------------------------------------
     required_columns = {
         "customerID",
-        "Churn",
         "tenure",
         "MonthlyCharges",
         "TotalCharges",
@@ -25,6 +57,9 @@ def validate_raw_telco_data(df: pd.DataFrame) -> None:
         "Partner",
     }
 
+    if require_target:
+        required_columns.add("Churn")
+
     # NOTE: We intentionally keep this minimal set to avoid breaking
     # existing pipeline behavior.
     missing = required_columns - set(df.columns)
@@ -43,9 +78,10 @@ def validate_raw_telco_data(df: pd.DataFrame) -> None:
     # ------------------------------------------------------------------
     # Target validity
     # ------------------------------------------------------------------
-    allowed_churn_values = RAW_CATEGORICAL_DOMAINS["Churn"]
-    if not set(df["Churn"].dropna().unique()).issubset(allowed_churn_values):
-        raise ValueError("Invalid values found in Churn")
+    if "Churn" in df.columns:
+        allowed_churn_values = RAW_CATEGORICAL_DOMAINS["Churn"]
+        if not set(df["Churn"].dropna().unique()).issubset(allowed_churn_values):
+            raise ValueError("Invalid values found in Churn")
 
     # ------------------------------------------------------------------
     # Categorical domains used in preprocessing
@@ -61,6 +97,249 @@ def validate_raw_telco_data(df: pd.DataFrame) -> None:
     # ------------------------------------------------------------------
     # Volume sanity
     # ------------------------------------------------------------------
-    if len(df) < MIN_DATASET_SIZE:
+    if len(df) < min_rows:
         raise ValueError("Dataset too small for modeling")
 
+
+
+# ----------------------------------------------------------------------
+# Streaming full-schema validation
+# ----------------------------------------------------------------------
+
+class ValidationReport:
+    """
+    Per-column violation counts collected over a whole file.
+
+    `violations[column][check]` is the number of offending rows and
+    `examples[column][check]` a few distinct offending values.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.missing_columns: set = set()
+        self.violations: Dict[str, Dict[str, int]] = {}
+        self.examples: Dict[str, Dict[str, List[Any]]] = {}
+        self.errors: List[str] = []
+
+    def add(self, column: str, check: str, count: int, examples: Iterable[Any] = ()) -> None:
+        if count == 0:
+            return
+
+        column_counts = self.violations.setdefault(column, {})
+        column_counts[check] = column_counts.get(check, 0) + int(count)
+
+        kept = self.examples.setdefault(column, {}).setdefault(check, [])
+        for value in examples:
+            if len(kept) >= MAX_EXAMPLES:
+                break
+            value = value.item() if isinstance(value, np.generic) else value
+            if value not in kept:
+                kept.append(value)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing_columns or self.violations or self.errors)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "missing_columns": sorted(self.missing_columns),
+            "violations": {col: dict(checks) for col, checks in self.violations.items()},
+            "examples": {
+                col: {check: list(values) for check, values in checks.items()}
+                for col, checks in self.examples.items()
+            },
+            "errors": list(self.errors),
+        }
+
+    def summary(self) -> str:
+        lines = [f"Validated {self.rows:,} rows in {self.chunks} chunks"]
+        if self.missing_columns:
+            lines.append(f"  missing columns: {sorted(self.missing_columns)}")
+        for col, checks in sorted(self.violations.items()):
+            for check, count in sorted(checks.items()):
+                examples = self.examples.get(col, {}).get(check, [])
+                lines.append(f"  {col}: {check} x{count:,} e.g. {examples}")
+        lines.extend(f"  {error}" for error in self.errors)
+        if self.ok:
+            lines.append("  no violations")
+        return "\n".join(lines)
+
+    def raise_if_invalid(self) -> None:
+        if not self.ok:
+            raise ValueError(self.summary())
+
+
+class StreamingRawValidator:
+    """
+    Validate raw Telco data chunk by chunk against the full raw schema.
+
+    Every chunk is checked with vectorized pandas operations against
+    `RAW_REQUIRED_COLUMNS`, `RAW_CATEGORICAL_DOMAINS` and the numeric
+    thresholds, and all violations are accumulated in a `ValidationReport`
+    instead of stopping at the first one.
+
+    Duplicate `customerID`s are detected across chunks by keeping a 64-bit
+    hash per ID (8 bytes per row) in a few sorted numpy runs. Within a chunk
+    duplicates are exact; across chunks a hash collision could report a
+    false duplicate, with probability about n^2 / 2^65 for n IDs.
+
+    Usage::
+
+        validator = StreamingRawValidator(require_target=False)
+        for chunk in iter_raw_chunks(path):
+            validator.update(chunk)
+        report = validator.finish()
+    """
+
+    def __init__(self, require_target: bool = True, min_rows: int = MIN_DATASET_SIZE):
+        self.require_target = require_target
+        self.min_rows = min_rows
+        self.report = ValidationReport()
+
+        self.required_columns = set(RAW_REQUIRED_COLUMNS)
+        if not require_target:
+            self.required_columns.discard(TARGET_COL)
+
+        self._id_hash_runs: List[np.ndarray] = []
+
+    # ------------------------------------------------------------------
+    # Per-chunk checks
+    # ------------------------------------------------------------------
+
+    def update(self, df: pd.DataFrame) -> None:
+        report = self.report
+        report.chunks += 1
+        report.rows += len(df)
+
+        report.missing_columns |= self.required_columns - set(df.columns)
+
+        if "customerID" in df.columns:
+            self._check_ids(df["customerID"])
+
+        for col, domain in RAW_CATEGORICAL_DOMAINS.items():
+            if col in df.columns:
+                self._check_domain(col, df[col], domain)
+
+        if "SeniorCitizen" in df.columns:
+            self._check_domain("SeniorCitizen", df["SeniorCitizen"], SENIOR_CITIZEN_VALUES)
+
+        for col, (low, high) in RAW_NUMERIC_BOUNDS.items():
+            if col in df.columns:
+                self._check_numeric(col, df[col], low, high)
+
+    def _check_ids(self, ids: pd.Series) -> None:
+        nulls = ids.isna()
+        self.report.add("customerID", "null", nulls.sum())
+        ids = ids[~nulls]
+
+        in_chunk = ids.duplicated()
+        self.report.add("customerID", "duplicate", in_chunk.sum(), ids[in_chunk].head(MAX_EXAMPLES))
+
+        unique_ids = ids[~in_chunk]
+        hashes = pd.util.hash_pandas_object(unique_ids.astype(str), index=False).to_numpy()
+
+        seen_before = np.zeros(len(hashes), dtype=bool)
+        for run in self._id_hash_runs:
+            pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            seen_before |= run[pos] == hashes
+        self.report.add(
+            "customerID", "duplicate", seen_before.sum(), unique_ids[seen_before].head(MAX_EXAMPLES)
+        )
+
+        if (~seen_before).any():
+            self._id_hash_runs.append(np.sort(hashes[~seen_before]))
+        if len(self._id_hash_runs) > MAX_HASH_RUNS:
+            self._id_hash_runs = [np.sort(np.concatenate(self._id_hash_runs))]
+
+    def _check_domain(self, col: str, values: pd.Series, domain: set) -> None:
+        nulls = values.isna()
+        self.report.add(col, "null", nulls.sum())
+
+        invalid = ~values.isin(domain) & ~nulls
+        if invalid.any():
+            bad = values[invalid]
+            self.report.add(col, "not_in_domain", len(bad), bad.unique()[:MAX_EXAMPLES])
+
+    def _check_numeric(self, col: str, values: pd.Series, low, high) -> None:
+        numeric = pd.to_numeric(values, errors="coerce")
+        nulls = numeric.isna()
+
+        blank = values.isna()
+        if not pd.api.types.is_numeric_dtype(values):
+            blank |= values.astype(str).str.strip().eq("")
+        # Blank TotalCharges (zero-tenure customers) are imputed downstream
+        if col != "TotalCharges":
+            self.report.add(col, "null", blank.sum())
+
+        unparseable = nulls & ~blank
+        if unparseable.any():
+            bad = values[unparseable]
+            self.report.add(col, "not_numeric", len(bad), bad.unique()[:MAX_EXAMPLES])
+
+        if low is not None:
+            below = numeric < low
+            self.report.add(col, f"below_{low}", below.sum(), numeric[below].unique()[:MAX_EXAMPLES])
+        if high is not None:
+            above = numeric > high
+            self.report.add(col, f"above_{high}", above.sum(), numeric[above].unique()[:MAX_EXAMPLES])
+
+    # ------------------------------------------------------------------
+    # Whole-file checks
+    # ------------------------------------------------------------------
+
+    def finish(self) -> ValidationReport:
+        if self.report.rows < self.min_rows:
+            self.report.errors.append(
+                f"Dataset too small for modeling: {self.report.rows} < {self.min_rows} rows"
+            )
+        return self.report
+
+    @property
+    def id_hash_bytes(self) -> int:
+        return sum(run.nbytes for run in self._id_hash_runs)
+
+
+def validate_raw_file(
+    path: str | Path,
+    chunksize: int = 100_000,
+    require_target: bool = True,
+    min_rows: int = MIN_DATASET_SIZE,
+    max_rows: Optional[int] = None,
+) -> ValidationReport:
+    """
+    Stream a raw CSV or Parquet file through `StreamingRawValidator`.
+
+    Parameters
+    ----------
+    path : str or Path
+        Raw customer file.
+    chunksize : int
+        Rows per chunk; bounds peak memory.
+    require_target : bool
+        Whether `Churn` must be present.
+    min_rows : int
+        Minimum total number of rows.
+    max_rows : int, optional
+        Stop after this many rows.
+
+    Returns
+    -------
+    ValidationReport
+        Per-column violations over the whole file.
+    """
+    validator = StreamingRawValidator(require_target=require_target, min_rows=min_rows)
+
+    remaining = max_rows
+    for chunk in iter_raw_chunks(path, chunksize=chunksize):
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            chunk = chunk.iloc[:remaining]
+            remaining -= len(chunk)
+        validator.update(chunk)
+
+    return validator.finish()